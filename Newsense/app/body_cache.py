@@ -0,0 +1,165 @@
+"""
+Memory-budgeted LRU cache of stored articles for the web app.
+
+Stored article records are dominated by their ``content`` and ``html`` fields,
+so they cannot all stay in memory, but re-reading the hot ones from disk on
+every request is wasted I/O. This cache keeps recently read records up to a
+byte budget, evicting the least recently used ones first. It also watches the
+process RSS: while it is above the configured ceiling, the cache shrinks and
+stops growing. The ceiling can be given outright or as headroom above the
+RSS measured once the process has loaded what it always holds (models etc.).
+"""
+
+import os
+import sys
+import threading
+import time
+from collections import OrderedDict
+
+try:
+    import psutil
+except ImportError:  # pragma: no cover - /proc is used on Linux
+    psutil = None
+
+_PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+
+def process_rss():
+    """Resident set size of this process in bytes, or None if it cannot be read"""
+    try:
+        with open("/proc/self/statm", "rb") as f:
+            return int(f.read().split()[1]) * _PAGE_SIZE
+    except (OSError, ValueError, IndexError):
+        pass
+    if psutil is not None:
+        return psutil.Process().memory_info().rss
+    return None
+
+
+def estimate_size(value):
+    """Approximate memory held by a decoded JSON value"""
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(estimate_size(k) + estimate_size(v) for k, v in value.items())
+    if isinstance(value, (list, tuple)):
+        return sys.getsizeof(value) + sum(estimate_size(v) for v in value)
+    return sys.getsizeof(value)
+
+
+class ArticleBodyCache:
+    """LRU of full article records bounded by bytes, with hit/miss/eviction stats"""
+
+    def __init__(self, max_bytes=128 * 1024 * 1024, rss_ceiling=None, rss_headroom=None, rss_check_interval=1.0):
+        self.max_bytes = max_bytes
+        self.rss_ceiling = rss_ceiling
+        # With a headroom, set_rss_baseline() places the ceiling above the measured RSS
+        self.rss_headroom = rss_headroom
+        self.rss_check_interval = rss_check_interval
+        # Effective budget; lowered while the process is over its RSS ceiling
+        self.limit = max_bytes
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.rejected = 0
+        self.pressure_events = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._last_rss_check = 0.0
+        self._last_rss = None
+
+    def get(self, key):
+        with self._lock:
+            item = self._entries.get(key)
+            if item is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return item[0]
+
+    def put(self, key, value):
+        """Cache a record (which must not be mutated afterwards)"""
+        size = estimate_size(value)
+        self._check_rss()
+        with self._lock:
+            if size > self.limit:
+                self.rejected += 1
+                return
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self.bytes -= old[1]
+            self._entries[key] = (value, size)
+            self.bytes += size
+            self._evict_to(self.limit)
+
+    def get_or_load(self, key, load):
+        """Return the cached record for key, calling load() and caching it on a miss"""
+        value = self.get(key)
+        if value is None:
+            value = load()
+            self.put(key, value)
+        return value
+
+    def _evict_to(self, limit):
+        # Caller holds the lock
+        while self._entries and self.bytes > limit:
+            _, (_, size) = self._entries.popitem(last=False)
+            self.bytes -= size
+            self.evictions += 1
+
+    def set_rss_baseline(self):
+        """Put the RSS ceiling rss_headroom above the current RSS, not counting this cache"""
+        if self.rss_headroom is None:
+            return
+        rss = process_rss()
+        if rss is None:
+            return
+        with self._lock:
+            self.rss_ceiling = max(rss - self.bytes, 0) + self.rss_headroom
+            self.limit = self.max_bytes
+            self._last_rss = rss
+
+    def _check_rss(self):
+        """Shrink the budget while the process is above its RSS ceiling (rate limited)"""
+        if self.rss_ceiling is None:
+            return
+        now = time.monotonic()
+        if now - self._last_rss_check < self.rss_check_interval:
+            return
+        self._last_rss_check = now
+        rss = process_rss()
+        self._last_rss = rss
+        if rss is None:
+            return
+
+        with self._lock:
+            if rss > self.rss_ceiling:
+                # Give back at least the overshoot and stop growing until RSS recovers
+                self.pressure_events += 1
+                self.limit = max(0, min(self.limit, self.bytes - (rss - self.rss_ceiling)))
+                self._evict_to(self.limit)
+            elif rss < self.rss_ceiling * 0.9:
+                self.limit = self.max_bytes
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.bytes = 0
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self.bytes,
+                "max_bytes": self.max_bytes,
+                "limit_bytes": self.limit,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else None,
+                "evictions": self.evictions,
+                "rejected": self.rejected,
+                "pressure_events": self.pressure_events,
+                "rss_bytes": self._last_rss,
+                "rss_ceiling_bytes": self.rss_ceiling,
+            }
@@ -1,22 +1,41 @@
 from fastapi import FastAPI, Request, Depends, HTTPException
-from fastapi.responses import HTMLResponse
+from fastapi.responses import HTMLResponse, FileResponse
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
 from pathlib import Path
 import os
 import json
 import glob
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
 import sys
 import subprocess
+import threading
+import logging
 import time
+import re
+import cProfile
 
 # Add the parent directory to sys.path to import from root
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from summarizer import summarize_news, NewsSummarizer
+from summarizer import summarize_news, NewsSummarizer, TieredSummarizer
+from profiling import StackSampler
+from scrapper.records import ArticleRecord
+from scrapper.catalog import catalog_version, list_source_dirs
+from scrapper.segment_store import store
+from scrapper.article_index import MappedArticleIndex, INDEX_FILE
+from scrapper.trending import TrendingTracker
+from scrapper.similarity import RelatedIndex
+from scrapper.logging_config import configure_logging, sampled
+from app.responses import FastJSONResponse, cached_json_response, make_etag, prime_json_cache
+from app.thumbnails import ThumbnailCache, ThumbnailError
+from app.body_cache import ArticleBodyCache
+from app.warmup import SourceRequestStats, WarmupTask
+
+# Log writes go through a queue to a background thread (see scrapper/logging_config.py)
+logger = logging.getLogger("Newsense.app")
 
 # Initialize FastAPI app
-app = FastAPI(title="Newsense - AI News Summarizer")
+app = FastAPI(title="Newsense - AI News Summarizer", default_response_class=FastJSONResponse)
 
 # Define model holder for startup initialization
 summarizer_model = None
@@ -26,14 +45,20 @@ async def startup_event():
     """Initialize the summarization model at app startup"""
     global summarizer_model
     
+    configure_logging(
+        log_file=os.environ.get("NEWSENSE_LOG_FILE"),
+        level=getattr(logging, os.environ.get("NEWSENSE_LOG_LEVEL", "INFO").upper(), logging.INFO),
+        json_format=os.environ.get("NEWSENSE_LOG_FORMAT") == "json"
+    )
+    
     # Preload the summarizer model to avoid repeated loading
-    print("Preloading summarization model (this may take a minute)...")
+    logger.info("Preloading summarization model (this may take a minute)...")
     try:
         # Create a simplified summarizer for faster processing
         # This skips the heavy transformer model and uses a simple extractive approach
         class SimplifiedSummarizer:
             def __init__(self):
-                print("Initializing simplified summarizer for faster processing")
+                logger.info("Initializing simplified summarizer for faster processing")
                 # Import nltk here to avoid global import
                 import nltk
                 # Ensure necessary NLTK data is downloaded
@@ -59,10 +84,10 @@ async def startup_event():
         
         # Use the simplified summarizer instead of the heavy transformer model
         summarizer_model = SimplifiedSummarizer()
-        print("Using simplified summarizer for faster processing")
+        logger.info("Using simplified summarizer for faster processing")
         
     except Exception as e:
-        print(f"Error initializing summarizer: {str(e)}")
+        logger.error(f"Error initializing summarizer: {str(e)}")
         # Create a very basic summarizer as fallback
         class BasicSummarizer:
             def summarize(self, content, max_length=100):
@@ -70,7 +95,91 @@ async def startup_event():
                 return content[:300] + "..." if len(content) > 300 else content
         
         summarizer_model = BasicSummarizer()
-        print("Using basic summarizer due to initialization error")
+        logger.info("Using basic summarizer due to initialization error")
+    
+    # Fast summaries are served right away; BART summaries computed in the background
+    # replace them when ready, unless the queue or its latency is over the SLO
+    summarizer_model = TieredSummarizer(
+        summarizer_model,
+        load_abstractive=NewsSummarizer if ABSTRACTIVE_SUMMARIES else None,
+        slo_seconds=SUMMARY_SLO_SECONDS,
+        max_queue=SUMMARY_MAX_QUEUE,
+        store_path=os.path.join(SCRAPED_NEWS_DIR, UPGRADED_SUMMARIES_FILE),
+        on_ready=article_cache.set_rss_baseline,
+        leader_lock_path=os.path.join(SCRAPED_NEWS_DIR, SUMMARIZER_LEADER_LOCK),
+        request_path=os.path.join(SCRAPED_NEWS_DIR, SUMMARY_REQUESTS_FILE),
+        load_content=load_article_content
+    )
+    # What the process holds from here on is its baseline (re-measured once BART has loaded)
+    article_cache.set_rss_baseline()
+    
+    # Load and summarize each source's newest articles in the background; the app
+    # serves requests meanwhile, and the most requested sources are warmed first
+    if WARMUP_ON_STARTUP:
+        warmup.start(source_requests.order(get_news_sources()), warm_source)
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Persist request counts so the next start warms sources in the same order"""
+    source_requests.save()
+
+# Opt-in request profiling: with NEWSENSE_PROFILING=1, a request carrying an
+# X-Profile header or ?profile= flag (1/sample for folded stacks, cprofile for
+# cProfile stats) is profiled and the result saved under PROFILE_DIR
+PROFILING_ENABLED = os.environ.get("NEWSENSE_PROFILING", "0") == "1"
+PROFILE_DIR = os.environ.get("NEWSENSE_PROFILE_DIR", "profiles")
+# Flag values that turn profiling on; anything else (e.g. profile=0) is ignored
+PROFILE_MODES = {"1": "sample", "sample": "sample", "cprofile": "cprofile"}
+profile_lock = threading.Lock()
+
+async def profile_requests(request: Request, call_next):
+    """Profile a single request when asked to; every other request passes straight through"""
+    flag = (request.headers.get("x-profile") or request.query_params.get("profile") or "").strip().lower()
+    mode = PROFILE_MODES.get(flag)
+    if mode is None:
+        return await call_next(request)
+    
+    # One profiled request at a time; cProfile cannot run twice and samples would mix
+    if not profile_lock.acquire(blocking=False):
+        response = await call_next(request)
+        response.headers["X-Profile-Skipped"] = "another request is being profiled"
+        return response
+    
+    try:
+        os.makedirs(PROFILE_DIR, exist_ok=True)
+        name = re.sub(r"[^A-Za-z0-9_.-]+", "_", request.url.path).strip("_") or "root"
+        stem = os.path.join(PROFILE_DIR, f"{time.strftime('%Y%m%d_%H%M%S')}_{request.method}_{name}")
+        start = time.perf_counter()
+        if mode == "cprofile":
+            profiler = cProfile.Profile()
+            profiler.enable()
+            try:
+                response = await call_next(request)
+            finally:
+                profiler.disable()
+            path = f"{stem}.prof"
+            profiler.dump_stats(path)
+        else:
+            # Samples every thread: async handlers run on the event loop, sync ones in the threadpool
+            sampler = StackSampler(interval=0.001).start()
+            try:
+                response = await call_next(request)
+            finally:
+                sampler.stop()
+            path = f"{stem}.folded"
+            sampler.write(path)
+        elapsed = time.perf_counter() - start
+    finally:
+        profile_lock.release()
+    
+    logger.info(f"Profiled {request.method} {request.url.path} ({elapsed * 1000:.1f} ms) -> {path}")
+    response.headers["X-Profile-File"] = path
+    response.headers["Server-Timing"] = f"app;dur={elapsed * 1000:.1f}"
+    return response
+
+# Without NEWSENSE_PROFILING the middleware is not installed, so requests pay nothing for it
+if PROFILING_ENABLED:
+    app.middleware("http")(profile_requests)
 
 # Mount static files
 app.mount("/static", StaticFiles(directory="app/static"), name="static")
@@ -78,8 +187,61 @@ app.mount("/static", StaticFiles(directory="app/static"), name="static")
 # Setup templates
 templates = Jinja2Templates(directory="app/templates")
 
-# Define base directory for scraped news
-SCRAPED_NEWS_DIR = "scrapper/scraped_news"
+# Define base directory for scraped news (NEWSENSE_DATA_DIR points the app at another corpus)
+SCRAPED_NEWS_DIR = os.environ.get("NEWSENSE_DATA_DIR", "scrapper/scraped_news")
+
+# Shared scraper work queue (see scrapper/work_queue.py); when set, /api/refresh-news
+# queues a scrape round for the workers instead of scraping in-process
+WORK_QUEUE = os.environ.get("NEWSENSE_WORK_QUEUE")
+
+# Resized article images served by /img, capped on disk with LRU eviction
+THUMBNAIL_CACHE_DIR = "thumbnail_cache"
+THUMBNAIL_CACHE_MAX_BYTES = 200 * 1024 * 1024
+THUMBNAIL_WIDTHS = (200, 400, 800)
+thumbnails = None
+
+# Recently read articles (including content/html) kept in memory up to a byte
+# budget; the cache shrinks if the process RSS goes more than PROCESS_RSS_HEADROOM
+# over its baseline after startup (and after the summarization model has loaded)
+ARTICLE_CACHE_MAX_BYTES = 128 * 1024 * 1024
+PROCESS_RSS_HEADROOM = 512 * 1024 * 1024
+article_cache = ArticleBodyCache(ARTICLE_CACHE_MAX_BYTES, rss_headroom=PROCESS_RSS_HEADROOM)
+
+# Abstractive (BART) summary upgrades, shed to the fast tier when the background
+# queue is over SUMMARY_MAX_QUEUE jobs or its p95 latency over SUMMARY_SLO_SECONDS.
+# Only the worker holding SUMMARIZER_LEADER_LOCK loads the model (~1.6 GB); the
+# others forward their requests to it through SUMMARY_REQUESTS_FILE
+ABSTRACTIVE_SUMMARIES = os.environ.get("NEWSENSE_ABSTRACTIVE", "1") == "1"
+SUMMARY_SLO_SECONDS = float(os.environ.get("NEWSENSE_SUMMARY_SLO", "30"))
+SUMMARY_MAX_QUEUE = 50
+UPGRADED_SUMMARIES_FILE = "abstractive_summaries.jsonl"
+SUMMARY_REQUESTS_FILE = "abstractive_requests.jsonl"
+SUMMARIZER_LEADER_LOCK = ".summarizer.lock"
+
+# Startup warm-up, ordered by per-source request counts kept across restarts
+SOURCE_REQUESTS_FILE = "source_requests.json"
+WARMUP_LIMIT = 20
+WARMUP_ON_STARTUP = True
+source_requests = SourceRequestStats(os.path.join(SCRAPED_NEWS_DIR, SOURCE_REQUESTS_FILE))
+warmup = WarmupTask()
+
+# Memory-mapped index published by the scraper; shared by all worker processes
+article_index = None
+
+def get_article_index() -> MappedArticleIndex:
+    """The shared article index for the current SCRAPED_NEWS_DIR"""
+    global article_index
+    path = os.path.join(SCRAPED_NEWS_DIR, INDEX_FILE)
+    if article_index is None or article_index.path != path:
+        article_index = MappedArticleIndex(path)
+    return article_index
+
+def get_thumbnail_cache() -> ThumbnailCache:
+    """Create the thumbnail cache on first use"""
+    global thumbnails
+    if thumbnails is None:
+        thumbnails = ThumbnailCache(THUMBNAIL_CACHE_DIR, max_bytes=THUMBNAIL_CACHE_MAX_BYTES)
+    return thumbnails
 
 @app.get("/", response_class=HTMLResponse)
 async def read_root(request: Request):
@@ -93,63 +255,201 @@ async def read_root(request: Request):
     )
 
 @app.get("/api/sources")
-async def get_sources():
+async def get_sources(request: Request):
     """Get all available news sources"""
-    return {"sources": get_news_sources()}
+    etag = make_etag("sources", catalog_version(SCRAPED_NEWS_DIR, SCRAPED_NEWS_DIR))
+    return cached_json_response(request, etag, lambda: {"sources": get_news_sources()})
+
+# Fields the news list renders; content and html are only sent by the detail endpoint
+LIST_FIELDS = ("id", "title", "url", "source", "published_date", "summary", "description",
+               "categories", "image_url", "author")
+DETAIL_FIELDS = ("id", "title", "url", "source", "published_date", "scraped_date", "summary",
+                 "description", "content", "categories", "keywords", "authors", "author", "image_url")
+
+def parse_fields(fields: Optional[str], default) -> Optional[tuple]:
+    """Requested comma-separated fields, the default projection, or None for every field ("all")"""
+    if not fields:
+        return tuple(default)
+    if fields.strip() in ("all", "*"):
+        return None
+    return tuple(dict.fromkeys(name.strip() for name in fields.split(",") if name.strip()))
+
+def project_article(article: ArticleRecord, fields: Optional[tuple]) -> Dict[str, Any]:
+    """Only the requested fields of an article (fields missing from it are left out)"""
+    if fields is None:
+        return article.to_dict()
+    projected = {}
+    for name in fields:
+        value = article.get(name)
+        if value is not None:
+            projected[name] = value
+    return projected
+
+def source_dir_aliases(source: str) -> List[str]:
+    """Directory names holding articles for a source (TheHindu has been saved under two names)"""
+    if source == "The Hindu" or source == "TheHindu":
+        return ["The Hindu", "TheHindu"]
+    return [source]
 
 @app.get("/api/articles/{source}")
-async def get_articles_by_source(source: str, limit: int = 20):
-    """Get articles from a specific source with summaries"""
+async def get_articles_by_source(request: Request, source: str, limit: int = 20, fields: Optional[str] = None):
+    """
+    Get articles from a specific source with summaries.
+
+    Only the fields the news list shows are returned unless `fields` names others
+    (comma-separated) or is "all"; full content is served by /api/article/{id}.
+    """
+    # Only existing sources are counted; the counts are persisted and order the warm-up
+    if source in get_news_sources():
+        source_requests.record(source)
+    projection = parse_fields(fields, LIST_FIELDS)
+    # Unchanged source directories revalidate to 304 without loading or summarizing anything
+    etag = articles_etag(source, limit, projection)
+    return cached_json_response(request, etag, lambda: build_articles_payload(source, limit, projection))
+
+def articles_etag(source: str, limit: int, projection: Optional[tuple] = LIST_FIELDS) -> str:
+    names = source_dir_aliases(source)
+    source_dirs = [os.path.join(SCRAPED_NEWS_DIR, name) for name in names]
+    return make_etag(
+        "articles", source, limit, projection, *(summary_version(scope=name) for name in names),
+        catalog_version(SCRAPED_NEWS_DIR, *source_dirs)
+    )
+
+def summary_version(key: Optional[str] = None, scope: Optional[str] = None) -> str:
+    """
+    Changes when the article `key`, or any article of the source directory `scope`,
+    gets an upgraded summary; the same in every worker, and untouched by other upgrades
+    """
+    if summarizer_model is None:
+        return "none"
+    return f"{type(summarizer_model.fast).__name__}:{summarizer_model.upgrade_version(key=key, scope=scope)}"
+
+def warm_source(source: str):
+    """Load and summarize a source's default article list into the response cache"""
+    if not prime_json_cache(articles_etag(source, WARMUP_LIMIT), lambda: build_articles_payload(source, WARMUP_LIMIT)):
+        raise RuntimeError(f"could not load articles for {source}")
+
+@app.get("/api/ready")
+async def get_readiness():
+    """Readiness probe: ready once the summarizer is loaded; also reports warm-up progress"""
+    ready = summarizer_model is not None
+    payload = {"status": "ready" if ready else "starting", "ready": ready, "warmup": warmup.progress(),
+               "summarizer": summarizer_model.stats() if ready else None}
+    return FastJSONResponse(payload, status_code=200 if ready else 503)
+
+def build_articles_payload(source: str, limit: int = 20, fields: Optional[tuple] = LIST_FIELDS) -> Dict[str, Any]:
+    """Load, deduplicate and summarize a source's articles into the API payload"""
     try:
-        print(f"Fetching articles from source: {source}")
+        logger.debug(f"Fetching articles from source: {source}")
         
         # Handle the case where TheHindu and The Hindu are treated as the same source
         articles = []
         if source == "The Hindu" or source == "TheHindu":
             # Try to load from both directory names to handle different scraping formats
             try:
-                articles.extend(load_articles_from_source("The Hindu", limit))
+                articles.extend(load_articles_from_source("The Hindu", limit, fields))
             except Exception as e:
-                print(f"Error loading from 'The Hindu': {str(e)}")
+                logger.error(f"Error loading from 'The Hindu': {str(e)}")
             
             try:
-                articles.extend(load_articles_from_source("TheHindu", limit))
+                articles.extend(load_articles_from_source("TheHindu", limit, fields))
             except Exception as e:
-                print(f"Error loading from 'TheHindu': {str(e)}")
+                logger.error(f"Error loading from 'TheHindu': {str(e)}")
             
             # Remove duplicates by titles
             seen_titles = set()
             unique_articles = []
             for article in articles:
-                if article.get('title') not in seen_titles:
-                    seen_titles.add(article.get('title'))
+                # Fall back to the id when the projection leaves out the title
+                key = article.get('title') or article.get('id') or len(unique_articles)
+                if key not in seen_titles:
+                    seen_titles.add(key)
                     unique_articles.append(article)
             
             articles = unique_articles[:limit]  # Limit the total number
         else:
             # For other sources, load normally
-            articles = load_articles_from_source(source, limit)
+            articles = load_articles_from_source(source, limit, fields)
             
-        print(f"Successfully fetched {len(articles)} articles from {source}")
+        logger.info(f"Successfully fetched {len(articles)} articles from {source}")
         return {"status": "success", "articles": articles, "count": len(articles)}
     except Exception as e:
-        import traceback
         error_msg = str(e)
-        print(f"Error fetching articles from {source}: {error_msg}")
-        print(traceback.format_exc())
+        logger.exception(f"Error fetching articles from {source}: {error_msg}")
         return {"status": "error", "message": error_msg}
 
+@app.get("/api/article/{article_id}")
+async def get_article(request: Request, article_id: str, source: Optional[str] = None, fields: Optional[str] = None):
+    """
+    Full content of one article (html only with fields=all or fields=...,html).
+
+    Passing the article's source skips searching the other source directories.
+    """
+    projection = parse_fields(fields, DETAIL_FIELDS)
+    etag = make_etag("article", article_id, source, projection, summary_version(key=article_id), catalog_version(SCRAPED_NEWS_DIR))
+    return cached_json_response(request, etag, lambda: build_article_payload(article_id, source, projection))
+
+def find_stored_article(article_id: str, source: Optional[str] = None) -> Optional[Tuple[str, ArticleRecord]]:
+    """Newest stored version of an article, from segments or a legacy JSON file, with its source directory name"""
+    names = get_news_sources()
+    if source:
+        # Only names of existing source directories may be joined onto the data directory
+        names = [name for name in source_dir_aliases(source) if name in names]
+    for name in names:
+        source_dir = os.path.join(SCRAPED_NEWS_DIR, name)
+        entry = store.find(source_dir, article_id)
+        if entry is not None:
+            article = read_stored_article(entry.segment, entry)
+            article['id'] = article_id
+            return name, article
+        legacy_path = os.path.join(source_dir, f"{article_id}.json")
+        if os.path.isfile(legacy_path):
+            article = read_stored_article(legacy_path)
+            article['id'] = article_id
+            return name, article
+    return None
+
+def load_article_content(article_id: str, source: Optional[str] = None) -> Optional[str]:
+    """Content of a stored article, for summary upgrades forwarded by another worker"""
+    found = find_stored_article(article_id, source)
+    if found is None:
+        return None
+    return (found[1].get('content') or '')[:50000]
+
+def build_article_payload(article_id: str, source: Optional[str], fields: Optional[tuple]) -> Dict[str, Any]:
+    try:
+        # Ids are md5 hex digests; anything else cannot name a stored file
+        if not article_id.isalnum():
+            return {"status": "error", "message": f"Invalid article id '{article_id}'"}
+        found = find_stored_article(article_id, source)
+        if found is None:
+            return {"status": "error", "message": f"Article '{article_id}' not found"}
+        source_name, article = found
+        if not article.get('summary') and article.get('content'):
+            article['summary'] = summarizer_model.summarize(
+                article['content'][:50000], max_length=100, key=article_id, scope=source_name
+            )
+        if not article.get('author'):
+            article['author'] = "Unknown Author"
+        return {"status": "success", "article": project_article(article, fields)}
+    except Exception as e:
+        logger.error(f"Error loading article {article_id}: {str(e)}")
+        return {"status": "error", "message": str(e)}
+
 @app.get("/api/refresh-news")
 async def refresh_news():
     """Run the news scraper to fetch fresh articles"""
     try:
-        print("Starting news refresh process...")
+        if WORK_QUEUE:
+            return queue_refresh()
+        
+        logger.info("Starting news refresh process...")
         start_time = time.time()
         
         try:
             # First try to use the subprocess approach with the current Python executable
             python_executable = sys.executable
-            print(f"Using Python executable: {python_executable}")
+            logger.info(f"Using Python executable: {python_executable}")
             
             result = subprocess.run(
                 [python_executable, "run_scraper.py"],
@@ -163,12 +463,12 @@ async def refresh_news():
                 end_time = time.time()
                 duration = end_time - start_time
                 message = f"News refresh completed successfully in {duration:.1f} seconds"
-                print(message)
+                logger.info(message)
                 return {"status": "success", "message": message}
             else:
                 # Error with subprocess, try the direct approach
-                print(f"Subprocess error: {result.stderr}")
-                print("Trying direct import approach...")
+                logger.error(f"Subprocess error: {result.stderr}")
+                logger.info("Trying direct import approach...")
                 
                 # Import the scraper module directly
                 from scrapper.main import EnhancedNewsScraper
@@ -179,133 +479,285 @@ async def refresh_news():
                 
                 # Initialize and run the scraper
                 scraper = EnhancedNewsScraper(output_dir=output_dir, days_threshold=2)
-                article_count = scraper.scrape_all_sources()
+                try:
+                    article_count = scraper.scrape_all_sources()
+                finally:
+                    scraper.close()
                 
                 end_time = time.time()
                 duration = end_time - start_time
                 message = f"News refresh completed successfully in {duration:.1f} seconds. Scraped {article_count} articles."
-                print(message)
+                logger.info(message)
                 return {"status": "success", "message": message}
                 
         except ImportError as e:
             error_message = f"Failed to import scraper: {str(e)}"
-            print(error_message)
+            logger.error(error_message)
             return {"status": "error", "message": error_message}
             
     except Exception as e:
         error_message = f"Failed to refresh news: {str(e)}"
-        print(error_message)
+        logger.error(error_message)
         return {"status": "error", "message": error_message}
 
+def queue_refresh():
+    """Queue a scrape round for the work-queue workers (joining the running round, if any)"""
+    result = subprocess.run(
+        [sys.executable, "run_scraper.py", "--queue", WORK_QUEUE, "--enqueue"],
+        capture_output=True,
+        text=True,
+        check=False
+    )
+    if result.returncode != 0:
+        logger.error(f"Could not queue a scrape round: {result.stderr}")
+        return {"status": "error", "message": "Could not queue a scrape round"}
+    message = result.stdout.strip().splitlines()[-1] if result.stdout.strip() else "Scrape round queued"
+    logger.info(message)
+    return {"status": "queued", "message": message}
+
+# Trending keywords saved by the scraper; reloaded when the file changes
+TRENDING_FILE = "trending.npz"
+trending_tracker = None
+trending_signature = None
+
+def load_trending_tracker() -> Optional[TrendingTracker]:
+    """The scraper's latest trending tracker, or None if it has not saved one yet"""
+    global trending_tracker, trending_signature
+    path = os.path.join(SCRAPED_NEWS_DIR, TRENDING_FILE)
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+    signature = (path, st.st_ino, st.st_mtime_ns)
+    if signature != trending_signature:
+        trending_tracker = TrendingTracker.load(path)
+        trending_signature = signature
+    return trending_tracker
+
+@app.get("/api/trending")
+async def get_trending(request: Request, category: Optional[str] = None, limit: int = 10):
+    """Trending keywords overall or within a category, with time-decayed scores"""
+    limit = max(1, min(limit, 50))
+    # Scores decay continuously, so cached responses are only reused within the same minute
+    etag = make_etag(
+        "trending", category, limit, int(time.time() // 60),
+        catalog_version(SCRAPED_NEWS_DIR, os.path.join(SCRAPED_NEWS_DIR, TRENDING_FILE))
+    )
+    return cached_json_response(request, etag, lambda: build_trending_payload(category, limit))
+
+def build_trending_payload(category: Optional[str], limit: int) -> Dict[str, Any]:
+    try:
+        tracker = load_trending_tracker()
+        keywords = tracker.top(category, limit) if tracker is not None else []
+        return {"status": "success", "category": category or TrendingTracker.OVERALL, "keywords": keywords}
+    except Exception as e:
+        logger.error(f"Error loading trending keywords: {str(e)}")
+        return {"status": "error", "message": str(e)}
+
+# Article vectors appended by the scraper; new rows are mapped in on each request
+RELATED_INDEX_DIR = "related_index"
+related_index = None
+
+def get_related_index() -> RelatedIndex:
+    """The related-articles index for the current SCRAPED_NEWS_DIR"""
+    global related_index
+    path = os.path.join(SCRAPED_NEWS_DIR, RELATED_INDEX_DIR)
+    if related_index is None or related_index.index_dir != path:
+        related_index = RelatedIndex(path)
+    return related_index
+
+@app.get("/api/articles/{article_id}/related")
+async def get_related_articles(request: Request, article_id: str, limit: int = 5):
+    """Articles most similar to the given one, by cosine similarity of their TF-IDF vectors"""
+    limit = max(1, min(limit, 20))
+    etag = make_etag("related", article_id, limit, catalog_version(SCRAPED_NEWS_DIR))
+    return cached_json_response(request, etag, lambda: build_related_payload(article_id, limit))
+
+def build_related_payload(article_id: str, limit: int) -> Dict[str, Any]:
+    try:
+        index = get_related_index()
+        index.refresh()
+        # Extra candidates stand in for any the store no longer holds
+        matches = index.related(article_id, limit * 2)
+        if matches is None:
+            return {"status": "error", "message": f"Article '{article_id}' not found in the related index"}
+        
+        articles = []
+        for match_id, source, segment, score in matches:
+            if len(articles) >= limit:
+                break
+            source_dir = os.path.join(SCRAPED_NEWS_DIR, source)
+            # The segment is only a hint; compaction may have moved the article
+            entry = store.find(source_dir, match_id, segment=os.path.join(source_dir, segment))
+            if entry is None:
+                continue
+            article = read_stored_article(entry.segment, entry)
+            articles.append({
+                "id": match_id,
+                "title": article.get('title'),
+                "url": article.get('url'),
+                "source": article.get('source'),
+                "published_date": article.get('published_date'),
+                "image_url": article.get('image_url'),
+                "score": score,
+            })
+        return {"status": "success", "id": article_id, "articles": articles, "count": len(articles)}
+    except Exception as e:
+        logger.error(f"Error finding related articles for {article_id}: {str(e)}")
+        return {"status": "error", "message": str(e)}
+
+@app.get("/api/cache-stats")
+async def get_cache_stats():
+    """Hit/miss/eviction statistics for the in-memory article cache and the thumbnail cache"""
+    return {
+        "status": "success",
+        "article_cache": article_cache.stats(),
+        "thumbnails": thumbnails.stats() if thumbnails is not None else None,
+    }
+
+@app.get("/img")
+def get_thumbnail(url: str, w: int = 400):
+    """Serve a resized, locally cached copy of an article image"""
+    # Snap to a few widths so the cache is not filled with near-duplicates
+    width = min(THUMBNAIL_WIDTHS, key=lambda candidate: abs(candidate - w))
+    try:
+        path = get_thumbnail_cache().get(url, width)
+    except ThumbnailError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    media_type = "image/jpeg" if path.endswith(".jpg") else None
+    return FileResponse(path, media_type=media_type, headers={"Cache-Control": "public, max-age=604800, immutable"})
+
 def get_news_sources() -> List[str]:
     """Get list of available news sources from the directory structure"""
-    if not os.path.exists(SCRAPED_NEWS_DIR):
-        return []
+    # Directory names are the source names (the scraper's index directories excluded)
+    return list_source_dirs(SCRAPED_NEWS_DIR)
+
+def read_stored_article(file_path: str, entry=None) -> ArticleRecord:
+    """Read an article from its segment index entry, or from a legacy JSON file"""
+    # Hot articles come from the in-memory cache; the stored dict is never mutated,
+    # changes go to the ArticleRecord built from it
+    if entry is not None:
+        # Compaction rewrites a segment under the same path, so an old (path, offset,
+        # length) can name another record: the segment's inode is part of the key,
+        # and a hit must still carry the entry's id
+        try:
+            inode = os.stat(entry.segment).st_ino
+        except OSError:
+            inode = None
+        key = entry.ref + (inode,)
+        data = article_cache.get_or_load(key, lambda: store.read_entry(entry))
+        if data.get("id") != entry.id:
+            data = store.read_entry(entry)
+            article_cache.put(key, data)
+        return ArticleRecord.from_dict(data, body_ref=entry, loader=store.read_entry)
     
-    # Get directory names as source names
-    sources = [
-        os.path.basename(path) 
-        for path in glob.glob(os.path.join(SCRAPED_NEWS_DIR, "*"))
-        if os.path.isdir(path)
-    ]
+    def load_json():
+        with open(file_path, 'r', encoding='utf-8') as f:
+            return json.load(f)
     
-    return sorted(sources)
+    # Legacy files can be edited in place, so their mtime is part of the key
+    data = article_cache.get_or_load((file_path, os.stat(file_path).st_mtime_ns), load_json)
+    return ArticleRecord.from_dict(data, body_ref=file_path)
 
-def load_articles_from_source(source: str, limit: int = 20) -> List[Dict[str, Any]]:
-    """Load articles from a specific source directory, with summaries"""
+def load_articles_from_source(source: str, limit: int = 20, fields: Optional[tuple] = LIST_FIELDS) -> List[Dict[str, Any]]:
+    """Load articles from a specific source directory, with summaries, projected to `fields` (None for all)"""
     source_dir = os.path.join(SCRAPED_NEWS_DIR, source)
     
     if not os.path.exists(source_dir):
         raise HTTPException(status_code=404, detail=f"Source '{source}' not found")
     
-    # Get all JSON files in the source directory
+    # Newest articles from the shared mmap index when it matches the current catalog,
+    # otherwise from the segment indexes (e.g. while a scrape is in progress),
+    # plus any legacy one-file-per-article JSON files
+    entries = None
+    index = get_article_index()
+    if index.is_current(catalog_version(SCRAPED_NEWS_DIR)):
+        entries = index.latest(source, limit)
+    if entries is None:
+        entries = store.latest(source_dir, limit)
+    candidates = [(entry.timestamp, entry.segment, entry) for entry in entries]
     json_files = glob.glob(os.path.join(source_dir, "*.json"))
+    candidates.extend((os.path.getmtime(path), path, None) for path in json_files)
     
-    if not json_files:
-        print(f"No JSON files found in {source_dir}")
+    if not candidates:
+        logger.debug(f"No articles found in {source_dir}")
         return []
     
-    # Debug: Print all file names
-    print(f"Found {len(json_files)} files in {source_dir}:")
-    for file in json_files[:5]:  # Show only first 5 to avoid too much output
-        print(f"  - {os.path.basename(file)}")
-    if len(json_files) > 5:
-        print(f"  - ... and {len(json_files) - 5} more files")
+    logger.debug(f"Found {len(candidates)} candidate articles in {source_dir}")
     
-    # Sort files by modification time (newest first) and limit
-    json_files = sorted(json_files, key=os.path.getmtime, reverse=True)[:limit]
+    # Sort by storage time (newest first) and limit
+    candidates = sorted(candidates, key=lambda c: c[0], reverse=True)[:limit]
     
     # Tracking seen titles within this source only
     seen_titles = set()
     
     articles = []
-    for file_path in json_files:
+    for timestamp, file_path, entry in candidates:
         try:
-            print(f"Processing file: {os.path.basename(file_path)}")
-            with open(file_path, 'r', encoding='utf-8') as f:
-                article = json.load(f)
-                
-                # Skip articles with duplicate titles within this source
-                if article.get('title') in seen_titles:
-                    print(f"    Skipping duplicate article: {article.get('title')}")
-                    continue
-                
-                # Add to seen titles
-                seen_titles.add(article.get('title'))
-                
-                # Normalize date field - some sources use "date" instead of "published_date"
-                if not article.get('published_date') and article.get('date'):
-                    article['published_date'] = article['date']
-                
-                # Normalize category field - some sources use "category" (string) instead of "categories" (array)
-                if not article.get('categories') and article.get('category'):
-                    if isinstance(article['category'], str):
-                        article['categories'] = [article['category']]
-                    elif isinstance(article['category'], list):
-                        article['categories'] = article['category']
-                
-                # Add summary if not already present
-                if 'content' in article and not article.get('summary'):
-                    try:
-                        # Summarize the content (max 100 words) with timeout protection
-                        content = article['content']
-                        if len(content) > 50000:  # If content is extremely large, truncate it
-                            content = content[:50000] + "..."
-                        
-                        # Use the preloaded model for summarization
-                        article['summary'] = summarizer_model.summarize(content, max_length=100)
-                    except Exception as e:
-                        print(f"Error summarizing article {file_path}: {str(e)}")
-                        article['summary'] = article.get('description', 'Summary not available')
-                
-                # Ensure we have a placeholder for missing data
-                if not article.get('author'):
-                    article['author'] = "Unknown Author"
+            article = read_stored_article(file_path, entry)
+            
+            # Skip articles with duplicate titles within this source
+            if article.get('title') in seen_titles:
+                logger.debug("Skipping duplicate article: %s", article.get('title'), extra=sampled(source=source))
+                continue
+            
+            # Add to seen titles
+            seen_titles.add(article.get('title'))
+            
+            # Normalize date field - some sources use "date" instead of "published_date"
+            if not article.get('published_date') and article.get('date'):
+                article['published_date'] = article['date']
+            
+            # Normalize category field - some sources use "category" (string) instead of "categories" (array)
+            if not article.get('categories') and article.get('category'):
+                if isinstance(article['category'], str):
+                    article['categories'] = [article['category']]
+                elif isinstance(article['category'], list):
+                    article['categories'] = article['category']
+            
+            # Add summary if not already present
+            if 'content' in article and not article.get('summary'):
+                try:
+                    # Summarize the content (max 100 words) with timeout protection
+                    content = article['content']
+                    if len(content) > 50000:  # If content is extremely large, truncate it
+                        content = content[:50000] + "..."
                     
-                if not article.get('image_url'):
-                    article['image_url'] = "/static/images/placeholder.jpg"
-                
-                # Validate image URLs
-                if article.get('image_url'):
-                    # Check if the URL starts with https:// or http://
-                    if not (article['image_url'].startswith('http://') or article['image_url'].startswith('https://')):
-                        article['image_url'] = "/static/images/placeholder.jpg"
-                
-                # Add file path for reference and make it part of a unique ID to distinguish articles with same title
-                article['file_path'] = os.path.basename(file_path)
-                article['id'] = os.path.basename(file_path).split('.')[0]
-                
-                articles.append(article)
-                print(f"    Article added successfully")
+                    # Fast summary now; an abstractive one replaces it once computed
+                    article_id = entry.id if entry else os.path.basename(file_path).split('.')[0]
+                    article['summary'] = summarizer_model.summarize(content, max_length=100, key=article_id, scope=source)
+                except Exception as e:
+                    logger.error(f"Error summarizing article {file_path}: {str(e)}")
+                    article['summary'] = article.get('description', 'Summary not available')
+            
+            # Ensure we have a placeholder for missing data
+            if not article.get('author'):
+                article['author'] = "Unknown Author"
                 
+            if not article.get('image_url'):
+                article['image_url'] = "/static/images/placeholder.jpg"
+            
+            # Validate image URLs
+            if article.get('image_url'):
+                # Check if the URL starts with https:// or http://
+                if not (article['image_url'].startswith('http://') or article['image_url'].startswith('https://')):
+                    article['image_url'] = "/static/images/placeholder.jpg"
+            
+            # Add file path for reference and make it part of a unique ID to distinguish articles with same title
+            article['file_path'] = os.path.basename(file_path)
+            article['id'] = entry.id if entry else os.path.basename(file_path).split('.')[0]
+            
+            articles.append(project_article(article, fields))
+            logger.debug("Loaded article %s", article['id'], extra=sampled(source=source, file=article['file_path']))
+            
         except json.JSONDecodeError as e:
-            print(f"Invalid JSON in file {file_path}: {str(e)}")
+            logger.error(f"Invalid JSON in file {file_path}: {str(e)}")
             continue
         except Exception as e:
-            print(f"Error loading article {file_path}: {str(e)}")
+            logger.error(f"Error loading article {file_path}: {str(e)}")
             continue
     
-    print(f"Loaded {len(articles)} unique articles from {source}")
+    logger.info(f"Loaded {len(articles)} unique articles from {source}")
     return articles
 
 # Run the FastAPI app with uvicorn if this file is executed directly
@@ -0,0 +1,172 @@
+"""
+Fast JSON responses for the API: orjson encoding, gzip/brotli compression and
+strong ETags with 304 revalidation.
+
+Encoded (and compressed) bodies are cached per ETag, so a repeat request for an
+unchanged list is answered from memory, and a request carrying a matching
+If-None-Match is answered with 304 before anything is loaded or serialized.
+"""
+
+import gzip
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+
+from fastapi import Request
+from fastapi.responses import Response
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional speedup
+    orjson = None
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - optional
+    brotli = None
+
+# Bodies smaller than this are sent uncompressed
+COMPRESSION_THRESHOLD = 1024
+# Total size of the encoded bodies kept in memory
+ENCODED_CACHE_MAX_BYTES = 32 * 1024 * 1024
+
+
+def dumps(payload) -> bytes:
+    """Serialize to compact JSON bytes, using orjson when available"""
+    if orjson is not None:
+        return orjson.dumps(payload, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+class FastJSONResponse(Response):
+    """JSONResponse replacement that renders with orjson"""
+
+    media_type = "application/json"
+
+    def render(self, content) -> bytes:
+        return dumps(content)
+
+
+def make_etag(*parts) -> str:
+    """Strong ETag derived from the catalog version and request parameters"""
+    digest = hashlib.sha1("|".join(str(p) for p in parts).encode("utf-8")).hexdigest()
+    return f'"{digest[:32]}"'
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    return etag in [tag.strip() for tag in header.split(",")]
+
+
+def not_modified(etag: str) -> Response:
+    return Response(status_code=304, headers={"ETag": etag, "Cache-Control": "no-cache"})
+
+
+def choose_encoding(request: Request):
+    accepted = request.headers.get("accept-encoding", "").lower()
+    if brotli is not None and "br" in accepted:
+        return "br"
+    if "gzip" in accepted:
+        return "gzip"
+    return None
+
+
+def compress(body: bytes, encoding):
+    if encoding == "br":
+        return brotli.compress(body, quality=5)
+    if encoding == "gzip":
+        return gzip.compress(body, compresslevel=6)
+    return body
+
+
+class EncodedBodyCache:
+    """LRU of serialized (and compressed) bodies keyed by ETag and encoding, bounded by bytes"""
+
+    def __init__(self, max_bytes=ENCODED_CACHE_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.bytes = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            body = self._entries.get(key)
+            if body is not None:
+                self._entries.move_to_end(key)
+            return body
+
+    def put(self, key, body):
+        with self._lock:
+            # A body larger than the whole budget would only evict everything else
+            if len(body) > self.max_bytes:
+                return
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self.bytes -= len(old)
+            self._entries[key] = body
+            self.bytes += len(body)
+            while self.bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self.bytes -= len(evicted)
+
+
+body_cache = EncodedBodyCache()
+
+
+def cached_json_response(request: Request, etag: str, build_payload) -> Response:
+    """
+    Answer a GET with ETag revalidation and compression.
+
+    build_payload is only called when neither the client nor the body cache
+    already has the representation for this ETag.
+    """
+    if etag_matches(request, etag):
+        return not_modified(etag)
+
+    raw = body_cache.get((etag, None))
+    if raw is None:
+        payload = build_payload()
+        raw = dumps(payload)
+        # Error payloads are sent as-is and never cached under the ETag
+        if isinstance(payload, dict) and payload.get("status") == "error":
+            return encoded_response(request, raw)
+        body_cache.put((etag, None), raw)
+
+    return encoded_response(request, raw, etag=etag)
+
+
+def prime_json_cache(etag: str, build_payload) -> bool:
+    """Build and cache the body for an ETag ahead of the first request; False if it was an error"""
+    if body_cache.get((etag, None)) is not None:
+        return True
+    payload = build_payload()
+    if isinstance(payload, dict) and payload.get("status") == "error":
+        return False
+    body_cache.put((etag, None), dumps(payload))
+    return True
+
+
+def encoded_response(request: Request, raw: bytes, etag=None, status_code=200) -> Response:
+    """Build a response from serialized JSON, compressing it when worthwhile"""
+    headers = {"Vary": "Accept-Encoding"}
+    if etag:
+        headers["ETag"] = etag
+        headers["Cache-Control"] = "no-cache"
+
+    body = raw
+    encoding = choose_encoding(request) if len(raw) >= COMPRESSION_THRESHOLD else None
+    if encoding:
+        cache_key = (etag, encoding) if etag else None
+        body = body_cache.get(cache_key) if cache_key else None
+        if body is None:
+            body = compress(raw, encoding)
+            if cache_key:
+                body_cache.put(cache_key, body)
+        headers["Content-Encoding"] = encoding
+
+    return Response(content=body, status_code=status_code, media_type="application/json", headers=headers)
@@ -173,7 +173,10 @@ document.addEventListener('DOMContentLoaded', () => {
         card.style.opacity = '0'; // Start invisible for fade-in effect
         
         // Image with lazy loading
-        const imgSrc = article.image_url || '/static/images/placeholder.jpg';
+        // Remote images go through the local thumbnail cache instead of being hotlinked
+        const imgSrc = article.image_url && /^https?:\/\//.test(article.image_url)
+            ? `/img?url=${encodeURIComponent(article.image_url)}&w=400`
+            : (article.image_url || '/static/images/placeholder.jpg');
         const imgAlt = article.title || 'News article';
         
         // Format date if available
@@ -0,0 +1,225 @@
+"""
+On-disk thumbnail cache behind the /img endpoint.
+
+Article images are fetched once, resized to a small width and stored on disk,
+so the browser no longer hotlinks full-size originals. The cache is an LRU
+bounded by total bytes: hits refresh a file's mtime and the least recently used
+thumbnails are evicted when the cap is exceeded.
+
+/img fetches arbitrary URLs, so every hop (the URL and each redirect target)
+must resolve to public addresses only, and the connection is made to the very
+address that was checked, so DNS cannot be rebound between check and connect.
+"""
+
+import hashlib
+import io
+import ipaddress
+import os
+import socket
+import threading
+from urllib.parse import urljoin, urlparse
+
+import certifi
+import urllib3
+
+try:
+    from PIL import Image
+except ImportError:  # pragma: no cover - without Pillow originals are cached unresized
+    Image = None
+
+USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
+REDIRECT_STATUSES = (301, 302, 303, 307, 308)
+
+
+class ThumbnailError(Exception):
+    """The image could not be fetched or is not allowed"""
+
+
+class ThumbnailCache:
+    """Fetches, resizes and caches thumbnails on disk with an LRU size cap"""
+
+    def __init__(self, cache_dir, max_bytes=200 * 1024 * 1024, timeout=10,
+                 max_source_bytes=10 * 1024 * 1024, quality=80, max_redirects=3):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.timeout = timeout
+        self.max_source_bytes = max_source_bytes
+        self.quality = quality
+        self.max_redirects = max_redirects
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        # Per-key locks so concurrent requests for one image fetch it only once
+        self._key_locks = {}
+
+        os.makedirs(cache_dir, exist_ok=True)
+        self.total_bytes = sum(
+            entry.stat().st_size for entry in os.scandir(cache_dir) if entry.is_file()
+        )
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, key + (".jpg" if Image is not None else ".img"))
+
+    def _key_lock(self, key):
+        with self._lock:
+            return self._key_locks.setdefault(key, threading.Lock())
+
+    def get(self, url, width):
+        """Return the path of a cached thumbnail, fetching and resizing it on a miss"""
+        key = hashlib.sha1(f"{url}|{width}".encode("utf-8")).hexdigest()
+        path = self._path(key)
+
+        try:
+            with self._key_lock(key):
+                if os.path.exists(path):
+                    os.utime(path)  # mark as recently used
+                    with self._lock:
+                        self.hits += 1
+                    return path
+
+                with self._lock:
+                    self.misses += 1
+                data = self._resize(self._download(url), width)
+
+                tmp_path = f"{path}.{threading.get_ident()}.tmp"
+                with open(tmp_path, 'wb') as f:
+                    f.write(data)
+                os.replace(tmp_path, path)
+        finally:
+            with self._lock:
+                self._key_locks.pop(key, None)
+
+        with self._lock:
+            self.total_bytes += len(data)
+        self._evict()
+        return path
+
+    def _check_url(self, url):
+        """
+        Validate a URL and resolve its host.
+
+        Returns:
+            tuple: (parsed URL, the public address to connect to)
+        """
+        parsed = urlparse(url)
+        if parsed.scheme not in ("http", "https") or not parsed.hostname:
+            raise ThumbnailError("Only absolute http(s) image URLs are allowed")
+        # Refuse to proxy requests into the local network: every address the
+        # host resolves to must be public
+        try:
+            infos = socket.getaddrinfo(parsed.hostname, parsed.port, proto=socket.IPPROTO_TCP)
+        except (socket.gaierror, UnicodeError, ValueError):
+            raise ThumbnailError(f"Cannot resolve {parsed.hostname}")
+        addresses = []
+        for info in infos:
+            address = ipaddress.ip_address(info[4][0].split("%")[0])
+            if address.version == 6 and address.ipv4_mapped:
+                address = address.ipv4_mapped
+            if not address.is_global or address.is_multicast:
+                raise ThumbnailError("Image host resolves to a private address")
+            addresses.append(address)
+        if not addresses:
+            raise ThumbnailError(f"Cannot resolve {parsed.hostname}")
+        return parsed, str(addresses[0])
+
+    def _open(self, parsed, address):
+        """GET a URL from the already validated address, without following redirects; returns (pool, response)"""
+        host = f"[{parsed.hostname}]" if ":" in parsed.hostname else parsed.hostname
+        if parsed.port:
+            host = f"{host}:{parsed.port}"
+        path = (parsed.path or "/") + (f"?{parsed.query}" if parsed.query else "")
+        timeout = urllib3.Timeout(total=self.timeout)
+        if parsed.scheme == "https":
+            # TLS still verifies the certificate for the hostname, not the address
+            pool = urllib3.HTTPSConnectionPool(
+                address, port=parsed.port or 443, timeout=timeout, maxsize=1,
+                cert_reqs="CERT_REQUIRED", ca_certs=certifi.where(),
+                server_hostname=parsed.hostname, assert_hostname=parsed.hostname
+            )
+        else:
+            pool = urllib3.HTTPConnectionPool(address, port=parsed.port or 80, timeout=timeout, maxsize=1)
+        try:
+            return pool, pool.urlopen(
+                "GET", path, headers={"Host": host, "User-Agent": USER_AGENT},
+                redirect=False, retries=False, preload_content=False
+            )
+        except urllib3.exceptions.HTTPError as e:
+            pool.close()
+            raise ThumbnailError(f"Failed to fetch image: {str(e)}")
+
+    def _download(self, url):
+        # Redirects are followed here, so each target is checked like the original URL
+        for _ in range(self.max_redirects + 1):
+            pool, response = self._open(*self._check_url(url))
+            if response.status not in REDIRECT_STATUSES:
+                break
+            location = response.headers.get("Location")
+            pool.close()
+            if not location:
+                raise ThumbnailError("Redirect without a Location")
+            url = urljoin(url, location)
+        else:
+            raise ThumbnailError("Too many redirects")
+
+        try:
+            if response.status >= 400:
+                raise ThumbnailError(f"Failed to fetch image: HTTP {response.status}")
+            if not response.headers.get("Content-Type", "").startswith("image/"):
+                raise ThumbnailError("URL did not return an image")
+
+            data = bytearray()
+            for chunk in response.stream(64 * 1024):
+                data.extend(chunk)
+                if len(data) > self.max_source_bytes:
+                    raise ThumbnailError("Image is too large")
+            return bytes(data)
+        except urllib3.exceptions.HTTPError as e:
+            raise ThumbnailError(f"Failed to fetch image: {str(e)}")
+        finally:
+            pool.close()
+
+    def _resize(self, data, width):
+        if Image is None:
+            return data
+        try:
+            with Image.open(io.BytesIO(data)) as image:
+                image = image.convert("RGB")
+                if image.width > width:
+                    height = max(1, round(image.height * width / image.width))
+                    image = image.resize((width, height), Image.LANCZOS)
+                out = io.BytesIO()
+                image.save(out, format="JPEG", quality=self.quality, optimize=True, progressive=True)
+                return out.getvalue()
+        except Exception as e:
+            raise ThumbnailError(f"Could not decode image: {str(e)}")
+
+    def _evict(self):
+        """Delete least recently used thumbnails until the cache fits its byte cap"""
+        with self._lock:
+            if self.total_bytes <= self.max_bytes:
+                return
+            files = sorted(
+                (entry for entry in os.scandir(self.cache_dir) if entry.is_file() and not entry.name.endswith(".tmp")),
+                key=lambda entry: entry.stat().st_mtime
+            )
+            for entry in files:
+                if self.total_bytes <= self.max_bytes:
+                    break
+                try:
+                    size = entry.stat().st_size
+                    os.remove(entry.path)
+                except OSError:
+                    continue
+                self.total_bytes -= size
+                self.evictions += 1
+
+    def stats(self):
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "bytes": self.total_bytes,
+                "max_bytes": self.max_bytes,
+            }
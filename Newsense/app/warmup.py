@@ -0,0 +1,152 @@
+"""
+Background warm-up for the web app.
+
+At startup the newest articles of every source are loaded and summarized in a
+background thread, so the first visitor of a source does not pay for reading
+segments and running the summarizer. Sources are warmed in order of how often
+they were requested recently; those counts decay over time and are saved to a
+small JSON file so the order survives restarts.
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+
+logger = logging.getLogger("Newsense.warmup")
+
+
+class SourceRequestStats:
+    """Time-decayed request counts per source, persisted across restarts"""
+
+    def __init__(self, path, half_life=3 * 86400, save_interval=60):
+        """
+        Args:
+            path (str): JSON file holding {source: [score, updated]}
+            half_life (float): Seconds after which a request counts half as much
+            save_interval (float): Minimum seconds between saves triggered by record()
+        """
+        self.path = path
+        self.half_life = half_life
+        self.save_interval = save_interval
+        self._pending = {}
+        self._last_save = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _decayed(self, score, updated, now):
+        return score * 2.0 ** (-max(now - updated, 0) / self.half_life)
+
+    def _read(self):
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                return {name: tuple(value) for name, value in json.load(f).items()}
+        except (OSError, ValueError, TypeError):
+            return {}
+
+    def record(self, source):
+        """Count one request for a source (saved at most every save_interval seconds)"""
+        with self._lock:
+            self._pending[source] = self._pending.get(source, 0) + 1
+            due = time.monotonic() - self._last_save >= self.save_interval
+        if due:
+            self.save()
+
+    def save(self):
+        """Merge pending counts into the file; other worker processes' counts are kept"""
+        with self._lock:
+            self._last_save = time.monotonic()
+            if not self._pending:
+                return
+            now = time.time()
+            data = self._read()
+            for name, count in self._pending.items():
+                score, updated = data.get(name, (0.0, now))
+                data[name] = [self._decayed(score, updated, now) + count, now]
+            self._pending = {}
+
+            try:
+                os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+                tmp_path = f"{self.path}.{os.getpid()}.tmp"
+                with open(tmp_path, 'w', encoding='utf-8') as f:
+                    json.dump(data, f)
+                os.replace(tmp_path, self.path)
+            except OSError as e:
+                logger.error(f"Error saving source request stats: {str(e)}")
+
+    def scores(self):
+        """Current decayed score of every source seen so far"""
+        now = time.time()
+        with self._lock:
+            scores = {name: self._decayed(score, updated, now) for name, (score, updated) in self._read().items()}
+            for name, count in self._pending.items():
+                scores[name] = scores.get(name, 0.0) + count
+        return scores
+
+    def order(self, sources):
+        """Sources sorted by recent request frequency, most requested first"""
+        scores = self.scores()
+        return sorted(sources, key=lambda name: (-scores.get(name, 0.0), name))
+
+
+class WarmupTask:
+    """Runs a warm-up function for each source in a daemon thread and tracks progress"""
+
+    def __init__(self):
+        self.status = "pending"
+        self.sources = []
+        self.completed = 0
+        self.failed = []
+        self.current = None
+        self.started = None
+        self.finished = None
+        self._thread = None
+
+    def start(self, sources, warm):
+        """
+        Start warming sources in the background.
+
+        Args:
+            sources (list): Source names, in the order they should be warmed
+            warm (callable): Called with each source name; exceptions mark it failed
+        """
+        if self._thread is not None and self._thread.is_alive():
+            return False
+        self.status = "running"
+        self.sources = list(sources)
+        self.completed = 0
+        self.failed = []
+        self.started = time.time()
+        self.finished = None
+        self._thread = threading.Thread(target=self._run, args=(warm,), name="newsense-warmup", daemon=True)
+        self._thread.start()
+        return True
+
+    def _run(self, warm):
+        for source in self.sources:
+            self.current = source
+            try:
+                warm(source)
+            except Exception as e:
+                logger.warning(f"Warm-up failed for {source}: {str(e)}")
+                self.failed.append(source)
+            self.completed += 1
+        self.current = None
+        self.finished = time.time()
+        self.status = "done"
+        logger.info(f"Warm-up finished: {self.completed - len(self.failed)}/{len(self.sources)} sources "
+                    f"in {self.finished - self.started:.1f}s")
+
+    def progress(self):
+        """Warm-up state for the readiness endpoint"""
+        elapsed = None
+        if self.started is not None:
+            elapsed = round((self.finished or time.time()) - self.started, 2)
+        return {
+            "status": self.status,
+            "completed": self.completed,
+            "total": len(self.sources),
+            "failed": list(self.failed),
+            "current": self.current,
+            "elapsed_seconds": elapsed,
+        }
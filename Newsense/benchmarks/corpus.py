@@ -0,0 +1,136 @@
+"""
+Synthetic news corpus for offline benchmarks.
+
+Every article is generated deterministically from its index, so the HTTP
+stand-in, the JSON articles on disk and the categorization inputs all agree
+without ever touching the network.
+"""
+
+import datetime
+import random
+from email.utils import format_datetime
+from html import escape
+
+# Words mixed into every article so determine_categories has real work to do
+CATEGORY_WORDS = [
+    "government", "election", "minister", "economy", "market", "company", "startup",
+    "software", "internet", "smartphone", "film", "music", "television", "match",
+    "football", "tournament", "research", "scientist", "climate", "hospital", "vaccine",
+    "doctor", "international", "border", "treaty",
+]
+
+FILLER_WORDS = [
+    "the", "a", "report", "said", "on", "monday", "officials", "new", "plans", "after",
+    "week", "city", "people", "local", "during", "year", "announced", "expected", "could",
+    "while", "their", "first", "more", "than", "has", "been", "over", "into", "also",
+]
+
+SOURCE_NAME = "Synthetic"
+
+
+def _rng(index, seed=0):
+    return random.Random(seed * 1_000_003 + index)
+
+
+def make_sentence(rng, length=14):
+    """Build one pseudo-English sentence"""
+    words = [rng.choice(FILLER_WORDS) for _ in range(length)]
+    for _ in range(2):
+        words[rng.randrange(length)] = rng.choice(CATEGORY_WORDS)
+    return " ".join(words).capitalize() + "."
+
+
+def make_article(index, seed=0, base_url="http://localhost", paragraphs=6, now=None):
+    """Build the article dict that the scraper would produce for this index"""
+    rng = _rng(index, seed)
+    now = now or datetime.datetime.now(datetime.timezone.utc)
+    published = now - datetime.timedelta(minutes=rng.randrange(0, 24 * 60))
+    title = " ".join(rng.choice(CATEGORY_WORDS + FILLER_WORDS) for _ in range(8)).capitalize()
+    body = [
+        " ".join(make_sentence(rng) for _ in range(5))
+        for _ in range(paragraphs)
+    ]
+    content = "\n\n".join(body)
+    url = f"{base_url}/news/{index}"
+    image_url = f"{base_url}/images/{index}.jpg"
+    html = render_article_html(title, body, published, image_url)
+
+    return {
+        "title": title,
+        "content": content,
+        "url": url,
+        "source": SOURCE_NAME,
+        "published_date": published.isoformat(),
+        "scraped_date": now.isoformat(),
+        "html": html,
+        "authors": [f"Reporter {index % 97}"],
+        "keywords": sorted(set(w for w in content.lower().split() if w in CATEGORY_WORDS))[:10],
+        "summary": "",
+        "categories": ["general"],
+        "image_url": image_url,
+    }
+
+
+def render_article_html(title, paragraphs, published, image_url):
+    """Render a minimal article page that newspaper3k can parse"""
+    body = "\n".join(f"<p>{escape(p)}</p>" for p in paragraphs)
+    return (
+        "<!DOCTYPE html><html><head>"
+        f"<title>{escape(title)}</title>"
+        f'<meta property="og:title" content="{escape(title)}">'
+        f'<meta property="og:image" content="{escape(image_url)}">'
+        f'<meta property="article:published_time" content="{published.isoformat()}">'
+        "</head><body>"
+        f"<article><h1>{escape(title)}</h1>{body}</article>"
+        "</body></html>"
+    )
+
+
+def render_homepage(count, base_url=""):
+    """Render a homepage with links to the first `count` articles plus some noise links"""
+    links = []
+    for i in range(count):
+        links.append(f'<li><a href="{base_url}/news/{i}">Story {i}</a></li>')
+        if i % 5 == 0:
+            links.append('<li><a href="#top">Back to top</a></li>')
+            links.append(f'<li><a href="https://twitter.com/share?u={i}">Share</a></li>')
+    return (
+        "<!DOCTYPE html><html><head><title>Synthetic News</title></head><body>"
+        f"<nav><a href=\"/\">Home</a><a href=\"/about\">About</a></nav><ul>{''.join(links)}</ul>"
+        "</body></html>"
+    )
+
+
+def render_rss(count, base_url, seed=0, now=None):
+    """Render an RSS 2.0 feed with `count` items pointing at the stand-in server"""
+    now = now or datetime.datetime.now(datetime.timezone.utc)
+    items = []
+    for i in range(count):
+        rng = _rng(i, seed)
+        published = now - datetime.timedelta(minutes=rng.randrange(0, 24 * 60))
+        title = f"Synthetic story {i}"
+        items.append(
+            "<item>"
+            f"<title>{escape(title)}</title>"
+            f"<link>{base_url}/news/{i}</link>"
+            f"<guid>{base_url}/news/{i}</guid>"
+            f"<pubDate>{format_datetime(published)}</pubDate>"
+            f'<media:content url="{base_url}/images/{i}.jpg" medium="image"/>'
+            "</item>"
+        )
+    return (
+        '<?xml version="1.0" encoding="UTF-8"?>'
+        '<rss version="2.0" xmlns:media="http://search.yahoo.com/mrss/"><channel>'
+        "<title>Synthetic feed</title>"
+        f"<link>{base_url}/</link>"
+        "<description>Generated for benchmarks</description>"
+        f"{''.join(items)}"
+        "</channel></rss>"
+    )
+
+
+def iter_articles(count, seed=0, base_url="http://localhost"):
+    """Yield `count` synthetic article dicts"""
+    now = datetime.datetime.now(datetime.timezone.utc)
+    for i in range(count):
+        yield make_article(i, seed=seed, base_url=base_url, now=now)
@@ -0,0 +1,96 @@
+"""
+Local HTTP stand-in for the news sites.
+
+Serves a generated homepage, RSS feed and article pages from benchmarks.corpus
+on 127.0.0.1 so the scraper can be timed without network access.
+"""
+
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+from benchmarks import corpus
+
+# 1x1 transparent GIF served for every image URL
+PIXEL = (
+    b"GIF89a\x01\x00\x01\x00\x80\x00\x00\x00\x00\x00\xff\xff\xff!\xf9\x04\x01\x00"
+    b"\x00\x00\x00,\x00\x00\x00\x00\x01\x00\x01\x00\x00\x02\x02D\x01\x00;"
+)
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        # Keep benchmark output clean
+        pass
+
+    def _send(self, status, body, content_type):
+        if isinstance(body, str):
+            body = body.encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        parsed = urlparse(self.path)
+        query = parse_qs(parsed.query)
+        count = int(query.get("n", [self.server.article_count])[0])
+        base_url = f"http://{self.headers.get('Host', self.server.host)}"
+        self.server.request_count += 1
+
+        if parsed.path in ("/", "/index.html"):
+            self._send(200, corpus.render_homepage(count), "text/html; charset=utf-8")
+        elif parsed.path == "/feed.xml":
+            self._send(200, corpus.render_rss(count, base_url, seed=self.server.seed), "application/rss+xml")
+        elif parsed.path.startswith("/news/"):
+            try:
+                index = int(parsed.path.rsplit("/", 1)[-1])
+            except ValueError:
+                self._send(404, "not found", "text/plain")
+                return
+            article = corpus.make_article(index, seed=self.server.seed, base_url=base_url)
+            self._send(200, article["html"], "text/html; charset=utf-8")
+        elif parsed.path.startswith("/images/"):
+            self._send(200, PIXEL, "image/gif")
+        else:
+            self._send(404, "not found", "text/plain")
+
+
+class StubNewsServer:
+    """Context manager running the stand-in server on a background thread"""
+
+    def __init__(self, article_count=100, seed=0, host="127.0.0.1", port=0):
+        self.httpd = ThreadingHTTPServer((host, port), _Handler)
+        self.httpd.daemon_threads = True
+        self.httpd.article_count = article_count
+        self.httpd.seed = seed
+        self.httpd.host = host
+        self.httpd.request_count = 0
+        self.thread = None
+
+    @property
+    def base_url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def request_count(self):
+        return self.httpd.request_count
+
+    def start(self):
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
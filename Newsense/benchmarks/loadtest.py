@@ -0,0 +1,271 @@
+"""
+Concurrent load test for the web app.
+
+Starts the app with uvicorn against a synthetic corpus (or targets a running
+server), then lets a number of simulated users issue requests back to back for
+a fixed duration. Each request picks an endpoint at random according to the
+configured mix. Throughput and latency percentiles are reported per endpoint
+and saved next to the benchmark results, so a change to the serving path can
+be compared with a run from before it.
+"""
+
+import asyncio
+import datetime
+import json
+import math
+import os
+import random
+import socket
+import subprocess
+import sys
+import time
+
+import httpx
+
+from benchmarks import corpus
+from benchmarks.suite import RESULTS_DIR, BenchmarkContext, _ensure_corpus, _git_revision, _make_scraper, _quiet
+
+# Relative weights of the endpoints requested by simulated users. refresh-news
+# scrapes the live sites, so it is only exercised when asked for explicitly
+DEFAULT_MIX = {"articles": 8, "sources": 1, "article": 1}
+ENDPOINTS = ("articles", "sources", "article", "related", "trending", "refresh")
+PERCENTILES = (50, 95, 99)
+
+
+def parse_mix(spec):
+    """Parse "articles=8,sources=1" into endpoint weights"""
+    mix = {}
+    for part in spec.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in ENDPOINTS:
+            raise ValueError(f"Unknown endpoint '{name}' (choose from {', '.join(ENDPOINTS)})")
+        mix[name] = float(weight) if weight else 1.0
+    if not any(weight > 0 for weight in mix.values()):
+        raise ValueError("The endpoint mix needs at least one positive weight")
+    return mix
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return None
+    rank = max(1, math.ceil(pct / 100.0 * len(sorted_values)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+class AppServer:
+    """The web app running under uvicorn in a child process, serving a given data directory"""
+
+    def __init__(self, data_dir, workers=1, port=None):
+        self.data_dir = data_dir
+        self.workers = workers
+        self.port = port or _free_port()
+        self.url = f"http://127.0.0.1:{self.port}"
+        self.process = None
+
+    def start(self, timeout=300):
+        env = dict(os.environ, NEWSENSE_DATA_DIR=os.path.abspath(self.data_dir))
+        command = [sys.executable, "-m", "uvicorn", "app.main:app", "--host", "127.0.0.1",
+                   "--port", str(self.port), "--workers", str(self.workers), "--log-level", "warning"]
+        self.process = subprocess.Popen(command, env=env, stdout=subprocess.DEVNULL)
+        wait_until_ready(self.url, timeout, process=self.process)
+        return self
+
+    def stop(self):
+        if self.process is not None and self.process.poll() is None:
+            self.process.terminate()
+            try:
+                self.process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
+
+
+def wait_until_ready(url, timeout=300, warmed=True, process=None):
+    """Poll /api/ready until the app is ready (and, if warmed, its warm-up has finished)"""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process is not None and process.poll() is not None:
+            raise RuntimeError(f"App server exited with status {process.returncode}")
+        try:
+            response = httpx.get(f"{url}/api/ready", timeout=5)
+            if response.status_code == 200:
+                warmup = response.json().get("warmup", {})
+                if not warmed or warmup.get("status") in ("done", "pending"):
+                    return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.5)
+    raise TimeoutError(f"App at {url} was not ready after {timeout}s")
+
+
+async def discover_targets(client, source=None):
+    """Source and article ids the simulated users request"""
+    sources = (await client.get("/api/sources")).json().get("sources", [])
+    source = source or (corpus.SOURCE_NAME if corpus.SOURCE_NAME in sources else (sources[0] if sources else None))
+    if source is None:
+        raise RuntimeError("The app has no sources to request")
+    payload = (await client.get(f"/api/articles/{source}", params={"limit": 100, "fields": "id"})).json()
+    ids = [article["id"] for article in payload.get("articles", []) if article.get("id")]
+    return source, ids
+
+
+def _request_for(name, source, ids, rng):
+    if name == "sources":
+        return "/api/sources", None
+    if name == "articles":
+        return f"/api/articles/{source}", None
+    if name == "article":
+        return f"/api/article/{rng.choice(ids)}", {"source": source}
+    if name == "related":
+        return f"/api/articles/{rng.choice(ids)}/related", None
+    if name == "trending":
+        return "/api/trending", None
+    return "/api/refresh-news", None
+
+
+async def _user(client, mix, source, ids, deadline, samples, errors, seed):
+    rng = random.Random(seed)
+    names = [name for name, weight in mix.items() if weight > 0 and (ids or name not in ("article", "related"))]
+    weights = [mix[name] for name in names]
+    while time.monotonic() < deadline:
+        name = rng.choices(names, weights)[0]
+        path, params = _request_for(name, source, ids, rng)
+        start = time.perf_counter()
+        try:
+            response = await client.get(path, params=params)
+            ok = response.status_code < 400 and b'"status":"error"' not in response.content[:64]
+        except httpx.HTTPError:
+            ok = False
+        elapsed = time.perf_counter() - start
+        samples.setdefault(name, []).append(elapsed)
+        if not ok:
+            errors[name] = errors.get(name, 0) + 1
+
+
+async def run_load(url, mix, concurrency=32, duration=30.0, source=None, timeout=60.0, seed=0):
+    """
+    Drive the app with `concurrency` closed-loop users for `duration` seconds.
+
+    Returns:
+        dict: Overall and per-endpoint request counts, errors, throughput and latency percentiles
+    """
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=url, timeout=timeout, limits=limits) as client:
+        source, ids = await discover_targets(client, source)
+        samples, errors = {}, {}
+        started = time.monotonic()
+        deadline = started + duration
+        await asyncio.gather(*[
+            _user(client, mix, source, ids, deadline, samples, errors, seed + i)
+            for i in range(concurrency)
+        ])
+        elapsed = time.monotonic() - started
+
+    endpoints = {name: _latency_summary(values, errors.get(name, 0), elapsed) for name, values in samples.items()}
+    overall = _latency_summary([v for values in samples.values() for v in values], sum(errors.values()), elapsed)
+    return {"source": source, "elapsed_seconds": round(elapsed, 3), "overall": overall, "endpoints": endpoints}
+
+
+def _latency_summary(values, errors, elapsed):
+    values = sorted(values)
+    summary = {
+        "requests": len(values),
+        "errors": errors,
+        "throughput_rps": round(len(values) / elapsed, 2) if elapsed else None,
+        "mean_ms": round(sum(values) * 1000 / len(values), 3) if values else None,
+        "max_ms": round(values[-1] * 1000, 3) if values else None,
+    }
+    for pct in PERCENTILES:
+        value = percentile(values, pct)
+        summary[f"p{pct}_ms"] = round(value * 1000, 3) if value is not None else None
+    return summary
+
+
+def print_report(result):
+    print(f"\n{'endpoint':<12} {'requests':>9} {'errors':>7} {'req/s':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+    rows = sorted(result["endpoints"].items()) + [("overall", result["overall"])]
+    for name, entry in rows:
+        print(f"{name:<12} {entry['requests']:>9} {entry['errors']:>7} {entry['throughput_rps']:>9} "
+              f"{entry['p50_ms']:>9} {entry['p95_ms']:>9} {entry['p99_ms']:>9}")
+
+
+def save_report(document, output_dir=RESULTS_DIR):
+    """Write a load test report to a timestamped JSON file"""
+    os.makedirs(output_dir, exist_ok=True)
+    stamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+    path = os.path.join(output_dir, f"loadtest_{stamp}.json")
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(document, f, indent=2, sort_keys=True)
+    return path
+
+
+def compare_reports(baseline, current, threshold=1.2):
+    """Print p95 latency and throughput against a baseline report and return the regressed endpoints"""
+    regressions = []
+    print(f"\n{'endpoint':<12} {'base p95':>10} {'p95':>10} {'ratio':>7} {'base rps':>10} {'rps':>10}")
+    rows = sorted(current["result"]["endpoints"].items()) + [("overall", current["result"]["overall"])]
+    for name, entry in rows:
+        old = baseline["result"]["overall"] if name == "overall" else baseline["result"]["endpoints"].get(name)
+        if not old or not old.get("p95_ms") or not entry.get("p95_ms"):
+            continue
+        ratio = entry["p95_ms"] / old["p95_ms"]
+        flag = "  REGRESSION" if ratio > threshold else ""
+        print(f"{name:<12} {old['p95_ms']:>10} {entry['p95_ms']:>10} {ratio:>7.2f} "
+              f"{old['throughput_rps']:>10} {entry['throughput_rps']:>10}{flag}")
+        if flag:
+            regressions.append(name)
+    return regressions
+
+
+def prepare_corpus(ctx, size):
+    """Generate (or reuse) a synthetic corpus of `size` articles with its indexes published"""
+    with _quiet():
+        data_dir = _ensure_corpus(ctx, size)
+        _make_scraper(data_dir).publish_index()
+    return data_dir
+
+
+def run(url=None, size=1000, workers=1, mix=None, concurrency=32, duration=30.0, workdir=None):
+    """Run one load test, starting (and stopping) a local app unless url is given"""
+    mix = mix or DEFAULT_MIX
+    ctx = BenchmarkContext(workdir=workdir)
+    server = None
+    try:
+        if url is None:
+            print(f"Preparing a corpus of {size} articles...")
+            data_dir = prepare_corpus(ctx, size)
+            print(f"Starting the app with {workers} worker(s)...")
+            server = AppServer(data_dir, workers=workers).start()
+            url = server.url
+        else:
+            wait_until_ready(url)
+
+        print(f"Running {concurrency} users for {duration:.0f}s against {url} (mix: {mix})")
+        result = asyncio.run(run_load(url, mix, concurrency=concurrency, duration=duration))
+    finally:
+        if server is not None:
+            server.stop()
+        ctx.cleanup()
+
+    return {
+        "meta": {
+            "created": datetime.datetime.now().isoformat(timespec="seconds"),
+            "git_revision": _git_revision(),
+            "python": sys.version.split()[0],
+            "cpu_count": os.cpu_count(),
+            "url": url if server is None else None,
+            "corpus_size": size if server is not None else None,
+            "workers": workers if server is not None else None,
+            "concurrency": concurrency,
+            "duration": duration,
+            "mix": mix,
+        },
+        "result": result,
+    }
@@ -0,0 +1,366 @@
+"""
+Offline benchmark suite for the scraper and the article loading path.
+
+Each benchmark runs at several corpus sizes and reports wall-clock timings.
+Results are written as JSON keyed by "<benchmark>[n=<size>]" so two runs can be
+compared key by key to spot regressions.
+"""
+
+import asyncio
+import contextlib
+import datetime
+import json
+import logging
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from benchmarks import corpus
+from benchmarks.http_stub import StubNewsServer
+
+DEFAULT_SIZES = [1000, 10000, 100000]
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
+
+
+def _summarize(name, size, runs, items):
+    """Turn raw run timings into a result entry"""
+    median = statistics.median(runs)
+    return {
+        "benchmark": name,
+        "size": size,
+        "items": items,
+        "runs": [round(r, 6) for r in runs],
+        "seconds": round(median, 6),
+        "min_seconds": round(min(runs), 6),
+        "per_item_ms": round(median * 1000 / items, 4) if items else None,
+    }
+
+
+def _timed(fn, repeat):
+    """Run fn `repeat` times and return the list of durations"""
+    runs = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        runs.append(time.perf_counter() - start)
+    return runs
+
+
+@contextlib.contextmanager
+def _quiet():
+    """Silence print() chatter from the code under test"""
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        yield
+
+
+def _make_scraper(output_dir):
+    from scrapper.main import EnhancedNewsScraper
+
+    scraper = EnhancedNewsScraper(output_dir=output_dir, days_threshold=2)
+    # Per-article INFO lines would swamp the console at 100k articles
+    logging.getLogger().setLevel(logging.WARNING)
+    return scraper
+
+
+class BenchmarkContext:
+    """Shared state for one benchmark run: a scratch directory and settings"""
+
+    def __init__(self, workdir=None, repeat=3, scrape_limit=500, seed=0):
+        self.owns_workdir = workdir is None
+        self.workdir = workdir or tempfile.mkdtemp(prefix="newsense_bench_")
+        self.repeat = repeat
+        self.scrape_limit = scrape_limit
+        self.seed = seed
+
+    def corpus_dir(self, size):
+        return os.path.join(self.workdir, f"corpus_{size}")
+
+    def cleanup(self):
+        if self.owns_workdir:
+            shutil.rmtree(self.workdir, ignore_errors=True)
+
+
+def bench_determine_categories(ctx, size):
+    scraper = _make_scraper(os.path.join(ctx.workdir, "scratch"))
+    samples = [(a["title"], a["content"]) for a in corpus.iter_articles(size, seed=ctx.seed)]
+
+    def run():
+        for title, content in samples:
+            scraper.determine_categories(title, content, "general")
+
+    return _summarize("determine_categories", size, _timed(run, 1), size)
+
+
+def bench_scrape_rss(ctx, size):
+    count = min(size, ctx.scrape_limit)
+    scraper = _make_scraper(os.path.join(ctx.workdir, "scratch"))
+    with StubNewsServer(article_count=count, seed=ctx.seed) as server:
+        feed_url = f"{server.base_url}/feed.xml"
+        runs = _timed(lambda: scraper.scrape_rss(corpus.SOURCE_NAME, feed_url, "general"), 1)
+    return _summarize("scrape_rss", size, runs, count)
+
+
+def bench_scrape_website(ctx, size):
+    scraper = _make_scraper(os.path.join(ctx.workdir, "scratch"))
+    with StubNewsServer(article_count=size, seed=ctx.seed) as server:
+        home_url = f"{server.base_url}/"
+        scraped = []
+        runs = _timed(lambda: scraped.extend(scraper.scrape_website(corpus.SOURCE_NAME, home_url, "general")), 1)
+    # The scraper stops after a capped number of links, so count what it actually scraped
+    return _summarize("scrape_website", size, runs, len(scraped))
+
+
+def bench_save_article(ctx, size):
+    output_dir = ctx.corpus_dir(size)
+    shutil.rmtree(output_dir, ignore_errors=True)
+    scraper = _make_scraper(output_dir)
+    source_dir = os.path.join(output_dir, corpus.SOURCE_NAME)
+    os.makedirs(source_dir, exist_ok=True)
+
+    # Saved in batches of 10, like one source per scrape. Generation is excluded
+    # from the timing; only the save calls count
+    elapsed = 0.0
+    batch = []
+    for article in corpus.iter_articles(size, seed=ctx.seed):
+        batch.append(article)
+        if len(batch) == 10:
+            start = time.perf_counter()
+            scraper.save_articles(batch, source_dir)
+            elapsed += time.perf_counter() - start
+            batch = []
+    if batch:
+        start = time.perf_counter()
+        scraper.save_articles(batch, source_dir)
+        elapsed += time.perf_counter() - start
+    return _summarize("save_article", size, [elapsed], size)
+
+
+def _image_urls(entry):
+    urls = [m.get("url") for m in entry.get("media_content", []) + entry.get("media_thumbnail", [])]
+    urls += [l.get("href") for l in entry.get("links", []) if l.get("type", "").startswith("image/")]
+    return urls
+
+
+def _feed_view(feed):
+    """The entry fields scrape_rss reads, for comparing feed parsers"""
+    return [
+        (entry.get("title"), entry.get("link"), tuple(entry.get("published_parsed") or ()), _image_urls(entry))
+        for entry in feed.entries
+    ]
+
+
+def bench_extract_links(ctx, size):
+    """Homepage link extraction with each installed parser backend, checked against bs4"""
+    from scrapper.parsers import available_backends, resolve_backend
+    from scrapper.pipeline import extract_article_links
+
+    html = corpus.render_homepage(size).encode("utf-8")
+    website_url = "http://localhost/"
+    expected = set(extract_article_links(html, website_url, "bs4"))
+
+    timings = {}
+    identical = True
+    for backend in available_backends():
+        timings[backend] = _timed(lambda: extract_article_links(html, website_url, backend), ctx.repeat)
+        identical &= set(extract_article_links(html, website_url, backend)) == expected
+
+    entry = _summarize("extract_links", size, timings[resolve_backend("auto")], size)
+    entry["backend"] = resolve_backend("auto")
+    entry["identical"] = identical
+    for backend, runs in timings.items():
+        entry[f"{backend}_seconds"] = round(statistics.median(runs), 6)
+    return entry
+
+
+def bench_parse_feed(ctx, size):
+    """Feed parsing with feedparser versus the lxml fast path, checked for identical entries"""
+    from scrapper.parsers import parse_feed, resolve_backend
+
+    content = corpus.render_rss(size, "http://localhost", seed=ctx.seed).encode("utf-8")
+    headers = {"content-type": "application/rss+xml; charset=utf-8"}
+    fast = resolve_backend("auto")
+
+    feedparser_runs = _timed(lambda: parse_feed(content, headers, "bs4"), ctx.repeat)
+    fast_runs = _timed(lambda: parse_feed(content, headers, fast), ctx.repeat)
+    identical = _feed_view(parse_feed(content, headers, "bs4")) == _feed_view(parse_feed(content, headers, fast))
+
+    entry = _summarize("parse_feed", size, fast_runs, size)
+    entry["backend"] = fast
+    entry["identical"] = identical
+    entry["feedparser_seconds"] = round(statistics.median(feedparser_runs), 6)
+    return entry
+
+
+def _ensure_corpus(ctx, size):
+    if not os.path.isdir(os.path.join(ctx.corpus_dir(size), corpus.SOURCE_NAME)):
+        bench_save_article(ctx, size)
+    return ctx.corpus_dir(size)
+
+
+def bench_get_recent_articles(ctx, size):
+    scraper = _make_scraper(_ensure_corpus(ctx, size))
+    runs = _timed(lambda: scraper.get_recent_articles(limit=20), ctx.repeat)
+    return _summarize("get_recent_articles", size, runs, size)
+
+
+def bench_get_recent_articles_by_category(ctx, size):
+    scraper = _make_scraper(_ensure_corpus(ctx, size))
+    runs = _timed(lambda: scraper.get_recent_articles(limit=20, category="general"), ctx.repeat)
+    return _summarize("get_recent_articles_by_category", size, runs, size)
+
+
+def bench_load_articles_from_source(ctx, size):
+    import app.main as web
+
+    web.SCRAPED_NEWS_DIR = _ensure_corpus(ctx, size)
+    # A background warm-up or BART summaries would compete with the timed runs
+    web.WARMUP_ON_STARTUP = False
+    web.ABSTRACTIVE_SUMMARIES = False
+    with _quiet():
+        if web.summarizer_model is None:
+            asyncio.run(web.startup_event())
+        runs = _timed(lambda: web.load_articles_from_source(corpus.SOURCE_NAME, 20), ctx.repeat)
+        # Encoded size of the default (list) projection against every stored field
+        slim = len(json.dumps(web.load_articles_from_source(corpus.SOURCE_NAME, 20)))
+        full = len(json.dumps(web.load_articles_from_source(corpus.SOURCE_NAME, 20, None)))
+    result = _summarize("load_articles_from_source", size, runs, size)
+    result["payload_bytes"] = slim
+    result["full_payload_bytes"] = full
+    return result
+
+
+def _traced_bytes(build):
+    """Bytes still allocated after build() returns, and the time it took"""
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        start = time.perf_counter()
+        kept = build()
+        elapsed = time.perf_counter() - start
+        after = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+    del kept
+    return after - before, elapsed
+
+
+def bench_article_memory(ctx, size):
+    """Per-article footprint of plain dicts versus ArticleRecord for in-memory serving"""
+    from scrapper.records import ArticleRecord
+
+    # Round-trip through JSON so strings are not shared, as when loading from disk
+    encoded = [json.dumps(a) for a in corpus.iter_articles(size, seed=ctx.seed)]
+
+    dict_full, _ = _traced_bytes(lambda: [json.loads(e) for e in encoded])
+
+    def metadata_dicts():
+        rows = []
+        for e in encoded:
+            data = json.loads(e)
+            data.pop("content", None)
+            data.pop("html", None)
+            rows.append(data)
+        return rows
+
+    dict_meta, _ = _traced_bytes(metadata_dicts)
+    record_bytes, elapsed = _traced_bytes(lambda: [
+        ArticleRecord.from_dict(json.loads(e), body_ref=f"{corpus.SOURCE_NAME}/{i}.json", keep_body=False)
+        for i, e in enumerate(encoded)
+    ])
+
+    entry = _summarize("article_memory", size, [elapsed], size)
+    entry.update({
+        "dict_bytes_per_item": round(dict_full / size, 1),
+        "dict_metadata_bytes_per_item": round(dict_meta / size, 1),
+        "record_bytes_per_item": round(record_bytes / size, 1),
+    })
+    return entry
+
+
+BENCHMARKS = {
+    "determine_categories": bench_determine_categories,
+    "scrape_rss": bench_scrape_rss,
+    "scrape_website": bench_scrape_website,
+    "extract_links": bench_extract_links,
+    "parse_feed": bench_parse_feed,
+    "save_article": bench_save_article,
+    "get_recent_articles": bench_get_recent_articles,
+    "get_recent_articles_by_category": bench_get_recent_articles_by_category,
+    "load_articles_from_source": bench_load_articles_from_source,
+    "article_memory": bench_article_memory,
+}
+
+
+def _git_revision():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, check=False
+        ).stdout.strip() or None
+    except OSError:
+        return None
+
+
+def run_suite(names, sizes, ctx):
+    """Run the selected benchmarks at every size and return the results document"""
+    results = {}
+    for size in sizes:
+        for name in names:
+            print(f"Running {name} at n={size}...")
+            try:
+                entry = BENCHMARKS[name](ctx, size)
+            except Exception as e:
+                print(f"  failed: {str(e)}")
+                entry = {"benchmark": name, "size": size, "error": str(e)}
+            else:
+                print(f"  {entry['seconds']:.4f}s (per item {entry['per_item_ms']} ms)")
+                for key in sorted(k for k in entry if k.endswith(("bytes_per_item", "_seconds")) and k != "min_seconds"):
+                    print(f"  {key}: {entry[key]}")
+                if entry.get("identical") is False:
+                    print("  WARNING: backend results differ from the reference parser")
+            results[f"{name}[n={size}]"] = entry
+
+    return {
+        "meta": {
+            "created": datetime.datetime.now().isoformat(timespec="seconds"),
+            "git_revision": _git_revision(),
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "repeat": ctx.repeat,
+            "scrape_limit": ctx.scrape_limit,
+        },
+        "results": results,
+    }
+
+
+def save_results(document, output_dir=RESULTS_DIR):
+    """Write a results document to a timestamped JSON file"""
+    os.makedirs(output_dir, exist_ok=True)
+    stamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+    path = os.path.join(output_dir, f"bench_{stamp}.json")
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(document, f, indent=2, sort_keys=True)
+    return path
+
+
+def compare_results(baseline, current, threshold=1.2):
+    """Print a side-by-side comparison and return the keys that regressed"""
+    regressions = []
+    print(f"\n{'benchmark':<48} {'baseline':>10} {'current':>10} {'ratio':>7}")
+    for key, entry in sorted(current["results"].items()):
+        old = baseline["results"].get(key)
+        if not old or "seconds" not in old or "seconds" not in entry:
+            continue
+        ratio = entry["seconds"] / old["seconds"] if old["seconds"] else float("inf")
+        flag = "  REGRESSION" if ratio > threshold else ""
+        print(f"{key:<48} {old['seconds']:>10.4f} {entry['seconds']:>10.4f} {ratio:>7.2f}{flag}")
+        if flag:
+            regressions.append(key)
+    return regressions
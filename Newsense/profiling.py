@@ -0,0 +1,116 @@
+# profiling.py
+"""
+Opt-in profiling for the web app and the command-line scripts.
+
+StackSampler is a small stdlib sampling profiler: a background thread reads
+the stack of every other thread at a fixed interval and counts identical
+stacks. It writes them in the "folded" format (one "outer;inner;leaf count"
+line per stack) understood by flamegraph.pl, speedscope and inferno. Paths
+ending in .prof get cProfile statistics instead, for pstats or snakeviz.
+"""
+
+import contextlib
+import cProfile
+import os
+import sys
+import threading
+import time
+
+
+class StackSampler:
+    """Sampling profiler that counts folded call stacks of the running threads"""
+
+    def __init__(self, interval=0.005, thread_ids=None):
+        """
+        Args:
+            interval (float): Seconds between samples
+            thread_ids (set): Only sample these threads (default: every thread but the sampler)
+        """
+        self.interval = interval
+        self.thread_ids = thread_ids
+        self.counts = {}
+        self.samples = 0
+        self._labels = {}
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _label(self, code):
+        label = self._labels.get(code)
+        if label is None:
+            label = self._labels[code] = f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+        return label
+
+    def _sample(self):
+        own_id = threading.get_ident()
+        names = {thread.ident: thread.name for thread in threading.enumerate()}
+        for thread_id, frame in sys._current_frames().items():
+            if thread_id == own_id or (self.thread_ids is not None and thread_id not in self.thread_ids):
+                continue
+            stack = []
+            while frame is not None:
+                stack.append(self._label(frame.f_code))
+                frame = frame.f_back
+            stack.append(names.get(thread_id, f"thread-{thread_id}"))
+            key = ";".join(reversed(stack))
+            self.counts[key] = self.counts.get(key, 0) + 1
+        self.samples += 1
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self._sample()
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="newsense-profiler", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        return self
+
+    def folded(self):
+        """Folded stacks, heaviest first"""
+        return "".join(
+            f"{stack} {count}\n"
+            for stack, count in sorted(self.counts.items(), key=lambda item: item[1], reverse=True)
+        )
+
+    def write(self, path):
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(self.folded())
+
+
+@contextlib.contextmanager
+def profiled(path, interval=0.005):
+    """
+    Profile the enclosed block and write the result to path.
+
+    Args:
+        path (str): Output file; .prof writes cProfile stats, anything else folded stacks
+        interval (float): Sampling interval in seconds for folded stacks
+    """
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+
+    if path.endswith(".prof"):
+        profiler = cProfile.Profile()
+        profiler.enable()
+        try:
+            yield profiler
+        finally:
+            profiler.disable()
+            profiler.dump_stats(path)
+            print(f"cProfile stats written to {path}")
+        return
+
+    sampler = StackSampler(interval).start()
+    start = time.perf_counter()
+    try:
+        yield sampler
+    finally:
+        sampler.stop()
+        sampler.write(path)
+        print(f"{sampler.samples} stack samples over {time.perf_counter() - start:.1f}s written to {path}")
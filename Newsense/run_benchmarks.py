@@ -0,0 +1,63 @@
+#!/usr/bin/env python
+"""
+Run the offline benchmark suite.
+
+All inputs are generated locally (see benchmarks/corpus.py) and the scraper is
+pointed at a local HTTP stand-in, so no network access is needed. Run from the
+project root so the app's static and template directories resolve.
+"""
+
+import argparse
+import json
+import sys
+
+from benchmarks.suite import (
+    BENCHMARKS, DEFAULT_SIZES, RESULTS_DIR, BenchmarkContext,
+    compare_results, run_suite, save_results
+)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run Newsense benchmarks against a synthetic corpus")
+    parser.add_argument('--sizes', '-n', type=int, nargs='+', default=DEFAULT_SIZES,
+                        help='Corpus sizes (number of articles) to benchmark')
+    parser.add_argument('--only', nargs='+', choices=sorted(BENCHMARKS),
+                        help='Run only these benchmarks')
+    parser.add_argument('--repeat', '-r', type=int, default=3,
+                        help='Repetitions for the fast read-path benchmarks')
+    parser.add_argument('--scrape-limit', type=int, default=500,
+                        help='Maximum feed entries downloaded by the scrape_rss benchmark')
+    parser.add_argument('--workdir',
+                        help='Keep generated corpora in this directory instead of a temp dir')
+    parser.add_argument('--output', '-o', default=RESULTS_DIR,
+                        help='Directory to save results JSON')
+    parser.add_argument('--compare', '-c',
+                        help='Previous results JSON to compare against')
+    parser.add_argument('--threshold', type=float, default=1.2,
+                        help='Slowdown ratio reported as a regression')
+
+    args = parser.parse_args()
+
+    names = args.only or list(BENCHMARKS)
+    ctx = BenchmarkContext(workdir=args.workdir, repeat=args.repeat, scrape_limit=args.scrape_limit)
+    try:
+        document = run_suite(names, args.sizes, ctx)
+    finally:
+        ctx.cleanup()
+
+    path = save_results(document, args.output)
+    print(f"\nResults saved to: {path}")
+
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        regressions = compare_results(baseline, document, args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} benchmark(s) slower than {args.threshold}x baseline")
+            return 1
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
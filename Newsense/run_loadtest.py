@@ -0,0 +1,67 @@
+#!/usr/bin/env python
+"""
+Load-test the web app with concurrent simulated users.
+
+By default a synthetic corpus is generated and the app is started on a free
+local port against it; pass --url to target a server that is already running.
+Run from the project root so the app's static and template directories resolve.
+"""
+
+import argparse
+import json
+import sys
+
+from benchmarks.loadtest import DEFAULT_MIX, compare_reports, parse_mix, print_report, run, save_report
+from benchmarks.suite import RESULTS_DIR
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure Newsense API throughput and latency under concurrent load")
+    parser.add_argument('--url',
+                        help='Target an already running app instead of starting one')
+    parser.add_argument('--articles', '-n', type=int, default=1000,
+                        help='Synthetic corpus size when starting the app')
+    parser.add_argument('--workers', '-w', type=int, default=1,
+                        help='uvicorn worker processes when starting the app')
+    parser.add_argument('--concurrency', '-c', type=int, default=32,
+                        help='Simulated users issuing requests back to back')
+    parser.add_argument('--duration', '-d', type=float, default=30.0,
+                        help='Seconds to run the load for')
+    parser.add_argument('--mix', default=",".join(f"{k}={v}" for k, v in DEFAULT_MIX.items()),
+                        help='Endpoint weights, e.g. articles=8,sources=1,article=1,related=1,trending=1,refresh=0')
+    parser.add_argument('--workdir',
+                        help='Keep generated corpora in this directory instead of a temp dir')
+    parser.add_argument('--output', '-o', default=RESULTS_DIR,
+                        help='Directory to save the report JSON')
+    parser.add_argument('--compare',
+                        help='Previous load test report to compare p95 latency against')
+    parser.add_argument('--threshold', type=float, default=1.2,
+                        help='p95 slowdown ratio reported as a regression')
+
+    args = parser.parse_args()
+
+    try:
+        mix = parse_mix(args.mix)
+    except ValueError as e:
+        parser.error(str(e))
+
+    document = run(url=args.url, size=args.articles, workers=args.workers, mix=mix,
+                   concurrency=args.concurrency, duration=args.duration, workdir=args.workdir)
+    print_report(document["result"])
+
+    path = save_report(document, args.output)
+    print(f"\nReport saved to: {path}")
+
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        regressions = compare_reports(baseline, document, args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} endpoint(s) slower than {args.threshold}x baseline at p95")
+            return 1
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
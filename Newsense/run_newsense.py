@@ -54,7 +54,7 @@ def run_scraper():
     print("Running news scraper...")
     try:
         from run_scraper import main
-        exit_code = main()
+        exit_code = main([])
         if exit_code != 0:
             print("Scraper completed with errors.")
             return False
@@ -65,12 +65,19 @@ def run_scraper():
     
     return True
 
-def run_web_server():
-    """Start the FastAPI web server"""
-    print("Starting web server...")
+def run_web_server(workers=None, host="0.0.0.0", port=8000):
+    """Start the FastAPI web server (development mode with reload unless workers is given)"""
     try:
         import uvicorn
-        uvicorn.run("app.main:app", host="0.0.0.0", port=8000, reload=True)
+        if workers is None:
+            print("Starting web server...")
+            uvicorn.run("app.main:app", host=host, port=port, reload=True)
+        else:
+            # Production: N processes, no file watching. Workers share the scraper's
+            # memory-mapped article index instead of each indexing the corpus
+            workers = workers or os.cpu_count() or 1
+            print(f"Starting web server with {workers} workers...")
+            uvicorn.run("app.main:app", host=host, port=port, workers=workers, reload=False)
     except Exception as e:
         print(f"Error starting web server: {str(e)}")
         return False
@@ -82,6 +89,10 @@ def main():
     parser.add_argument("--download-nltk", action="store_true", help="Download NLTK data")
     parser.add_argument("--run-scraper", action="store_true", help="Run the news scraper")
     parser.add_argument("--no-web", action="store_true", help="Don't start the web server")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="Serve with N worker processes and no auto-reload (0 = one per CPU core)")
+    parser.add_argument("--host", default="0.0.0.0", help="Address to bind the web server to")
+    parser.add_argument("--port", type=int, default=8000, help="Port for the web server")
     
     args = parser.parse_args()
     
@@ -101,7 +112,7 @@ def main():
     
     # Start web server unless --no-web is specified
     if not args.no_web:
-        return 0 if run_web_server() else 1
+        return 0 if run_web_server(args.workers, args.host, args.port) else 1
     
     return 0
 
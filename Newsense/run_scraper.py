@@ -1,11 +1,136 @@
 from scrapper.main import EnhancedNewsScraper
+from scrapper.http_session import HostSessionPool
+from scrapper.segment_store import store
+from scrapper.catalog import list_source_dirs
+from scrapper.parsers import BACKENDS
+import argparse
 import logging
 import sys
 import time
 import os
 from pathlib import Path
 
-def main():
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='Scrape news from all configured sources')
+    archive = parser.add_mutually_exclusive_group()
+    archive.add_argument('--record', metavar='ARCHIVE',
+                         help='Record every HTTP response to this gzip archive (e.g. scrape.jsonl.gz)')
+    archive.add_argument('--replay', metavar='ARCHIVE',
+                         help='Serve all HTTP requests from a recorded archive instead of the network')
+    parser.add_argument('--replay-latency', metavar='MS', default='0',
+                        help="Milliseconds of latency injected per replayed response, or 'recorded'")
+    parser.add_argument('--pool-size', type=int, default=10,
+                        help='Keep-alive connections kept open per host')
+    parser.add_argument('--retries', type=int, default=2,
+                        help='Retries with exponential backoff for failed requests')
+    parser.add_argument('--fetch-images', action='store_true',
+                        help='Let newspaper3k download candidate images to pick the top image (slow)')
+    parser.add_argument('--workers', type=int, default=None,
+                        help='Processes used to parse and categorize articles (default: CPU count, 1 = inline)')
+    parser.add_argument('--parser', choices=BACKENDS, default='auto',
+                        help='HTML/feed parser backend for homepage links and feeds (default: fastest installed)')
+    parser.add_argument('--compact', action='store_true',
+                        help='After scraping, drop superseded article versions and fold legacy JSON files into segments')
+    parser.add_argument('--retention-days', type=int, default=None, metavar='DAYS',
+                        help='After scraping, remove day partitions older than DAYS (default: keep everything)')
+    parser.add_argument('--archive-dir', metavar='DIR',
+                        help='With --retention-days, move expired partitions into DIR instead of deleting them')
+    parser.add_argument('--schedule', action='store_true',
+                        help='Keep running, polling each source on its own adaptive interval')
+    parser.add_argument('--min-interval', type=float, default=120,
+                        help='Shortest per-source polling interval in seconds (with --schedule)')
+    parser.add_argument('--max-interval', type=float, default=6 * 3600,
+                        help='Longest per-source polling interval in seconds (with --schedule)')
+    parser.add_argument('--queue', metavar='LOCATION',
+                        help='Work-queue mode: share tasks through this queue (a SQLite path or a registered backend URL)')
+    parser.add_argument('--enqueue', action='store_true',
+                        help='With --queue, start a scrape round (unless one is running) and exit')
+    parser.add_argument('--worker', action='store_true',
+                        help='With --queue, process tasks until no work is left')
+    parser.add_argument('--forever', action='store_true',
+                        help='With --worker, keep waiting for new rounds instead of exiting')
+    parser.add_argument('--lease-seconds', type=float, default=300,
+                        help='How long a leased task is reserved for a worker before others may take it over')
+    parser.add_argument('--profile', metavar='PATH',
+                        help='Profile the run: folded stacks for flame graphs, or cProfile stats if PATH ends in .prof '
+                             '(parses inline unless --workers is given, as worker processes are not profiled)')
+    return parser.parse_args(argv)
+
+def build_transport(args):
+    """Create the HTTP transport: a pooled session, optionally recorded, or an archive replay"""
+    if args.replay:
+        from scrapper.http_archive import ArchiveReplayer
+        if args.replay_latency == 'recorded':
+            return ArchiveReplayer(args.replay, recorded_latency=True)
+        return ArchiveReplayer(args.replay, latency=float(args.replay_latency) / 1000)
+    
+    pool = HostSessionPool(pool_maxsize=args.pool_size, retries=args.retries)
+    if args.record:
+        from scrapper.http_archive import ArchiveRecorder
+        print(f"Recording HTTP responses to {args.record}")
+        return ArchiveRecorder(args.record, transport=pool)
+    
+    return pool
+
+def run_schedule(scraper, args, transport):
+    """Run the adaptive scheduler until interrupted"""
+    from scrapper.scheduler import AdaptiveScheduler
+    
+    scheduler = AdaptiveScheduler(
+        scraper,
+        min_interval=args.min_interval,
+        max_interval=args.max_interval
+    )
+    print("Scheduler running - press Ctrl+C to stop")
+    try:
+        scheduler.run_forever()
+    except KeyboardInterrupt:
+        print("\nStopping scheduler...")
+    finally:
+        scheduler.save_state()
+        scraper.close()
+        transport.close()
+    
+    return 0
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.profile:
+        from profiling import profiled
+        # Parse worker processes are invisible to the profiler, so keep the CPU stage inline
+        if args.workers is None:
+            args.workers = 1
+        with profiled(args.profile):
+            return run(args)
+    return run(args)
+
+def run_queue(scraper, args, transport):
+    """Work-queue mode: start a round and/or work on the shared queue"""
+    from scrapper.work_queue import open_work_queue, QueueWorker
+    
+    queue = open_work_queue(args.queue)
+    # Without --enqueue or --worker, start a round and take part in it
+    enqueue = args.enqueue or not args.worker
+    work = args.worker or not args.enqueue
+    try:
+        if enqueue:
+            round_id, started = queue.start_round(scraper.sources)
+            print(f"{'Started' if started else 'Joined running'} scrape round {round_id}")
+        if work:
+            worker = QueueWorker(scraper, queue, lease_seconds=args.lease_seconds)
+            try:
+                completed = worker.run(forever=args.forever)
+            except KeyboardInterrupt:
+                print("\nStopping worker...")
+                completed = worker.processed
+            print(f"Worker completed {completed} tasks; queue: {queue.stats()}")
+    finally:
+        queue.close()
+        scraper.close()
+        transport.close()
+    return 0
+
+def run(args):
     # Set the news freshness threshold (in days)
     days_threshold = 2
     
@@ -16,8 +141,25 @@ def main():
     output_dir = "scrapper/scraped_news"
     Path(output_dir).mkdir(parents=True, exist_ok=True)
     
+    # Archive modes never download candidate images: newspaper3k fetches them
+    # outside the transport, so replays would hit the network
+    transport = build_transport(args)
+    archive_mode = bool(args.record or args.replay)
+    
     # Initialize the scraper
-    scraper = EnhancedNewsScraper(output_dir=output_dir, days_threshold=days_threshold)
+    scraper = EnhancedNewsScraper(
+        output_dir=output_dir,
+        days_threshold=days_threshold,
+        transport=transport,
+        fetch_images=args.fetch_images and not archive_mode,
+        workers=args.workers,
+        parser_backend=args.parser
+    )
+    
+    if args.schedule:
+        return run_schedule(scraper, args, transport)
+    if args.queue:
+        return run_queue(scraper, args, transport)
     
     # Start scraping
     try:
@@ -25,6 +167,10 @@ def main():
         print("Scraping in progress...")
         
         articles_count = scraper.scrape_all_sources()
+        if args.compact:
+            scraper.compact_storage()
+        if args.retention_days is not None:
+            scraper.apply_retention(args.retention_days, archive_dir=args.archive_dir)
         
         end_time = time.time()
         duration = end_time - start_time
@@ -34,16 +180,19 @@ def main():
         print(f"Articles stored in: {os.path.abspath(output_dir)}")
         
         # List source directories
-        source_dirs = [d for d in os.listdir(output_dir) if os.path.isdir(os.path.join(output_dir, d))]
+        source_dirs = list_source_dirs(output_dir)
         print("\nArticles organized by source:")
         for source in source_dirs:
             source_path = os.path.join(output_dir, source)
-            articles = [f for f in os.listdir(source_path) if f.endswith('.json')]
-            print(f"  - {source}: {len(articles)} articles")
+            legacy_files = [f for f in os.listdir(source_path) if f.endswith('.json')]
+            print(f"  - {source}: {store.count(source_path) + len(legacy_files)} articles")
             
     except Exception as e:
         print(f"An error occurred while scraping: {str(e)}")
         return 1
+    finally:
+        scraper.close()
+        transport.close()
         
     return 0
 
@@ -0,0 +1,179 @@
+# article_index.py
+"""
+Read-only, memory-mapped article index shared by the web app's workers.
+
+After each scrape the scraper writes one binary file listing the newest stored
+version of every article, grouped by source and sorted newest first, and swaps
+it into place with os.replace(). Web workers mmap the file instead of each
+parsing and caching every segment's .idx, so all worker processes share the
+same page-cache copy. A worker notices a new file by its inode and remaps it.
+
+Layout (little endian):
+    header   magic, version, record count and the offsets of the sections below
+    records  fixed-size entries: id position in the blob, segment number,
+             length, offset, timestamp
+    blob     UTF-8 article ids, back to back
+    meta     JSON: per-source (first record, count), segment paths relative to
+             the index file, and the catalog version the index was built from
+"""
+
+import json
+import logging
+import mmap
+import os
+import struct
+import threading
+import time
+
+from scrapper.catalog import catalog_version, list_source_dirs
+from scrapper.segment_store import IndexEntry, store
+
+INDEX_FILE = "article_index.bin"
+MAGIC = b"NSIDX\x00\x00\x01"
+VERSION = 2
+
+# magic, version, record_count, records_offset, blob_offset, meta_offset, meta_length
+HEADER = struct.Struct("<8sIQQQQQ")
+# id_offset, id_length, segment number, length, offset, timestamp
+RECORD = struct.Struct("<QHIIQd")
+
+logger = logging.getLogger("EnhancedNewsScraper.article_index")
+
+
+def build_article_index(output_dir, path=None):
+    """
+    Write the article index for every source directory and atomically swap it in.
+
+    Args:
+        output_dir (str): Scraped news directory holding one directory per source
+        path (str): Index file to write (defaults to output_dir/article_index.bin)
+
+    Returns:
+        int: Number of indexed articles
+    """
+    path = path or os.path.join(output_dir, INDEX_FILE)
+    base = os.path.dirname(os.path.abspath(path))
+    version = catalog_version(output_dir)
+
+    sources = {}
+    segments = []
+    segment_numbers = {}
+    records = []
+    blob = bytearray()
+
+    for name in list_source_dirs(output_dir):
+        source_dir = os.path.join(output_dir, name)
+        start = len(records)
+        for entry in store.iter_latest(source_dir):
+            number = segment_numbers.get(entry.segment)
+            if number is None:
+                number = segment_numbers[entry.segment] = len(segments)
+                segments.append(os.path.relpath(os.path.abspath(entry.segment), base))
+            article_id = entry.id.encode("utf-8")
+            records.append(RECORD.pack(len(blob), len(article_id), number, entry.length, entry.offset, entry.timestamp))
+            blob.extend(article_id)
+        if len(records) > start:
+            sources[name] = [start, len(records) - start]
+
+    meta = json.dumps({
+        "sources": sources,
+        "segments": segments,
+        "catalog_version": version,
+        "built": time.time(),
+    }).encode("utf-8")
+
+    records_offset = HEADER.size
+    blob_offset = records_offset + len(records) * RECORD.size
+    meta_offset = blob_offset + len(blob)
+
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, VERSION, len(records), records_offset, blob_offset, meta_offset, len(meta)))
+        f.write(b"".join(records))
+        f.write(blob)
+        f.write(meta)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+    logger.info(f"Published article index with {len(records)} articles from {len(sources)} sources")
+    return len(records)
+
+
+class _Mapping:
+    """One open, mapped version of the index file"""
+
+    def __init__(self, path):
+        with open(path, 'rb') as f:
+            self.inode = os.fstat(f.fileno()).st_ino
+            self.buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, self.count, self.records_offset, self.blob_offset, meta_offset, meta_length = \
+            HEADER.unpack_from(self.buffer, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{path} is not a version {VERSION} article index")
+
+        meta = json.loads(self.buffer[meta_offset:meta_offset + meta_length])
+        base = os.path.dirname(os.path.abspath(path))
+        self.sources = meta["sources"]
+        self.segments = [os.path.join(base, segment) for segment in meta["segments"]]
+        self.catalog_version = meta["catalog_version"]
+
+    def entry(self, position):
+        id_offset, id_length, number, length, offset, timestamp = RECORD.unpack_from(
+            self.buffer, self.records_offset + position * RECORD.size
+        )
+        start = self.blob_offset + id_offset
+        article_id = self.buffer[start:start + id_length].decode("utf-8")
+        return IndexEntry(article_id, self.segments[number], offset, length, timestamp)
+
+
+class MappedArticleIndex:
+    """Reader for the shared index; remaps automatically when the scraper publishes a new one"""
+
+    def __init__(self, path, check_interval=1.0):
+        self.path = path
+        self.check_interval = check_interval
+        self._mapping = None
+        self._last_check = 0.0
+        self._lock = threading.Lock()
+
+    def _current(self):
+        now = time.monotonic()
+        if self._mapping is not None and now - self._last_check < self.check_interval:
+            return self._mapping
+
+        with self._lock:
+            self._last_check = now
+            try:
+                inode = os.stat(self.path).st_ino
+            except FileNotFoundError:
+                self._mapping = None
+                return None
+            if self._mapping is None or self._mapping.inode != inode:
+                try:
+                    # The old mapping is released once no reader holds it any more
+                    self._mapping = _Mapping(self.path)
+                except (OSError, ValueError) as e:
+                    logger.warning(f"Cannot map article index {self.path}: {str(e)}")
+                    self._mapping = None
+            return self._mapping
+
+    def is_current(self, version):
+        """Whether the published index was built from the given catalog version"""
+        mapping = self._current()
+        return mapping is not None and mapping.catalog_version == version
+
+    def latest(self, source, limit):
+        """Index entries for a source's `limit` most recently stored articles, or None without an index"""
+        mapping = self._current()
+        if mapping is None:
+            return None
+        start, count = mapping.sources.get(source, (0, 0))
+        return [mapping.entry(position) for position in range(start, start + min(limit, count))]
+
+    def count(self, source):
+        mapping = self._current()
+        if mapping is None:
+            return None
+        return mapping.sources.get(source, (0, 0))[1]
@@ -0,0 +1,55 @@
+# catalog.py
+"""
+Catalog version marker shared by the scraper and the web app.
+
+The scraper bumps a small marker file whenever it saves articles; the app
+folds its stat signature into ETags so cached API responses are invalidated
+exactly when the catalog changes, without rescanning article files.
+"""
+
+import os
+import time
+
+CATALOG_VERSION_FILE = ".catalog_version"
+
+# Directories the scraper keeps next to the source directories for its indexes
+INDEX_DIRS = frozenset(("metadata_index", "related_index"))
+
+
+def bump_catalog_version(output_dir):
+    """Mark the catalog as changed (atomic replace, so readers see a new inode/mtime)"""
+    path = os.path.join(output_dir, CATALOG_VERSION_FILE)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write(f"{time.time_ns()}\n")
+    os.replace(tmp_path, path)
+
+
+def list_source_dirs(output_dir):
+    """Names of the source directories in the output directory, sorted"""
+    try:
+        names = os.listdir(output_dir)
+    except FileNotFoundError:
+        return []
+    return sorted(
+        name for name in names
+        if name not in INDEX_DIRS and not name.startswith(".")
+        and os.path.isdir(os.path.join(output_dir, name))
+    )
+
+
+def catalog_version(output_dir, *paths):
+    """
+    Cheap version token for the catalog, optionally narrowed to some paths.
+
+    Combines the marker file's stat with the mtimes of the given paths (e.g. a
+    source directory), so edits made outside the scraper are noticed too.
+    """
+    parts = []
+    for path in (os.path.join(output_dir, CATALOG_VERSION_FILE),) + paths:
+        try:
+            st = os.stat(path)
+            parts.append(f"{st.st_ino}-{st.st_mtime_ns}-{st.st_size}")
+        except OSError:
+            parts.append("-")
+    return ":".join(parts)
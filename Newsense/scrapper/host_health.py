@@ -0,0 +1,148 @@
+# host_health.py
+"""
+Per-host latency tracking, adaptive timeouts and circuit breaking.
+
+Timeouts follow each host's observed latency instead of a fixed 10 seconds,
+and a host that fails several times in a row is skipped for a cooldown period
+so one blocked or slow source cannot stall the whole refresh.
+"""
+
+import logging
+import threading
+import time
+from collections import deque
+
+import requests
+
+# Responses that mean the host is refusing or struggling, not that the page is missing
+FAILURE_STATUSES = {401, 403, 429, 500, 502, 503, 504}
+
+
+class CircuitOpenError(requests.exceptions.ConnectionError):
+    """Raised instead of fetching while a host's circuit breaker is open"""
+
+
+class _HostState:
+    def __init__(self, window):
+        self.latencies = deque(maxlen=window)
+        self.consecutive_failures = 0
+        self.opened_at = None
+        self.trial_in_flight = False
+
+
+class HostHealth:
+    """Tracks latency and failures per host to derive timeouts and trip circuit breakers"""
+
+    def __init__(self, default_timeout=10.0, min_timeout=2.0, max_timeout=10.0, percentile=0.95,
+                 multiplier=2.0, window=50, min_samples=5, failure_threshold=3, cooldown=300):
+        """
+        Args:
+            default_timeout (float): Timeout used until a host has min_samples observations
+            min_timeout (float): Lower bound for adaptive timeouts
+            max_timeout (float): Upper bound for adaptive timeouts
+            percentile (float): Latency percentile the timeout is based on
+            multiplier (float): Headroom applied to that percentile
+            window (int): Number of recent latencies kept per host
+            min_samples (int): Observations needed before timeouts adapt
+            failure_threshold (int): Consecutive failures that open the circuit
+            cooldown (float): Seconds a tripped host is skipped before a trial request
+        """
+        self.default_timeout = default_timeout
+        self.min_timeout = min_timeout
+        self.max_timeout = max_timeout
+        self.percentile = percentile
+        self.multiplier = multiplier
+        self.window = window
+        self.min_samples = min_samples
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.logger = logging.getLogger("EnhancedNewsScraper.health")
+        self._hosts = {}
+        self._lock = threading.Lock()
+
+    def _state(self, host):
+        state = self._hosts.get(host)
+        if state is None:
+            state = self._hosts[host] = _HostState(self.window)
+        return state
+
+    def latency_percentile(self, host, percentile=None):
+        """Observed latency percentile for a host, or None without enough samples"""
+        with self._lock:
+            samples = sorted(self._state(host).latencies)
+        if len(samples) < self.min_samples:
+            return None
+        percentile = self.percentile if percentile is None else percentile
+        index = min(len(samples) - 1, int(round(percentile * (len(samples) - 1))))
+        return samples[index]
+
+    def timeout_for(self, host):
+        """Timeout to use for the next request to a host"""
+        observed = self.latency_percentile(host)
+        if observed is None:
+            return self.default_timeout
+        return max(self.min_timeout, min(self.max_timeout, observed * self.multiplier))
+
+    def before_request(self, host):
+        """
+        Raise CircuitOpenError if the host is cooling down; otherwise allow the request.
+        Returns True if the request is the host's half-open trial (see end_trial).
+        """
+        with self._lock:
+            state = self._state(host)
+            if state.opened_at is None:
+                return False
+            if time.monotonic() - state.opened_at < self.cooldown or state.trial_in_flight:
+                raise CircuitOpenError(f"Circuit open for {host}; skipping request")
+            # Cooldown over: let a single trial request through (half-open)
+            state.trial_in_flight = True
+            return True
+
+    def end_trial(self, host):
+        """Let the next trial through even if this one ended without a recorded outcome"""
+        with self._lock:
+            state = self._hosts.get(host)
+            if state is not None:
+                state.trial_in_flight = False
+
+    def record_success(self, host, latency):
+        with self._lock:
+            state = self._state(host)
+            state.latencies.append(latency)
+            if state.opened_at is not None:
+                self.logger.info(f"Circuit closed for {host}")
+            state.consecutive_failures = 0
+            state.opened_at = None
+            state.trial_in_flight = False
+
+    def record_failure(self, host, reason=""):
+        with self._lock:
+            state = self._state(host)
+            state.consecutive_failures += 1
+            state.trial_in_flight = False
+            if state.opened_at is not None or state.consecutive_failures >= self.failure_threshold:
+                state.opened_at = time.monotonic()
+                self.logger.warning(
+                    f"Circuit open for {host} after {state.consecutive_failures} consecutive failures"
+                    f"{': ' + reason if reason else ''}; skipping for {self.cooldown:.0f}s"
+                )
+
+    def is_open(self, host):
+        with self._lock:
+            state = self._hosts.get(host)
+            return bool(state and state.opened_at is not None
+                        and time.monotonic() - state.opened_at < self.cooldown)
+
+    def stats(self):
+        """Per-host latency percentiles, current timeout and breaker state"""
+        with self._lock:
+            hosts = list(self._hosts)
+        return {
+            host: {
+                "p50": self.latency_percentile(host, 0.5),
+                "p95": self.latency_percentile(host, 0.95),
+                "timeout": self.timeout_for(host),
+                "circuit_open": self.is_open(host),
+            }
+            for host in hosts
+        }
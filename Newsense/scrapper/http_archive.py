@@ -0,0 +1,128 @@
+# http_archive.py
+"""
+Record/replay HTTP archive for the scraper.
+
+ArchiveRecorder wraps a transport (anything with a requests-style ``get``) and
+appends every response to a gzip-compressed JSON-lines file. ArchiveReplayer
+serves the scraper from such a file, optionally sleeping to simulate network
+latency, so full refreshes can be profiled without network access.
+"""
+
+import base64
+import gzip
+import json
+import logging
+import threading
+import time
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+
+class ArchiveMiss(requests.exceptions.ConnectionError):
+    """Raised in replay mode when a URL was never recorded"""
+
+
+class ArchiveRecorder:
+    """Transport wrapper that records every response it returns"""
+
+    def __init__(self, path, transport=requests):
+        self.path = path
+        self.transport = transport
+        self.logger = logging.getLogger("EnhancedNewsScraper.archive")
+        self._lock = threading.Lock()
+        self._file = gzip.open(path, "at", encoding="utf-8")
+        self.recorded = 0
+
+    def get(self, url, **kwargs):
+        start = time.perf_counter()
+        response = self.transport.get(url, **kwargs)
+        elapsed = time.perf_counter() - start
+        entry = {
+            "url": url,
+            "final_url": response.url,
+            "status": response.status_code,
+            "headers": dict(response.headers),
+            "encoding": response.encoding,
+            "elapsed": round(elapsed, 6),
+            "body": base64.b64encode(response.content).decode("ascii"),
+        }
+        with self._lock:
+            self._file.write(json.dumps(entry) + "\n")
+            self.recorded += 1
+        return response
+
+    def log_stats(self):
+        if hasattr(self.transport, "log_stats"):
+            return self.transport.log_stats()
+
+    def close(self):
+        with self._lock:
+            self._file.close()
+        if hasattr(self.transport, "close"):
+            self.transport.close()
+        self.logger.info(f"Recorded {self.recorded} responses to {self.path}")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+class ArchiveReplayer:
+    """Transport that serves responses from a recorded archive"""
+
+    def __init__(self, path, latency=0.0, recorded_latency=False):
+        """
+        Args:
+            path (str): Archive written by ArchiveRecorder
+            latency (float): Seconds to sleep before every response
+            recorded_latency (bool): Sleep for the originally recorded duration instead
+        """
+        self.path = path
+        self.latency = latency
+        self.recorded_latency = recorded_latency
+        self.logger = logging.getLogger("EnhancedNewsScraper.archive")
+        self.entries = {}
+        self.hits = 0
+        self.misses = 0
+
+        # Later recordings of the same URL replace earlier ones
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    entry = json.loads(line)
+                    self.entries[entry["url"]] = entry
+        self.logger.info(f"Loaded {len(self.entries)} recorded responses from {path}")
+
+    def get(self, url, **kwargs):
+        entry = self.entries.get(url)
+        if entry is None:
+            self.misses += 1
+            raise ArchiveMiss(f"No recorded response for {url}")
+
+        delay = entry.get("elapsed", 0.0) if self.recorded_latency else self.latency
+        if delay:
+            time.sleep(delay)
+
+        self.hits += 1
+        return self._build_response(entry)
+
+    def _build_response(self, entry):
+        response = requests.models.Response()
+        response.status_code = entry["status"]
+        response.headers = CaseInsensitiveDict(entry["headers"])
+        response.url = entry.get("final_url") or entry["url"]
+        response.encoding = entry.get("encoding")
+        response._content = base64.b64decode(entry["body"])
+        return response
+
+    def close(self):
+        self.logger.info(f"Replay finished: {self.hits} hits, {self.misses} misses")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
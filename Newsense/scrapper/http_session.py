@@ -0,0 +1,120 @@
+# http_session.py
+"""
+Pooled keep-alive HTTP sessions for the scraper.
+
+HostSessionPool keeps one requests.Session per host, each with its own
+connection pool and retry/backoff policy, so consecutive article downloads
+from the same site reuse TCP/TLS connections instead of reconnecting.
+"""
+
+import logging
+import threading
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+
+class HostSessionPool:
+    """One pooled requests.Session per host, exposing a requests-style get()"""
+
+    def __init__(self, pool_connections=4, pool_maxsize=10, retries=2, backoff_factor=0.5,
+                 status_forcelist=(429, 500, 502, 503, 504), headers=None):
+        """
+        Args:
+            pool_connections (int): Connection pools cached per session (one per scheme/port)
+            pool_maxsize (int): Keep-alive connections kept open per host
+            retries (int): Retries for connection errors and retryable status codes
+            backoff_factor (float): Exponential backoff base between retries, in seconds
+            status_forcelist (tuple): Status codes that trigger a retry
+            headers (dict): Default headers sent with every request
+        """
+        self.pool_connections = pool_connections
+        self.pool_maxsize = pool_maxsize
+        self.retry = Retry(
+            total=retries,
+            connect=retries,
+            read=retries,
+            status=retries,
+            backoff_factor=backoff_factor,
+            status_forcelist=status_forcelist,
+            allowed_methods=frozenset(["GET", "HEAD"]),
+            raise_on_status=False,
+        )
+        self.headers = headers or {}
+        self.logger = logging.getLogger("EnhancedNewsScraper.http")
+        self._sessions = {}
+        self._requests = {}
+        self._lock = threading.Lock()
+
+    def session_for(self, url):
+        """Return the session for the URL's host, creating it on first use"""
+        host = urlparse(url).netloc
+        with self._lock:
+            session = self._sessions.get(host)
+            if session is None:
+                session = requests.Session()
+                session.headers.update(self.headers)
+                adapter = HTTPAdapter(
+                    pool_connections=self.pool_connections,
+                    pool_maxsize=self.pool_maxsize,
+                    max_retries=self.retry,
+                )
+                session.mount("http://", adapter)
+                session.mount("https://", adapter)
+                self._sessions[host] = session
+                self._requests[host] = 0
+            self._requests[host] += 1
+        return session
+
+    def get(self, url, **kwargs):
+        return self.session_for(url).get(url, **kwargs)
+
+    def stats(self):
+        """Per-host request and connection counts, as reported by urllib3's pools"""
+        stats = {}
+        with self._lock:
+            sessions = list(self._sessions.items())
+        for host, session in sessions:
+            connections = 0
+            pooled_requests = 0
+            for adapter in set(session.adapters.values()):
+                pools = getattr(adapter, "poolmanager", None)
+                if pools is None:
+                    continue
+                for key in list(pools.pools.keys()):
+                    pool = pools.pools.get(key)
+                    if pool is not None:
+                        connections += pool.num_connections
+                        pooled_requests += pool.num_requests
+            requests_made = self._requests.get(host, 0)
+            stats[host] = {
+                "requests": requests_made,
+                "connections_opened": connections,
+                "connections_reused": max(pooled_requests - connections, 0),
+            }
+        return stats
+
+    def log_stats(self):
+        """Log connection reuse per host and overall"""
+        stats = self.stats()
+        total_requests = sum(s["requests"] for s in stats.values())
+        total_connections = sum(s["connections_opened"] for s in stats.values())
+        for host, s in sorted(stats.items()):
+            self.logger.info(
+                f"{host}: {s['requests']} requests over {s['connections_opened']} connections "
+                f"({s['connections_reused']} reused)"
+            )
+        if total_requests:
+            self.logger.info(
+                f"HTTP totals: {total_requests} requests, {total_connections} connections opened "
+                f"across {len(stats)} hosts"
+            )
+        return stats
+
+    def close(self):
+        with self._lock:
+            for session in self._sessions.values():
+                session.close()
+            self._sessions.clear()
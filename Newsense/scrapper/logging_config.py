@@ -0,0 +1,162 @@
+# logging_config.py
+"""
+Non-blocking, structured logging shared by the scraper and the web app.
+
+Log calls only build the record and put it on an in-memory queue
+(QueueHandler); a QueueListener thread does the formatting and the file and
+console writes. Per-item messages (one per article) can be marked with
+extra=sampled(...) so that only one in every `sample_every` of them from the
+same call site is kept, and they are dropped before reaching the queue.
+Records can carry structured fields, which the JSON format writes as keys.
+"""
+
+import atexit
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import threading
+
+# LogRecord attributes that are not user-supplied fields
+_RESERVED = set(vars(logging.makeLogRecord({}))) | {"message", "asctime", "sampled", "fields"}
+
+_listener = None
+_lock = threading.Lock()
+
+
+def sampled(**fields):
+    """extra= for a per-item message: subject to sampling, with optional structured fields"""
+    return {"sampled": True, "fields": fields}
+
+
+class SamplingFilter(logging.Filter):
+    """Keep 1 in every `every` sampled records per call site; warnings and errors always pass"""
+
+    def __init__(self, every=10):
+        super().__init__()
+        self.every = max(1, every)
+        self._counts = {}
+
+    def filter(self, record):
+        if not getattr(record, "sampled", False) or record.levelno >= logging.WARNING:
+            return True
+        key = (record.name, record.lineno)
+        count = self._counts.get(key, 0)
+        self._counts[key] = count + 1
+        if count % self.every:
+            return False
+        if self.every > 1:
+            record.sample_rate = self.every
+        return True
+
+
+class JSONFormatter(logging.Formatter):
+    """One JSON object per line: time, level, logger, message and any structured fields"""
+
+    def format(self, record):
+        entry = {
+            "time": self.formatTime(record),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        entry.update(getattr(record, "fields", None) or {})
+        for key, value in vars(record).items():
+            if key not in _RESERVED and key not in entry:
+                entry[key] = value
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry["exception"] = record.exc_text
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+
+class _StructuredQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that keeps exc_info and structured fields for the listener's formatter"""
+
+    def prepare(self, record):
+        # The default prepare() formats the message into record.msg and drops
+        # exc_info; only the message is merged here so formatters still see fields
+        record = logging.makeLogRecord(vars(record))
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info and not record.exc_text:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+        record.exc_info = None
+        return record
+
+
+def configure_logging(log_file=None, level=logging.INFO, json_format=False, sample_every=10, console=True):
+    """
+    Route all logging through a queue to a background writer thread (only the first call applies).
+
+    Args:
+        log_file (str): File to append log lines to (None for console only)
+        level (int): Root logger level
+        json_format (bool): Write JSON lines instead of plain text
+        sample_every (int): Keep 1 in this many per-item (sampled) messages per call site
+        console (bool): Also write to stderr
+
+    Returns:
+        QueueListener: The running listener (stopped automatically at exit)
+    """
+    global _listener
+    with _lock:
+        if _listener is not None:
+            return _listener
+
+        if json_format:
+            formatter = JSONFormatter()
+        else:
+            formatter = logging.Formatter("%(asctime)s - %(levelname)s - %(name)s - %(message)s")
+        handlers = []
+        if log_file:
+            directory = os.path.dirname(log_file)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            handlers.append(logging.FileHandler(log_file, encoding="utf-8"))
+        if console:
+            handlers.append(logging.StreamHandler())
+        for handler in handlers:
+            handler.setFormatter(formatter)
+
+        log_queue = queue.SimpleQueue()
+        queue_handler = _StructuredQueueHandler(log_queue)
+        queue_handler.addFilter(SamplingFilter(sample_every))
+
+        root = logging.getLogger()
+        for handler in list(root.handlers):
+            root.removeHandler(handler)
+        root.addHandler(queue_handler)
+        root.setLevel(level)
+
+        _listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+        _listener.start()
+        atexit.register(stop_logging)
+        return _listener
+
+
+def configure_worker_logging(level=logging.WARNING):
+    """
+    Logging for forked worker processes: the parent's queue is never drained
+    in the child, so write warnings and errors straight to stderr instead.
+    """
+    global _listener
+    _listener = None
+    handler = logging.StreamHandler()
+    handler.setFormatter(logging.Formatter("%(asctime)s - %(levelname)s - %(name)s[%(process)d] - %(message)s"))
+    root = logging.getLogger()
+    for existing in list(root.handlers):
+        root.removeHandler(existing)
+    root.addHandler(handler)
+    root.setLevel(level)
+
+
+def stop_logging():
+    """Flush queued records and stop the writer thread"""
+    global _listener
+    with _lock:
+        if _listener is not None:
+            _listener.stop()
+            _listener = None
@@ -1,32 +1,51 @@
 # enhanced_news_scraper.py
 import requests
-import feedparser
-from bs4 import BeautifulSoup
 import datetime
 import logging
 import json
 import os
-from newspaper import Article, Config
+from newspaper import Config
 import csv
+import io
 from urllib.parse import urlparse
 from pathlib import Path
 import re
+import sys
+import hashlib
+import time
+from collections import deque
 import nltk
 nltk.download('punkt', quiet=True)
 nltk.download('stopwords', quiet=True)
-from nltk.corpus import stopwords
-from nltk.tokenize import word_tokenize
+
+# Add the parent directory to sys.path so the scrapper package imports work when run directly
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from scrapper.http_session import HostSessionPool
+from scrapper.host_health import HostHealth, CircuitOpenError, FAILURE_STATUSES
+from scrapper.records import ArticleRecord
+from scrapper.catalog import bump_catalog_version, list_source_dirs
+from scrapper.segment_store import store, file_lock, SEGMENT_SUFFIX
+from scrapper.pipeline import CPUStage, ParseOptions, parse_article, extract_article_links, determine_categories, article_tokens
+from scrapper.parsers import parse_feed, resolve_backend
+from scrapper.article_index import build_article_index
+from scrapper.metadata_index import MetadataIndex
+from scrapper.trending import TrendingTracker
+from scrapper.similarity import RelatedIndex, hashed_term_counts
+from scrapper.logging_config import configure_logging, sampled
+
+# Articles kept per source and scrape
+ARTICLES_PER_SOURCE = 10
+
+# Held while the shared indexes are published, so processes publish one at a time
+PUBLISH_LOCK_FILE = ".publish.lock"
 
 class EnhancedNewsScraper:
-    def __init__(self, output_dir="scraped_news", days_threshold=2):
-        # Configure logging
-        logging.basicConfig(
-            level=logging.INFO,
-            format="%(asctime)s - %(levelname)s - %(message)s",
-            handlers=[
-                logging.FileHandler("scraper.log"),
-                logging.StreamHandler()
-            ]
+    def __init__(self, output_dir="scraped_news", days_threshold=2, transport=None, fetch_images=False, workers=None, parser_backend="auto"):
+        # Log file and console writes happen on a background thread; per-article
+        # messages are sampled (see logging_config.py)
+        configure_logging(
+            log_file=os.environ.get("NEWSENSE_LOG_FILE", "scraper.log"),
+            json_format=os.environ.get("NEWSENSE_LOG_FORMAT") == "json"
         )
         self.logger = logging.getLogger("EnhancedNewsScraper")
         self.days_threshold = days_threshold
@@ -81,7 +100,36 @@ class EnhancedNewsScraper:
         self.newspaper_config = Config()
         self.newspaper_config.browser_user_agent = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
         self.newspaper_config.request_timeout = 10
-        self.newspaper_config.fetch_images = True  # Enable image fetching
+        # Downloading every candidate image just to choose top_image is slow; by default the
+        # top image comes from page/feed metadata instead (see _pick_image)
+        self.newspaper_config.fetch_images = fetch_images
+        
+        # Every HTTP fetch (feeds, homepages, articles) goes through this transport
+        # so it can be swapped for a recording or replaying archive. By default it is
+        # a pool of keep-alive sessions, one per host, with retry/backoff
+        self.request_headers = {"User-Agent": self.newspaper_config.browser_user_agent}
+        self.transport = transport or HostSessionPool(headers=self.request_headers)
+        
+        # Timeouts adapt to each host's observed latency (request_timeout is the ceiling),
+        # and hosts that keep failing are skipped for a cooldown period
+        self.host_health = HostHealth(
+            default_timeout=self.newspaper_config.request_timeout,
+            max_timeout=self.newspaper_config.request_timeout
+        )
+        
+        # Parsing, NLP and categorization run in a process pool (see pipeline.py)
+        # while this process keeps fetching; workers=1 parses inline
+        self.cpu_stage = CPUStage(workers)
+        self.parse_options = ParseOptions(
+            user_agent=self.newspaper_config.browser_user_agent,
+            fetch_images=fetch_images,
+            categories=self.categories,
+            category_keywords=self.category_keywords
+        )
+        
+        # Homepage links and feeds are read with the fastest installed parser
+        # (see parsers.py); "bs4" keeps BeautifulSoup's html.parser and feedparser
+        self.parser_backend = resolve_backend(parser_backend)
         
         #  base output directory if it doesn't exist
         self.output_dir = output_dir
@@ -89,11 +137,32 @@ class EnhancedNewsScraper:
         
         # Create a main CSV file to store article metadata
         self.csv_path = os.path.join(self.output_dir, "articles_index.csv")
-        if not os.path.exists(self.csv_path):
-            with open(self.csv_path, 'w', newline='', encoding='utf-8') as f:
-                writer = csv.writer(f)
-                writer.writerow(['id', 'title', 'source', 'url', 'published_date', 
-                                 'scraped_date', 'categories', 'has_image', 'filename'])
+        # Appends from several scraper processes are serialized through this lock file
+        self.csv_lock_path = self.csv_path + ".lock"
+        with file_lock(self.csv_lock_path):
+            if not os.path.exists(self.csv_path) or os.path.getsize(self.csv_path) == 0:
+                with open(self.csv_path, 'w', newline='', encoding='utf-8') as f:
+                    writer = csv.writer(f)
+                    writer.writerow(['id', 'title', 'source', 'url', 'published_date', 
+                                     'scraped_date', 'categories', 'has_image', 'filename'])
+        
+        # Articles are appended to per-source day segments (see segment_store.py)
+        self.store = store
+        
+        # Columnar copy of the CSV index for fast filtering (see metadata_index.py)
+        self.metadata_index = MetadataIndex(os.path.join(self.output_dir, "metadata_index"), self.categories)
+        
+        # Time-decayed keyword counts fed at ingest and served by /api/trending (see trending.py)
+        self.trending_path = os.path.join(self.output_dir, "trending.npz")
+        self.trending = TrendingTracker.load_or_create(self.trending_path, self.categories)
+        
+        # TF-IDF vectors of saved articles, served by /api/articles/{id}/related (see similarity.py)
+        self.related_index = RelatedIndex(os.path.join(self.output_dir, "related_index"))
+        
+        # Article ids already on disk; when set, known URLs are not downloaded again
+        self.seen_ids = None
+        self._seen_offset = 0
+        self._seen_inode = None
     
     def scrape_all_sources(self):
         """Scrape news from all configured sources"""
@@ -102,34 +171,166 @@ class EnhancedNewsScraper:
         articles_count = 0
         for source in self.sources:
             try:
-                source_name = source["name"]
-                self.logger.info(f"Scraping {source_name} from {source['url']}")
-                
-                # Create source-specific directory
-                source_dir = os.path.join(self.output_dir, self._sanitize_filename(source_name))
-                Path(source_dir).mkdir(parents=True, exist_ok=True)
-                
-                if source["type"] == "rss":
-                    articles = self.scrape_rss(source_name, source["url"], source.get("default_category", "general"))
-                elif source["type"] == "web":
-                    articles = self.scrape_website(source_name, source["url"], source.get("default_category", "general"))
-                else:
-                    self.logger.warning(f"Unknown source type: {source['type']} for {source_name}")
-                    continue
-                
-                # Save articles
-                for article in articles:
-                    self.save_article(article, source_dir)
-                
-                articles_count += len(articles)
-                self.logger.info(f"Successfully scraped {len(articles)} articles from {source_name}")
-                
+                articles_count += len(self.scrape_source(source))
             except Exception as e:
                 self.logger.error(f"Error scraping {source['name']}: {str(e)}")
         
         self.logger.info(f"Completed scraping. Total articles: {articles_count}")
+        self.publish_index()
+        if hasattr(self.transport, "log_stats"):
+            self.transport.log_stats()
+        for host, health in self.host_health.stats().items():
+            if health["circuit_open"]:
+                self.logger.warning(f"{host} is still being skipped (circuit open)")
         return articles_count
     
+    def scrape_source(self, source):
+        """Scrape and save a single configured source, returning the saved articles"""
+        source_name = source["name"]
+        self.logger.info(f"Scraping {source_name} from {source['url']}")
+        
+        # Create source-specific directory
+        source_dir = self.source_dir(source_name)
+        Path(source_dir).mkdir(parents=True, exist_ok=True)
+        
+        if source["type"] == "rss":
+            articles = self.scrape_rss(source_name, source["url"], source.get("default_category", "general"))
+        elif source["type"] == "web":
+            articles = self.scrape_website(source_name, source["url"], source.get("default_category", "general"))
+        else:
+            self.logger.warning(f"Unknown source type: {source['type']} for {source_name}")
+            return []
+        
+        # Save articles in one batch
+        if articles:
+            self.save_articles(articles, source_dir)
+            bump_catalog_version(self.output_dir)
+        
+        self.logger.info(f"Successfully scraped {len(articles)} articles from {source_name}")
+        return articles
+    
+    def source_dir(self, source_name):
+        """Directory a source's articles are stored in"""
+        return os.path.join(self.output_dir, self._sanitize_filename(source_name))
+    
+    def article_id(self, url):
+        """Stable article id derived from the URL"""
+        return hashlib.md5(url.encode()).hexdigest()
+    
+    def load_seen_ids(self):
+        """
+        Read the ids of indexed articles and skip them on later scrapes. Repeated
+        calls only read the rows appended since (by any process), so long-running
+        workers call it before each discovery.
+        """
+        data = b""
+        with file_lock(self.csv_lock_path):
+            try:
+                with open(self.csv_path, 'rb') as f:
+                    st = os.fstat(f.fileno())
+                    # Start over when the CSV was replaced (see prune_csv_index)
+                    if self.seen_ids is None or st.st_ino != self._seen_inode or st.st_size < self._seen_offset:
+                        self.seen_ids = set()
+                        self._seen_offset = 0
+                        self._seen_inode = st.st_ino
+                    f.seek(self._seen_offset)
+                    data = f.read()
+            except FileNotFoundError:
+                if self.seen_ids is None:
+                    self.seen_ids = set()
+        self._seen_offset += len(data)
+        # Read under the lock, so the data ends on a row boundary; ids are the first column
+        for row in csv.reader(io.StringIO(data.decode('utf-8'), newline='')):
+            if row and row[0] and row[0] != 'id':
+                self.seen_ids.add(row[0])
+        return self.seen_ids
+    
+    def _is_seen(self, url):
+        return self.seen_ids is not None and self.article_id(url) in self.seen_ids
+    
+    def fetch(self, url, timeout=None):
+        """Fetch a URL through the configured transport, with per-host timeouts and circuit breaking"""
+        host = urlparse(url).netloc
+        trial = self.host_health.before_request(host)
+        
+        start = time.perf_counter()
+        try:
+            try:
+                response = self.transport.get(
+                    url,
+                    headers=self.request_headers,
+                    timeout=timeout or self.host_health.timeout_for(host)
+                )
+            except requests.exceptions.RequestException as e:
+                self.host_health.record_failure(host, type(e).__name__)
+                raise
+            
+            if response.status_code in FAILURE_STATUSES:
+                self.host_health.record_failure(host, f"HTTP {response.status_code}")
+            else:
+                self.host_health.record_success(host, time.perf_counter() - start)
+            return response
+        finally:
+            # A half-open trial that raised anything else must not block the host for good
+            if trial:
+                self.host_health.end_trial(host)
+    
+    def close(self):
+        """Shut down the parsing worker processes"""
+        self.cpu_stage.close()
+    
+    def _fetch_html(self, url):
+        """I/O stage: download an article page through the shared fetch path"""
+        response = self.fetch(url)
+        response.raise_for_status()
+        return response.text
+    
+    def _submit_parse(self, url, html, default_category):
+        """CPU stage: parse, run NLP and categorize a downloaded page in the worker pool"""
+        return self.cpu_stage.submit(parse_article, url, html, default_category, self.parse_options)
+    
+    def _pick_image(self, article, entry=None):
+        """Choose the article's top image from metadata, without downloading any images"""
+        if self.newspaper_config.fetch_images and article.top_image:
+            return article.top_image
+        
+        # og:image / link rel=image_src, as extracted by newspaper3k during parse()
+        if article.meta_img:
+            return article.meta_img
+        
+        if entry is not None:
+            return self._entry_image(entry)
+        return ""
+    
+    def _entry_image(self, entry):
+        """Image URL from an RSS entry's media:content / media:thumbnail / image enclosures"""
+        for media in list(entry.get('media_content', [])) + list(entry.get('media_thumbnail', [])):
+            if media.get('url'):
+                return media['url']
+        for link in entry.get('links', []):
+            if link.get('type', '').startswith('image/') and link.get('href'):
+                return link['href']
+        return ""
+    
+    def _article_record(self, article, url, title, source_name, published_date, html, image_url):
+        """Build the stored record for a parsed article"""
+        record = ArticleRecord(
+            title=title,
+            content=article.text,
+            url=url,
+            source=source_name,
+            published_date=published_date.isoformat(),
+            scraped_date=datetime.datetime.now().isoformat(),
+            html=html,
+            authors=article.authors,
+            keywords=article.keywords,
+            summary=article.summary,
+            categories=article.categories,
+            image_url=image_url,
+        )
+        record.term_counts = article.term_counts
+        return record
+    
     def _sanitize_filename(self, filename):
         """Convert a string to a valid filename"""
         return re.sub(r'[^\w\s-]', '', filename).strip().replace(' ', '_')
@@ -151,48 +352,18 @@ class EnhancedNewsScraper:
     
     def determine_categories(self, title, content, default_category):
         """Determine article categories based on content analysis"""
-        # Start with default category
-        categories = [default_category]
-        
-        # Combine title and content for analysis, convert to lowercase
-        text = (title + " " + content).lower()
-        
-        # Tokenize and remove stopwords
-        stop_words = set(stopwords.words('english'))
-        word_tokens = word_tokenize(text)
-        filtered_text = [word for word in word_tokens if word.isalpha() and word not in stop_words]
-        
-        # Count category keyword occurrences
-        category_scores = {category: 0 for category in self.categories}
-        
-        # Skip the default category that was already added
-        for category, keywords in self.category_keywords.items():
-            for keyword in keywords:
-                count = sum(1 for word in filtered_text if keyword == word)
-                # Also check for multi-word keywords
-                count += text.count(keyword)
-                category_scores[category] += count
-        
-        # Normalize by the number of keywords in each category
-        for category in category_scores:
-            if category in self.category_keywords:
-                num_keywords = len(self.category_keywords[category])
-                if num_keywords > 0:
-                    category_scores[category] /= num_keywords
-        
-        # Add categories that score above threshold (excluding default category)
-        threshold = 0.5
-        for category, score in category_scores.items():
-            if score > threshold and category != default_category:
-                categories.append(category)
-        
-        return list(set(categories))  # Remove duplicates
+        return determine_categories(title, content, default_category, self.categories, self.category_keywords)
     
     def scrape_rss(self, source_name, rss_url, default_category):
         """Scrape articles from RSS feed"""
         articles = []
-        feed = feedparser.parse(rss_url)
+        response = self.fetch(rss_url)
+        response_headers = {k.lower(): v for k, v in response.headers.items()}
+        response_headers["content-location"] = response.url
+        feed = parse_feed(response.content, response_headers, self.parser_backend)
         
+        # Pages are fetched here while earlier ones are parsed in the worker pool
+        pending = []
         for entry in feed.entries:  # Process all entries but filter by date later
             try:
                 # Check if we have URL
@@ -208,108 +379,89 @@ class EnhancedNewsScraper:
                 
                 # Check if article is recent
                 if not self.is_recent_article(published_date):
-                    self.logger.info(f"Skipping older article: {entry.title if hasattr(entry, 'title') else 'Unknown'}")
+                    self.logger.info("Skipping older article: %s", getattr(entry, 'title', 'Unknown'),
+                                     extra=sampled(source=source_name))
+                    continue
+                
+                # Skip articles that were already saved by an earlier scrape
+                if self._is_seen(entry.link):
                     continue
                     
-                # Extract article content using newspaper3k
-                article = Article(entry.link, config=self.newspaper_config)
-                article.download()
-                article.parse()
-                article.nlp()  # Run NLP to extract keywords and summary
+                html = self._fetch_html(entry.link)
+                pending.append((entry, published_date, html, self._submit_parse(entry.link, html, default_category)))
+                
+            except CircuitOpenError as e:
+                self.logger.warning(f"Stopping {source_name}: {str(e)}")
+                break
+            except Exception as e:
+                self.logger.error(f"Error processing RSS article {entry.link if hasattr(entry, 'link') else 'unknown'}: {str(e)}")
+        
+        for entry, published_date, html, future in pending:
+            try:
+                # Article content extracted by newspaper3k in the CPU stage
+                article = future.result()
                 
                 # Update published date if available from article
                 if article.publish_date:
                     published_date = article.publish_date
                 
                 # Get the top image if available
-                image_url = ""
-                if article.top_image:
-                    image_url = article.top_image
-                elif hasattr(entry, 'media_content') and entry.media_content:
-                    for media in entry.media_content:
-                        if 'url' in media:
-                            image_url = media['url']
-                            break
-                
-                # Determine categories
-                categories = self.determine_categories(article.title, article.text, default_category)
+                image_url = self._pick_image(article, entry)
                 
                 # Create article object
-                article_data = {
-                    "title": entry.title,
-                    "content": article.text,
-                    "url": entry.link,
-                    "source": source_name,
-                    "published_date": published_date.isoformat(),
-                    "scraped_date": datetime.datetime.now().isoformat(),
-                    "html": article.html,
-                    "authors": article.authors,
-                    "keywords": article.keywords,
-                    "summary": article.summary,
-                    "categories": categories,
-                    "image_url": image_url,
-                }
+                article_data = self._article_record(article, entry.link, entry.title, source_name,
+                                                    published_date, html, image_url)
                 
                 articles.append(article_data)
-                self.logger.info(f"Scraped RSS article: {entry.title} (Categories: {', '.join(categories)})")
+                self.logger.info("Scraped RSS article: %s", entry.title,
+                                 extra=sampled(source=source_name, url=entry.link, categories=article.categories))
                 
             except Exception as e:
-                self.logger.error(f"Error processing RSS article {entry.link if hasattr(entry, 'link') else 'unknown'}: {str(e)}")
+                self.logger.error(f"Error processing RSS article {entry.link}: {str(e)}")
                 
-        return articles[:10]  # Limit to 10 most recent articles per source
+        return articles[:ARTICLES_PER_SOURCE]  # Limit to the most recent articles per source
     
     def scrape_website(self, source_name, website_url, default_category):
         """Scrape articles from a website"""
         articles = []
         
         try:
-            # Use a realistic user agent to avoid being blocked
-            headers = {
-                "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
-            }
-            response = requests.get(website_url, headers=headers, timeout=10)
-            soup = BeautifulSoup(response.content, 'html.parser')
-            
-            # Extract domain for relative URL handling
-            parsed_url = urlparse(website_url)
-            base_url = f"{parsed_url.scheme}://{parsed_url.netloc}"
+            # Uses a realistic user agent to avoid being blocked
+            response = self.fetch(website_url)
             
             # Find article links - this pattern needs to be customized for each site
-            article_links = set()
-            
-            # Look for common article link patterns
-            for a in soup.find_all('a', href=True):
-                href = a['href']
-                # Skip navigation, social, and other non-article links
-                if any(skip in href for skip in ['javascript:', 'mailto:', '#', 'twitter.com', 'facebook.com']):
-                    continue
-                    
-                # Look for links that might be articles based on URL structure
-                current_year = str(datetime.datetime.now().year)
-                previous_year = str(datetime.datetime.now().year - 1)
-                if any(pattern in href for pattern in ['/news/', '/article/', '/story/', f'/{current_year}/', f'/{previous_year}/', '/content/']):
-                    # Handle relative URLs
-                    if href.startswith('/'):
-                        full_url = base_url + href
-                    elif not href.startswith(('http://', 'https://')):
-                        full_url = base_url + '/' + href
-                    else:
-                        full_url = href
-                    
-                    # Only add URLs from the same domain
-                    if urlparse(full_url).netloc == parsed_url.netloc:
-                        article_links.add(full_url)
+            article_links = self.cpu_stage.submit(
+                extract_article_links, response.content, website_url, self.parser_backend
+            ).result()
             
-            # Process each article link
-            article_links = list(article_links)  # Convert to list for processing
+            # Fetch pages here and parse them in the worker pool, keeping up to one
+            # page per worker in flight so fetching and parsing overlap
+            links = iter(url for url in article_links if not self._is_seen(url))
+            pending = deque()
+            fetching = True
             scraped_articles = []
             
-            for url in article_links:
+            while len(scraped_articles) < ARTICLES_PER_SOURCE:
+                while fetching and len(pending) < self.cpu_stage.workers:
+                    url = next(links, None)
+                    if url is None:
+                        fetching = False
+                        break
+                    try:
+                        html = self._fetch_html(url)
+                        pending.append((url, html, self._submit_parse(url, html, default_category)))
+                    except CircuitOpenError as e:
+                        self.logger.warning(f"Stopping {source_name}: {str(e)}")
+                        fetching = False
+                    except Exception as e:
+                        self.logger.error(f"Error processing web article {url}: {str(e)}")
+                
+                if not pending:
+                    break
+                
+                url, html, future = pending.popleft()
                 try:
-                    article = Article(url, config=self.newspaper_config)
-                    article.download()
-                    article.parse()
-                    article.nlp() 
+                    article = future.result()
 
                     if len(article.text) < 500:
                         continue
@@ -321,34 +473,20 @@ class EnhancedNewsScraper:
                     if not self.is_recent_article(published_date):
                         continue
                     
-                    # Determine categories
-                    categories = self.determine_categories(article.title, article.text, default_category)
-                    
-                    article_data = {
-                        "title": article.title,
-                        "content": article.text,
-                        "url": url,
-                        "source": source_name,
-                        "published_date": published_date.isoformat(),
-                        "scraped_date": datetime.datetime.now().isoformat(),
-                        "html": article.html,
-                        "authors": article.authors,
-                        "keywords": article.keywords,
-                        "summary": article.summary,
-                        "categories": categories,
-                        "image_url": article.top_image,
-                    }
+                    article_data = self._article_record(article, url, article.title, source_name,
+                                                        published_date, html, self._pick_image(article))
                     
                     scraped_articles.append(article_data)
-                    self.logger.info(f"Scraped web article: {article.title} (Categories: {', '.join(categories)})")
+                    self.logger.info("Scraped web article: %s", article.title,
+                                     extra=sampled(source=source_name, url=url, categories=article.categories))
                     
-                    # Stop after finding 10 valid articles
-                    if len(scraped_articles) >= 10:
-                        break
-                        
                 except Exception as e:
                     self.logger.error(f"Error processing web article {url}: {str(e)}")
             
+            # Stop after finding enough valid articles; drop parses still in flight
+            for _, _, future in pending:
+                future.cancel()
+            
             articles = scraped_articles
         
         except Exception as e:
@@ -357,75 +495,320 @@ class EnhancedNewsScraper:
         return articles
     
     def save_article(self, article, source_dir):
-        """Save article to disk and update the index"""
+        """Save a single article to disk and update the index"""
+        saved = self.save_articles([article], source_dir)
+        return saved[0] if saved else None
+    
+    def save_articles(self, articles, source_dir, update_derived=True):
+        """
+        Append a batch of articles to the source's day segment and update the index.
+
+        With update_derived=False the trending and related-article indexes are
+        left alone (work-queue workers leave them to index_saved_articles()).
+        """
+        if not articles:
+            return []
         try:
-            # Create a unique ID for the article based on URL
-            import hashlib
-            article_id = hashlib.md5(article["url"].encode()).hexdigest()
+            # Create a unique ID for each article based on URL
+            ids = [self.article_id(article["url"]) for article in articles]
+            records = []
+            for article, article_id in zip(articles, ids):
+                data = article.to_dict() if isinstance(article, ArticleRecord) else dict(article)
+                data["id"] = article_id
+                records.append(data)
             
-            # Create a filename
-            timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
-            filename = f"{article_id}_{timestamp}.json"
-            filepath = os.path.join(source_dir, filename)
+            # One append and one fsync for the whole batch
+            entries = self.store.append_batch(source_dir, records, ids)
             
-            # Save the full article data as JSON
-            with open(filepath, 'w', encoding='utf-8') as f:
-                json.dump(article, f, ensure_ascii=False, indent=4)
+            # Update the CSV index; filename points at the segment holding the article
+            with file_lock(self.csv_lock_path), open(self.csv_path, 'a', newline='', encoding='utf-8') as f:
+                writer = csv.writer(f)
+                for article, entry in zip(records, entries):
+                    writer.writerow([
+                        entry.id,
+                        article["title"],
+                        article["source"],
+                        article["url"],
+                        article["published_date"],
+                        article["scraped_date"],
+                        ",".join(article["categories"]),
+                        "yes" if article.get("image_url") else "no",
+                        os.path.relpath(entry.segment, self.output_dir)
+                    ])
             
-            # Get relative path for CSV index
-            rel_filepath = os.path.relpath(filepath, self.output_dir)
+            if self.seen_ids is not None:
+                self.seen_ids.update(ids)
             
-            # Update the CSV index
-            with open(self.csv_path, 'a', newline='', encoding='utf-8') as f:
-                writer = csv.writer(f)
-                writer.writerow([
-                    article_id,
-                    article["title"],
-                    article["source"],
-                    article["url"],
-                    article["published_date"],
-                    article["scraped_date"],
-                    ",".join(article["categories"]),
-                    "yes" if article.get("image_url") else "no",
-                    rel_filepath
-                ])
+            if update_derived:
+                for article in records:
+                    self.trending.add_article(article.get("keywords"), article.get("categories"))
+                
+                # Reuse the parse step's token counts; plain dicts are tokenized here
+                related = []
+                for article, data, entry in zip(articles, records, entries):
+                    counts = getattr(article, "term_counts", None)
+                    if counts is None:
+                        counts = hashed_term_counts(article_tokens(data.get("title") or "", data.get("content") or ""))
+                    related.append((entry.id, os.path.basename(source_dir), os.path.relpath(entry.segment, source_dir), counts))
+                self.related_index.add_batch(related)
                 
-            return filepath
+            return [entry.segment for entry in entries]
+            
+        except Exception as e:
+            self.logger.error(f"Error saving {len(articles)} articles to {source_dir}: {str(e)}")
+            return []
+    
+    def index_saved_articles(self, saved):
+        """
+        Feed articles saved with update_derived=False to the trending and related indexes.
+
+        Args:
+            saved (list): {"id", "source", "segment"} dicts, segment relative to the source directory
+
+        Returns:
+            int: Number of articles indexed
+        """
+        related = []
+        for item in saved:
+            source_dir = os.path.join(self.output_dir, item["source"])
+            try:
+                entry = self.store.find(source_dir, item["id"], segment=os.path.join(source_dir, item["segment"]))
+                if entry is None:
+                    continue
+                data = self.store.read_entry(entry)
+            except (OSError, ValueError, KeyError) as e:
+                self.logger.error(f"Error reading saved article {item['id']}: {str(e)}")
+                continue
+            self.trending.add_article(data.get("keywords"), data.get("categories"))
+            counts = hashed_term_counts(article_tokens(data.get("title") or "", data.get("content") or ""))
+            related.append((entry.id, item["source"], os.path.relpath(entry.segment, source_dir), counts))
+        self.related_index.add_batch(related)
+        return len(related)
+    
+    # Work-queue mode (see work_queue.py): sources and articles are separate tasks
+    
+    def discover_articles(self, source):
+        """
+        New article URLs of a source, as payloads for scrape_article().
+        
+        Feed entries carry their title, date and image. Homepage links are capped
+        at twice the per-source limit, since some pages turn out too short to keep.
+        """
+        source_name = source["name"]
+        default_category = source.get("default_category", "general")
+        found = []
+        
+        def payload(url, **fields):
+            return dict(url=url, source=source_name, type=source["type"], default_category=default_category, **fields)
+        
+        if source["type"] == "rss":
+            response = self.fetch(source["url"])
+            response_headers = {k.lower(): v for k, v in response.headers.items()}
+            response_headers["content-location"] = response.url
+            feed = parse_feed(response.content, response_headers, self.parser_backend)
+            for entry in feed.entries:
+                if not hasattr(entry, 'link') or self._is_seen(entry.link):
+                    continue
+                published_date = None
+                if hasattr(entry, "published_parsed"):
+                    published_date = datetime.datetime(*entry.published_parsed[:6], tzinfo=datetime.timezone.utc)
+                    if not self.is_recent_article(published_date):
+                        continue
+                found.append(payload(
+                    entry.link,
+                    title=getattr(entry, 'title', None),
+                    published_date=published_date.isoformat() if published_date else None,
+                    image_url=self._entry_image(entry)
+                ))
+                if len(found) >= ARTICLES_PER_SOURCE:
+                    break
+        elif source["type"] == "web":
+            response = self.fetch(source["url"])
+            links = self.cpu_stage.submit(
+                extract_article_links, response.content, source["url"], self.parser_backend
+            ).result()
+            for url in links:
+                if not self._is_seen(url):
+                    found.append(payload(url))
+                if len(found) >= 2 * ARTICLES_PER_SOURCE:
+                    break
+        else:
+            self.logger.warning(f"Unknown source type: {source['type']} for {source_name}")
+        return found
+    
+    def scrape_article(self, payload):
+        """
+        Download and parse one discovered article.
+        
+        Returns:
+            ArticleRecord: The article, or None if it is too short or too old to keep
+        """
+        url = payload["url"]
+        html = self._fetch_html(url)
+        article = self._submit_parse(url, html, payload["default_category"]).result()
+        
+        if payload["type"] == "rss":
+            if article.publish_date:
+                published_date = article.publish_date
+            elif payload.get("published_date"):
+                published_date = datetime.datetime.fromisoformat(payload["published_date"])
+            else:
+                published_date = datetime.datetime.now(datetime.timezone.utc)
+            title = payload.get("title") or article.title
+        else:
+            if len(article.text) < 500:
+                return None
+            published_date = article.publish_date or datetime.datetime.now(datetime.timezone.utc)
+            if not self.is_recent_article(published_date):
+                return None
+            title = article.title
+        
+        image_url = self._pick_image(article) or payload.get("image_url") or ""
+        return self._article_record(article, url, title, payload["source"], published_date, html, image_url)
+    
+    def compact_storage(self):
+        """Drop superseded article versions from every source's segments"""
+        dropped = 0
+        for name in list_source_dirs(self.output_dir):
+            dropped += self.store.compact(os.path.join(self.output_dir, name))
+        self.logger.info(f"Compaction dropped {dropped} superseded article versions")
+        self.prune_derived_indexes()
+        self.publish_index()
+        return dropped
+    
+    def apply_retention(self, keep_days, archive_dir=None):
+        """
+        Delete (or archive) every source's day partitions older than keep_days.
+
+        Args:
+            keep_days (int): Days of articles to keep, counting today
+            archive_dir (str): Move expired partitions here instead of deleting them
+
+        Returns:
+            int: Number of partitions removed
+        """
+        removed = 0
+        for name in list_source_dirs(self.output_dir):
+            removed += self.store.apply_retention(os.path.join(self.output_dir, name), keep_days, archive_dir)
+        self.logger.info(f"Retention ({keep_days} days) removed {removed} day partitions")
+        if removed:
+            bump_catalog_version(self.output_dir)
+            self.prune_derived_indexes()
+            self.publish_index()
+        return removed
+    
+    def prune_derived_indexes(self):
+        """
+        Drop CSV and related-index rows of articles no longer stored (after
+        compaction or retention), pointing the rest at their current segment.
+        """
+        live = {}
+        for name in list_source_dirs(self.output_dir):
+            source_dir = os.path.join(self.output_dir, name)
+            for entry in self.store.iter_latest(source_dir):
+                live[(name, entry.id)] = os.path.relpath(entry.segment, source_dir)
+        try:
+            self.prune_csv_index(live)
+        except Exception as e:
+            self.logger.error(f"Error pruning the CSV index: {str(e)}")
+        try:
+            self.related_index.prune(live)
+        except Exception as e:
+            self.logger.error(f"Error pruning the related-articles index: {str(e)}")
+    
+    def prune_csv_index(self, live):
+        """
+        Rewrite articles_index.csv with one row per stored article (its newest row).
+        The file is replaced, so the metadata index rebuilds from scratch.
+
+        Args:
+            live (dict): {(source_dir_name, article_id): segment relative to the source directory}
+
+        Returns:
+            int: Number of rows dropped
+        """
+        with file_lock(self.csv_lock_path):
+            with open(self.csv_path, 'r', newline='', encoding='utf-8') as f:
+                reader = csv.reader(f)
+                header = next(reader, None)
+                rows = list(reader)
+            newest = {}
+            for position, row in enumerate(rows):
+                if not row or not row[0]:
+                    continue
+                source = row[-1].replace(os.sep, "/").split("/")[0]
+                if (source, row[0]) in live:
+                    newest[(source, row[0])] = position
+            dropped = len(rows) - len(newest)
+            if not dropped:
+                return 0
             
+            tmp_path = f"{self.csv_path}.{os.getpid()}.tmp"
+            with open(tmp_path, 'w', newline='', encoding='utf-8') as f:
+                writer = csv.writer(f)
+                if header:
+                    writer.writerow(header)
+                for key, position in sorted(newest.items(), key=lambda item: item[1]):
+                    row = rows[position]
+                    row[-1] = os.path.join(key[0], live[key])
+                    writer.writerow(row)
+            os.replace(tmp_path, self.csv_path)
+        self.logger.info(f"Dropped {dropped} rows of removed or superseded articles from the CSV index")
+        return dropped
+    
+    def publish_index(self):
+        """Rebuild the memory-mapped article index shared by the web workers and swap it in"""
+        try:
+            # One publisher at a time across processes, each starting from what the last one saved
+            with file_lock(os.path.join(self.output_dir, PUBLISH_LOCK_FILE)):
+                self.metadata_index.load()
+                self.metadata_index.refresh(self.csv_path, save=True)
+                self.trending.save_merged(self.trending_path)
+                return build_article_index(self.output_dir)
         except Exception as e:
-            self.logger.error(f"Error saving article {article['url']}: {str(e)}")
-            return None
+            self.logger.error(f"Error publishing article index: {str(e)}")
+            return 0
+    
+    def _load_indexed_article(self, row):
+        """Load the article an index row points to (segment or legacy JSON file)"""
+        filepath = os.path.join(self.output_dir, row['filename'])
+        if filepath.endswith(SEGMENT_SUFFIX):
+            entry = self.store.find(self.store.source_dir_of(filepath), row['id'], segment=filepath)
+        elif os.path.exists(filepath):
+            with open(filepath, 'r', encoding='utf-8') as af:
+                return json.load(af)
+        else:
+            # Legacy file folded into the segments by compaction
+            entry = self.store.find(os.path.dirname(filepath), row['id'])
+        return self.store.read_entry(entry) if entry else None
+
+    def get_recent_articles(self, limit=20, category=None, source=None, since=None, until=None):
+        """
+        Get the most recently scraped articles with optional filters.
 
-    def get_recent_articles(self, limit=20, category=None):
-        """Get the most recently scraped articles with optional category filter"""
+        Args:
+            limit (int): Maximum number of articles
+            category (str): Only articles tagged with this category
+            source (str): Only articles from this source
+            since (float): Only articles scraped at or after this epoch time
+            until (float): Only articles scraped before this epoch time
+        """
         articles = []
         
         try:
-            if os.path.exists(self.csv_path):
-                with open(self.csv_path, 'r', encoding='utf-8') as f:
-                    reader = csv.DictReader(f)
-                    rows = list(reader)
-                    
-                    # Sort by scraped_date (newest first)
-                    rows.sort(key=lambda x: x.get('scraped_date', ''), reverse=True)
-                    
-                    # Filter by category if specified
-                    if category:
-                        rows = [row for row in rows if category in row.get('categories', '').split(',')]
-                    
-                    # Get the most recent articles
-                    recent_rows = rows[:limit]
-                    
-                    for row in recent_rows:
-                        try:
-                            # Load the full article data
-                            filepath = os.path.join(self.output_dir, row['filename'])
-                            if os.path.exists(filepath):
-                                with open(filepath, 'r', encoding='utf-8') as af:
-                                    article = json.load(af)
-                                    articles.append(article)
-                        except Exception as e:
-                            self.logger.error(f"Error loading article {row['filename']}: {str(e)}")
+            # Filtering and newest-N selection run on the columnar index, which
+            # only parses CSV rows added since the last call
+            self.metadata_index.refresh(self.csv_path)
+            rows = self.metadata_index.select(limit=limit, category=category, source=source, since=since, until=until)
+            
+            for article_id, filename in rows:
+                try:
+                    # Load the full article data
+                    article = self._load_indexed_article({'id': article_id, 'filename': filename})
+                    if article is not None:
+                        articles.append(article)
+                except Exception as e:
+                    self.logger.error(f"Error loading article {filename}: {str(e)}")
         except Exception as e:
             self.logger.error(f"Error getting recent articles: {str(e)}")
             
@@ -437,20 +820,12 @@ class EnhancedNewsScraper:
     
     def get_available_categories(self):
         """Get list of all categories found in articles"""
-        categories = set()
-        
         try:
-            if os.path.exists(self.csv_path):
-                with open(self.csv_path, 'r', encoding='utf-8') as f:
-                    reader = csv.DictReader(f)
-                    for row in reader:
-                        for cat in row.get('categories', '').split(','):
-                            if cat:
-                                categories.add(cat)
+            self.metadata_index.refresh(self.csv_path)
+            return self.metadata_index.available_categories()
         except Exception as e:
             self.logger.error(f"Error getting categories: {str(e)}")
-            
-        return sorted(list(categories))
+            return []
 
 if __name__ == "__main__":
     scraper = EnhancedNewsScraper(output_dir="scraped_news")
@@ -0,0 +1,292 @@
+# metadata_index.py
+"""
+Columnar metadata index over articles_index.csv.
+
+Instead of re-reading and splitting every CSV row for each query, the index
+keeps one NumPy array per column: scraped timestamps, source ids, a category
+bitmask (one bit per category) and the article id / storage file of each row.
+Source, category and date filters are vectorized masks and the newest-N pick
+is an argpartition. The CSV is appended to under a lock file, so refresh()
+reads under the same lock and only parses rows added since the last refresh.
+When compaction or retention replaces the CSV (a new inode), the index is
+rebuilt from scratch.
+
+Arrays are saved with np.save under a generation number and loaded with
+mmap_mode="r"; meta.json, replaced atomically and written last, names the
+current generation so readers never see a half-written set of files. The next
+generation number is taken from meta.json, so processes saving in turn never
+reuse one, and the previous generation is kept for readers that have just
+read meta.json.
+"""
+
+import csv
+import datetime
+import io
+import json
+import logging
+import os
+import re
+import threading
+
+import numpy as np
+
+from scrapper.segment_store import file_lock
+
+META_FILE = "meta.json"
+_COLUMN_FILE = re.compile(r"^(\w+)\.(\d+)\.npy$")
+COLUMNS = ("timestamps", "source_ids", "category_masks", "ids", "file_ids")
+MAX_CATEGORIES = 64
+CSV_FIELDS = ['id', 'title', 'source', 'url', 'published_date',
+              'scraped_date', 'categories', 'has_image', 'filename']
+
+
+def _timestamp(value):
+    """Epoch seconds for an ISO date string; unknown dates sort last"""
+    if not value:
+        return -np.inf
+    try:
+        return datetime.datetime.fromisoformat(value.replace('Z', '+00:00')).timestamp()
+    except ValueError:
+        return -np.inf
+
+
+class MetadataIndex:
+    """NumPy columns of article metadata with vectorized filtering"""
+
+    def __init__(self, index_dir, categories=()):
+        """
+        Args:
+            index_dir (str): Directory holding the .npy columns and meta.json
+            categories (list): Known categories, given the first bits of the mask
+        """
+        self.index_dir = index_dir
+        self.logger = logging.getLogger("EnhancedNewsScraper.metadata_index")
+        self._lock = threading.Lock()
+        self._reset(categories)
+        self.load()
+
+    def _reset(self, categories=()):
+        self.generation = 0
+        self.csv_offset = 0
+        self.csv_inode = None
+        self.sources = []
+        self.categories = list(categories)[:MAX_CATEGORIES]
+        self.files = []
+        self.timestamps = np.empty(0, dtype=np.float64)
+        self.source_ids = np.empty(0, dtype=np.int32)
+        self.category_masks = np.empty(0, dtype=np.uint64)
+        self.ids = np.empty(0, dtype="S32")
+        self.file_ids = np.empty(0, dtype=np.int32)
+        self._source_lookup = {}
+        self._category_lookup = {name: bit for bit, name in enumerate(self.categories)}
+        self._file_lookup = {}
+
+    def __len__(self):
+        return len(self.timestamps)
+
+    # Persistence
+
+    def _column_path(self, column, generation):
+        return os.path.join(self.index_dir, f"{column}.{generation}.npy")
+
+    def load(self):
+        """Memory-map the saved columns, if any; returns False when there is no usable index"""
+        meta_path = os.path.join(self.index_dir, META_FILE)
+        try:
+            with open(meta_path, 'r', encoding='utf-8') as f:
+                meta = json.load(f)
+            columns = {
+                column: np.load(self._column_path(column, meta["generation"]), mmap_mode="r")
+                for column in COLUMNS
+            }
+        except (OSError, ValueError, KeyError) as e:
+            if os.path.exists(meta_path):
+                self.logger.warning(f"Ignoring unreadable metadata index {self.index_dir}: {str(e)}")
+            return False
+
+        categories = list(meta["categories"])
+        # A changed category list means bit positions no longer line up
+        if categories[:len(self.categories)] != self.categories:
+            return False
+
+        self.generation = meta["generation"]
+        self.csv_offset = meta["csv_offset"]
+        self.csv_inode = meta.get("csv_inode")
+        self.sources = list(meta["sources"])
+        self.categories = categories
+        self.files = list(meta["files"])
+        for column, array in columns.items():
+            setattr(self, column, array)
+        self._source_lookup = {name: i for i, name in enumerate(self.sources)}
+        self._category_lookup = {name: bit for bit, name in enumerate(self.categories)}
+        self._file_lookup = {name: i for i, name in enumerate(self.files)}
+        return True
+
+    def _saved_generation(self):
+        try:
+            with open(os.path.join(self.index_dir, META_FILE), 'r', encoding='utf-8') as f:
+                return int(json.load(f)["generation"])
+        except (OSError, ValueError, KeyError, TypeError):
+            return 0
+
+    def save(self):
+        """Write the columns under a new generation, then switch meta.json to it"""
+        os.makedirs(self.index_dir, exist_ok=True)
+        previous = max(self.generation, self._saved_generation())
+        generation = previous + 1
+        for column in COLUMNS:
+            np.save(self._column_path(column, generation), getattr(self, column))
+
+        meta_path = os.path.join(self.index_dir, META_FILE)
+        tmp_path = f"{meta_path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({
+                "generation": generation,
+                "csv_offset": self.csv_offset,
+                "csv_inode": self.csv_inode,
+                "sources": self.sources,
+                "categories": self.categories,
+                "files": self.files,
+            }, f)
+        os.replace(tmp_path, meta_path)
+        self.generation = generation
+
+        # Older generations go; readers still holding one keep their open mappings
+        for name in os.listdir(self.index_dir):
+            match = _COLUMN_FILE.match(name)
+            if match and match.group(1) in COLUMNS and int(match.group(2)) < previous:
+                try:
+                    os.remove(os.path.join(self.index_dir, name))
+                except OSError:
+                    pass
+
+    # Building
+
+    def _intern(self, lookup, values, name):
+        index = lookup.get(name)
+        if index is None:
+            index = lookup[name] = len(values)
+            values.append(name)
+        return index
+
+    def _mask(self, categories):
+        mask = 0
+        for name in categories.split(','):
+            if not name:
+                continue
+            bit = self._category_lookup.get(name)
+            if bit is None:
+                if len(self.categories) >= MAX_CATEGORIES:
+                    self.logger.warning(f"Category bitmask is full, not indexing category {name}")
+                    continue
+                bit = self._intern(self._category_lookup, self.categories, name)
+            mask |= 1 << bit
+        return mask
+
+    def refresh(self, csv_path, save=False):
+        """
+        Index rows appended to the CSV since the last refresh.
+
+        Args:
+            csv_path (str): The scraper's articles_index.csv
+            save (bool): Persist the index if it changed
+
+        Returns:
+            int: Number of rows added
+        """
+        with self._lock:
+            # The scraper's CSV lock, so no half-written row is read
+            try:
+                with file_lock(f"{csv_path}.lock"), open(csv_path, 'rb') as f:
+                    st = os.fstat(f.fileno())
+                    rebuild = st.st_ino != self.csv_inode or st.st_size < self.csv_offset
+                    if rebuild:
+                        # The CSV was replaced; start over (keeping the generation counter)
+                        generation = self.generation
+                        self._reset(self.categories)
+                        self.generation = generation
+                        self.csv_inode = st.st_ino
+                    # Only the bytes appended since the last refresh are read and parsed
+                    f.seek(self.csv_offset)
+                    data = f.read()
+            except OSError:
+                return 0
+            if not data and not rebuild:
+                return 0
+            text = io.StringIO(data.decode('utf-8'), newline='')
+            if self.csv_offset:
+                reader = csv.DictReader(text, fieldnames=CSV_FIELDS)
+            else:
+                reader = csv.DictReader(text)
+
+            timestamps, source_ids, masks, ids, file_ids = [], [], [], [], []
+            for row in reader:
+                if not row.get('id'):
+                    continue
+                timestamps.append(_timestamp(row.get('scraped_date', '')))
+                source_ids.append(self._intern(self._source_lookup, self.sources, row.get('source') or ''))
+                masks.append(self._mask(row.get('categories') or ''))
+                ids.append(row['id'].encode('utf-8')[:32])
+                file_ids.append(self._intern(self._file_lookup, self.files, row.get('filename') or ''))
+            offset = self.csv_offset + len(data)
+
+            self.timestamps = np.concatenate([self.timestamps, np.array(timestamps, dtype=np.float64)])
+            self.source_ids = np.concatenate([self.source_ids, np.array(source_ids, dtype=np.int32)])
+            self.category_masks = np.concatenate([self.category_masks, np.array(masks, dtype=np.uint64)])
+            self.ids = np.concatenate([self.ids, np.array(ids, dtype="S32")])
+            self.file_ids = np.concatenate([self.file_ids, np.array(file_ids, dtype=np.int32)])
+            self.csv_offset = offset
+
+            if save and (timestamps or rebuild):
+                self.save()
+            return len(timestamps)
+
+    # Queries
+
+    def select(self, limit=20, category=None, source=None, since=None, until=None):
+        """
+        Rows matching all given filters, newest first.
+
+        Args:
+            limit (int): Maximum number of rows
+            category (str): Only rows tagged with this category
+            source (str): Only rows from this source
+            since (float): Only rows scraped at or after this epoch time
+            until (float): Only rows scraped before this epoch time
+
+        Returns:
+            list: (article id, filename) tuples
+        """
+        timestamps = self.timestamps
+        mask = np.ones(len(timestamps), dtype=bool)
+        if category:
+            bit = self._category_lookup.get(category)
+            if bit is None:
+                return []
+            mask &= (self.category_masks & np.uint64(1 << bit)) != 0
+        if source:
+            source_id = self._source_lookup.get(source)
+            if source_id is None:
+                return []
+            mask &= self.source_ids == source_id
+        if since is not None:
+            mask &= timestamps >= since
+        if until is not None:
+            mask &= timestamps < until
+
+        rows = np.flatnonzero(mask)
+        if limit <= 0 or not len(rows):
+            return []
+        if len(rows) > limit:
+            # Newest `limit` rows without sorting the rest
+            rows = rows[np.argpartition(-timestamps[rows], limit - 1)[:limit]]
+        rows = rows[np.argsort(-timestamps[rows], kind="stable")]
+
+        return [(self.ids[i].decode('utf-8'), self.files[self.file_ids[i]]) for i in rows]
+
+    def available_categories(self):
+        """Names of the categories at least one row is tagged with"""
+        if not len(self.category_masks):
+            return []
+        combined = int(np.bitwise_or.reduce(self.category_masks))
+        return sorted(name for bit, name in enumerate(self.categories) if combined & (1 << bit))
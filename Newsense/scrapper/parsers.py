@@ -0,0 +1,243 @@
+# parsers.py
+"""
+Parser backends for homepage link extraction and RSS/Atom feeds.
+
+Link extraction only needs the href of every <a> tag, so instead of building a
+full BeautifulSoup tree with the pure-Python html.parser it can use selectolax
+(lexbor) or lxml when they are installed. The scraper only reads a handful of
+fields from each feed entry, so well-formed RSS 2.0 and Atom feeds are read
+directly with lxml. Anything the fast feed path is not sure to handle exactly
+like feedparser (HTML-looking titles, relative links, RDF feeds, charset
+mismatches, malformed XML) falls back to feedparser.
+"""
+
+import logging
+import re
+from urllib.parse import urlparse
+
+import feedparser
+from bs4 import BeautifulSoup
+
+try:
+    from selectolax.parser import HTMLParser as SelectolaxParser
+except ImportError:  # pragma: no cover - optional speedup
+    SelectolaxParser = None
+
+try:
+    from lxml import etree
+    from lxml import html as lxml_html
+except ImportError:  # pragma: no cover - optional speedup
+    etree = None
+    lxml_html = None
+
+try:
+    from feedparser.datetimes import _parse_date
+except ImportError:  # pragma: no cover - older feedparser layouts
+    _parse_date = None
+
+logger = logging.getLogger("EnhancedNewsScraper.parsers")
+
+BACKENDS = ("auto", "bs4", "lxml", "selectolax")
+
+ATOM_NS = "http://www.w3.org/2005/Atom"
+MEDIA_NS = "http://search.yahoo.com/mrss/"
+DCTERMS_NS = "http://purl.org/dc/terms/"
+
+# Same test feedparser uses to decide that RSS text is really HTML
+_LOOKS_LIKE_HTML = re.compile(r"</(\w+)>|&#?\w+;")
+
+
+def available_backends():
+    """Backends that can be used in this environment"""
+    backends = ["bs4"]
+    if lxml_html is not None:
+        backends.append("lxml")
+    if SelectolaxParser is not None:
+        backends.append("selectolax")
+    return backends
+
+
+def resolve_backend(name="auto"):
+    """Pick a concrete backend; 'auto' prefers selectolax, then lxml, then bs4"""
+    if name in (None, "auto"):
+        return available_backends()[-1]
+    if name not in available_backends():
+        logger.warning(f"Parser backend {name} is not installed, using bs4")
+        return "bs4"
+    return name
+
+
+# Homepage links
+
+def _hrefs_bs4(html):
+    soup = BeautifulSoup(html, 'html.parser')
+    return [a['href'] for a in soup.find_all('a', href=True)]
+
+
+def _hrefs_lxml(html):
+    try:
+        doc = lxml_html.fromstring(html)
+    except (etree.ParserError, ValueError):
+        return []  # empty document
+    return [str(href) for href in doc.xpath("//a/@href")]
+
+
+def _hrefs_selectolax(html):
+    tree = SelectolaxParser(html)
+    return [node.attributes.get("href") or "" for node in tree.css("a[href]")]
+
+
+_HREF_EXTRACTORS = {
+    "bs4": _hrefs_bs4,
+    "lxml": _hrefs_lxml,
+    "selectolax": _hrefs_selectolax,
+}
+
+
+def iter_hrefs(html, backend="auto"):
+    """href values of all <a> tags in a page, in document order"""
+    return _HREF_EXTRACTORS[resolve_backend(backend)](html)
+
+
+# Feeds
+
+class FeedEntry(dict):
+    """Feed entry supporting both entry['key'] and entry.key access, like feedparser's"""
+
+    def __getattr__(self, name):
+        try:
+            return self[name]
+        except KeyError:
+            raise AttributeError(name)
+
+
+class FeedResult:
+    """Minimal stand-in for feedparser's result: just the entries"""
+
+    def __init__(self, entries):
+        self.entries = entries
+
+
+class _Unsupported(Exception):
+    """The fast path cannot guarantee feedparser's result for this feed"""
+
+
+def _text(element):
+    return "".join(element.itertext()).strip()
+
+
+def _check_title(title):
+    if _LOOKS_LIKE_HTML.search(title):
+        raise _Unsupported("title looks like HTML")
+    return title
+
+
+def _check_link(link):
+    if urlparse(link).scheme not in ("http", "https"):
+        raise _Unsupported("relative link")
+    return link
+
+
+def _set_published(entry, value):
+    parsed = _parse_date(value)
+    if parsed is not None:
+        entry["published_parsed"] = parsed
+
+
+def _rss_entry(item):
+    entry = FeedEntry()
+    for child in item:
+        tag = child.tag
+        if tag == "title":
+            entry["title"] = _check_title(_text(child))
+        elif tag == "link":
+            link = _check_link(_text(child))
+            entry["link"] = link
+            entry.setdefault("links", []).append({"rel": "alternate", "type": "text/html", "href": link})
+        elif tag == "enclosure":
+            attrs = dict(child.attrib)
+            if "url" in attrs:
+                attrs["href"] = attrs.pop("url")
+            attrs["rel"] = "enclosure"
+            entry.setdefault("links", []).append(attrs)
+        elif tag in ("pubDate", f"{{{DCTERMS_NS}}}issued", f"{{{ATOM_NS}}}published"):
+            _set_published(entry, _text(child))
+        elif tag == f"{{{MEDIA_NS}}}content":
+            entry.setdefault("media_content", []).append(dict(child.attrib))
+        elif tag == f"{{{MEDIA_NS}}}thumbnail":
+            entry.setdefault("media_thumbnail", []).append(dict(child.attrib))
+        elif tag in (f"{{{MEDIA_NS}}}title", f"{{{MEDIA_NS}}}group", f"{{{ATOM_NS}}}link"):
+            raise _Unsupported(f"{tag} in item")
+    return entry
+
+
+def _atom_entry(element):
+    entry = FeedEntry()
+    for child in element:
+        tag = child.tag
+        if tag == f"{{{ATOM_NS}}}title":
+            if child.get("type", "text") != "text":
+                raise _Unsupported("non-text title")
+            entry["title"] = _text(child)
+        elif tag == f"{{{ATOM_NS}}}link":
+            attrs = dict(child.attrib)
+            attrs.setdefault("rel", "alternate")
+            attrs.setdefault("type", "application/atom+xml" if attrs["rel"] == "self" else "text/html")
+            if "href" in attrs:
+                attrs["href"] = _check_link(attrs["href"].strip())
+            entry.setdefault("links", []).append(attrs)
+            if attrs["rel"] == "alternate" and "link" not in entry and "href" in attrs:
+                entry["link"] = attrs["href"]
+        elif tag == f"{{{ATOM_NS}}}published":
+            _set_published(entry, _text(child))
+        elif tag == f"{{{MEDIA_NS}}}content":
+            entry.setdefault("media_content", []).append(dict(child.attrib))
+        elif tag == f"{{{MEDIA_NS}}}thumbnail":
+            entry.setdefault("media_thumbnail", []).append(dict(child.attrib))
+        elif tag in (f"{{{MEDIA_NS}}}title", f"{{{MEDIA_NS}}}group"):
+            raise _Unsupported(f"{tag} in entry")
+    return entry
+
+
+def _parse_feed_lxml(content, response_headers):
+    content_type = response_headers.get("content-type", "")
+    charset = content_type.partition("charset=")[2].strip().strip('"').lower()
+    if charset and charset not in ("utf-8", "utf8"):
+        raise _Unsupported(f"charset {charset}")
+
+    parser = etree.XMLParser(resolve_entities=False, no_network=True, huge_tree=True)
+    try:
+        root = etree.fromstring(content, parser)
+    except etree.XMLSyntaxError as e:
+        raise _Unsupported(f"malformed XML: {str(e)}")
+
+    encoding = (root.getroottree().docinfo.encoding or "utf-8").lower()
+    if encoding not in ("utf-8", "utf8"):
+        raise _Unsupported(f"encoding {encoding}")
+
+    if root.tag == "rss":
+        return [_rss_entry(item) for item in root.iterfind("channel/item")]
+    if root.tag == f"{{{ATOM_NS}}}feed":
+        return [_atom_entry(element) for element in root.iterfind(f"{{{ATOM_NS}}}entry")]
+    raise _Unsupported(f"root element {root.tag}")
+
+
+def parse_feed(content, response_headers=None, backend="auto"):
+    """
+    Parse an RSS/Atom feed for the scraper.
+
+    Args:
+        content (bytes): Raw feed document
+        response_headers (dict): Lower-cased HTTP headers, as passed to feedparser
+        backend (str): 'bs4' always uses feedparser; any other backend tries the lxml fast path
+
+    Returns:
+        An object with an `entries` list (feedparser's result or a FeedResult)
+    """
+    response_headers = response_headers or {}
+    if resolve_backend(backend) != "bs4" and etree is not None and _parse_date is not None:
+        try:
+            return FeedResult(_parse_feed_lxml(content, response_headers))
+        except _Unsupported as e:
+            logger.debug(f"Feed fast path not used ({str(e)}), falling back to feedparser")
+    return feedparser.parse(content, response_headers=response_headers)
@@ -0,0 +1,228 @@
+# pipeline.py
+"""
+CPU stage of the scrape.
+
+Fetching stays in the scraper process (it is I/O bound and goes through the
+shared transport), but parsing HTML with newspaper3k, running its NLP step,
+extracting homepage links and keyword categorization are CPU-bound Python that
+would otherwise serialize on the GIL. The functions here are module-level and
+take only picklable arguments so they can run in a process pool; CPUStage
+wraps the pool and falls back to running inline with a single worker.
+"""
+
+import datetime
+import logging
+import os
+from concurrent.futures import Future, ProcessPoolExecutor
+from urllib.parse import urlparse
+
+from newspaper import Article, Config
+from nltk.corpus import stopwords
+from nltk.tokenize import word_tokenize
+
+from scrapper.parsers import iter_hrefs
+from scrapper.similarity import hashed_term_counts
+from scrapper.logging_config import configure_worker_logging
+
+# Loaded once per process instead of once per article
+_stop_words = None
+
+
+def _get_stop_words():
+    global _stop_words
+    if _stop_words is None:
+        _stop_words = set(stopwords.words('english'))
+    return _stop_words
+
+
+def _init_worker():
+    """Process pool initializer: direct logging and preloaded stopwords"""
+    configure_worker_logging()
+    _get_stop_words()
+
+
+class ParseOptions:
+    """Per-scraper settings the workers need, sent along with each job"""
+
+    __slots__ = ("user_agent", "fetch_images", "categories", "category_keywords")
+
+    def __init__(self, user_agent, fetch_images, categories, category_keywords):
+        self.user_agent = user_agent
+        self.fetch_images = fetch_images
+        self.categories = categories
+        self.category_keywords = category_keywords
+
+
+class ParsedArticle:
+    """Fields extracted from one article page, named like newspaper3k's Article"""
+
+    __slots__ = ("url", "title", "text", "authors", "keywords", "summary",
+                 "publish_date", "top_image", "meta_img", "categories", "term_counts")
+
+    def __init__(self, article, categories, term_counts=None):
+        self.url = article.url
+        self.title = article.title
+        self.text = article.text
+        self.authors = article.authors
+        self.keywords = article.keywords
+        self.summary = article.summary
+        self.publish_date = article.publish_date
+        self.top_image = article.top_image
+        self.meta_img = article.meta_img
+        self.categories = categories
+        self.term_counts = term_counts
+
+
+def tokenize(text):
+    """Alphabetic tokens of already lower-cased text, without stopwords"""
+    stop_words = _get_stop_words()
+    return [word for word in word_tokenize(text) if word.isalpha() and word not in stop_words]
+
+
+def article_tokens(title, content):
+    """Tokens of an article's title and content, as used for categories and similarity"""
+    return tokenize((title + " " + content).lower())
+
+
+def determine_categories(title, content, default_category, categories, category_keywords, tokens=None):
+    """Determine article categories based on content analysis"""
+    # Start with default category
+    result = [default_category]
+
+    # Combine title and content for analysis, convert to lowercase
+    text = (title + " " + content).lower()
+
+    # Tokenize and remove stopwords (unless the caller already did)
+    filtered_text = tokens if tokens is not None else tokenize(text)
+
+    # Count category keyword occurrences
+    category_scores = {category: 0 for category in categories}
+
+    for category, keywords in category_keywords.items():
+        for keyword in keywords:
+            count = sum(1 for word in filtered_text if keyword == word)
+            # Also check for multi-word keywords
+            count += text.count(keyword)
+            category_scores[category] += count
+
+    # Normalize by the number of keywords in each category
+    for category in category_scores:
+        if category in category_keywords:
+            num_keywords = len(category_keywords[category])
+            if num_keywords > 0:
+                category_scores[category] /= num_keywords
+
+    # Add categories that score above threshold (excluding default category)
+    threshold = 0.5
+    for category, score in category_scores.items():
+        if score > threshold and category != default_category:
+            result.append(category)
+
+    return list(set(result))  # Remove duplicates
+
+
+def parse_article(url, html, default_category, options):
+    """
+    Parse a downloaded article page, run NLP and categorize it.
+
+    Args:
+        url (str): Article URL
+        html (str): Page HTML fetched by the scraper
+        default_category (str): The source's default category
+        options (ParseOptions): Scraper settings
+
+    Returns:
+        ParsedArticle: Extracted fields plus hashed term counts (the HTML itself is not sent back)
+    """
+    config = Config()
+    config.browser_user_agent = options.user_agent
+    config.fetch_images = options.fetch_images
+
+    article = Article(url, config=config)
+    article.download(input_html=html)
+    article.parse()
+    article.nlp()  # Run NLP to extract keywords and summary
+
+    # One tokenization feeds both categorization and the related-articles vector
+    tokens = article_tokens(article.title, article.text)
+    categories = determine_categories(
+        article.title, article.text, default_category,
+        options.categories, options.category_keywords, tokens=tokens
+    )
+    return ParsedArticle(article, categories, hashed_term_counts(tokens))
+
+
+def extract_article_links(html, website_url, backend="auto"):
+    """Find same-domain links on a homepage that look like articles"""
+
+    # Extract domain for relative URL handling
+    parsed_url = urlparse(website_url)
+    base_url = f"{parsed_url.scheme}://{parsed_url.netloc}"
+
+    # Look for links that might be articles based on URL structure
+    current_year = str(datetime.datetime.now().year)
+    previous_year = str(datetime.datetime.now().year - 1)
+    patterns = ['/news/', '/article/', '/story/', f'/{current_year}/', f'/{previous_year}/', '/content/']
+
+    article_links = set()
+    for href in iter_hrefs(html, backend):
+        # Skip navigation, social, and other non-article links
+        if any(skip in href for skip in ['javascript:', 'mailto:', '#', 'twitter.com', 'facebook.com']):
+            continue
+
+        if any(pattern in href for pattern in patterns):
+            # Handle relative URLs
+            if href.startswith('/'):
+                full_url = base_url + href
+            elif not href.startswith(('http://', 'https://')):
+                full_url = base_url + '/' + href
+            else:
+                full_url = href
+
+            # Only add URLs from the same domain
+            if urlparse(full_url).netloc == parsed_url.netloc:
+                article_links.add(full_url)
+
+    return list(article_links)
+
+
+class CPUStage:
+    """
+    Runs CPU-bound scrape work in a process pool.
+
+    With one worker (or if the pool cannot be started) jobs run inline in the
+    calling process, returning already-completed futures, so callers use the
+    same submit()/result() flow either way.
+    """
+
+    def __init__(self, workers=None):
+        self.logger = logging.getLogger("EnhancedNewsScraper.pipeline")
+        self.workers = max(1, workers if workers is not None else (os.cpu_count() or 1))
+        self._pool = None
+
+    def _get_pool(self):
+        if self._pool is None and self.workers > 1:
+            try:
+                self._pool = ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker)
+            except (OSError, NotImplementedError) as e:
+                self.logger.warning(f"Process pool unavailable, parsing inline: {str(e)}")
+                self.workers = 1
+        return self._pool
+
+    def submit(self, fn, *args):
+        """Schedule fn(*args) and return a Future"""
+        pool = self._get_pool()
+        if pool is not None:
+            return pool.submit(fn, *args)
+
+        future = Future()
+        try:
+            future.set_result(fn(*args))
+        except Exception as e:
+            future.set_exception(e)
+        return future
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=True, cancel_futures=True)
+            self._pool = None
@@ -0,0 +1,210 @@
+# records.py
+"""
+Compact in-memory article records.
+
+ArticleRecord replaces the plain article dicts passed between the scraper and
+the web app. It uses __slots__, shares interned source and category strings
+(identical category lists share one tuple), and keeps the large ``content``
+and ``html`` fields out of memory when it can reload them from disk on demand.
+Records still support dict-style access so existing callers keep working.
+"""
+
+import json
+import sys
+
+# Canonical tuples for category combinations, so identical lists are stored once
+_CATEGORY_SETS = {}
+
+
+def intern_categories(categories):
+    """Return a shared tuple of interned category names"""
+    if not categories:
+        return ()
+    if isinstance(categories, str):
+        categories = [categories]
+    key = tuple(sys.intern(c) for c in categories)
+    return _CATEGORY_SETS.setdefault(key, key)
+
+
+def load_json_body(path):
+    """Default body loader: read the stored article JSON file"""
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+class ArticleRecord:
+    """A single article with interned metadata and lazily loaded body fields"""
+
+    __slots__ = (
+        "id", "title", "url", "source", "published_date", "scraped_date",
+        "authors", "keywords", "summary", "categories", "image_url",
+        "_content", "_html", "_body_ref", "_loader", "extra", "term_counts",
+    )
+
+    FIELDS = (
+        "id", "title", "content", "url", "source", "published_date", "scraped_date",
+        "html", "authors", "keywords", "summary", "categories", "image_url",
+    )
+    BODY_FIELDS = ("content", "html")
+
+    def __init__(self, title="", url="", source="", published_date="", scraped_date="",
+                 content=None, html=None, authors=(), keywords=(), summary="",
+                 categories=(), image_url="", id=None, body_ref=None, loader=None, extra=None):
+        self.id = id
+        self.title = title
+        self.url = url
+        self.source = sys.intern(source) if source else ""
+        self.published_date = published_date
+        self.scraped_date = scraped_date
+        self.authors = tuple(authors or ())
+        self.keywords = tuple(keywords or ())
+        self.summary = summary
+        self.categories = intern_categories(categories)
+        self.image_url = image_url
+        self._content = content
+        self._html = html
+        self._body_ref = body_ref
+        self._loader = loader
+        self.extra = extra or None
+        # Hashed token counts from the parse step, used at ingest only (never stored)
+        self.term_counts = None
+
+    @classmethod
+    def from_dict(cls, data, body_ref=None, loader=None, keep_body=True):
+        """
+        Build a record from a stored article dict.
+
+        Args:
+            data (dict): Article as produced by the scraper or read from disk
+            body_ref: Reference passed to loader to re-read content/html later
+            loader (callable): Function mapping body_ref to the full article dict
+            keep_body (bool): Keep content/html in memory; when False and a
+                body_ref is given, they are reloaded on access instead
+        """
+        extra = {k: v for k, v in data.items() if k not in cls.FIELDS}
+        lazy = not keep_body and body_ref is not None
+        return cls(
+            id=data.get("id"),
+            title=data.get("title", ""),
+            url=data.get("url", ""),
+            source=data.get("source", ""),
+            published_date=data.get("published_date", ""),
+            scraped_date=data.get("scraped_date", ""),
+            content=None if lazy else data.get("content"),
+            html=None if lazy else data.get("html"),
+            authors=data.get("authors") or (),
+            keywords=data.get("keywords") or (),
+            summary=data.get("summary", ""),
+            categories=data.get("categories") or (),
+            image_url=data.get("image_url", ""),
+            body_ref=body_ref,
+            loader=loader or (load_json_body if body_ref is not None else None),
+            extra=extra,
+        )
+
+    def _load_body(self):
+        if self._body_ref is None or self._loader is None:
+            return {}
+        return self._loader(self._body_ref)
+
+    @property
+    def content(self):
+        if self._content is not None:
+            return self._content
+        return self._load_body().get("content", "")
+
+    @content.setter
+    def content(self, value):
+        self._content = value
+
+    @property
+    def html(self):
+        if self._html is not None:
+            return self._html
+        return self._load_body().get("html", "")
+
+    @html.setter
+    def html(self, value):
+        self._html = value
+
+    def drop_body(self):
+        """Release content/html if they can be reloaded later"""
+        if self._body_ref is not None and self._loader is not None:
+            self._content = None
+            self._html = None
+
+    def to_dict(self, include_body=True):
+        """Plain dict in the scraper's JSON layout"""
+        body = {}
+        if include_body:
+            if self._content is None and self._html is None:
+                body = self._load_body()
+            else:
+                body = {"content": self._content or "", "html": self._html or ""}
+
+        data = {"title": self.title}
+        if include_body:
+            data["content"] = body.get("content", "")
+        data.update({
+            "url": self.url,
+            "source": self.source,
+            "published_date": self.published_date,
+            "scraped_date": self.scraped_date,
+        })
+        if include_body:
+            data["html"] = body.get("html", "")
+        data.update({
+            "authors": list(self.authors),
+            "keywords": list(self.keywords),
+            "summary": self.summary,
+            "categories": list(self.categories),
+            "image_url": self.image_url,
+        })
+        if self.id is not None:
+            data["id"] = self.id
+        if self.extra:
+            data.update(self.extra)
+        return data
+
+    # Dict-style access for callers written against plain article dicts
+
+    def __getitem__(self, key):
+        if key in self.FIELDS:
+            value = getattr(self, key)
+            if key == "categories":
+                return list(value)
+            return value
+        if self.extra and key in self.extra:
+            return self.extra[key]
+        raise KeyError(key)
+
+    def __setitem__(self, key, value):
+        if key in self.FIELDS:
+            if key == "categories":
+                value = intern_categories(value)
+            elif key == "source":
+                value = sys.intern(value)
+            setattr(self, key, value)
+        else:
+            if self.extra is None:
+                self.extra = {}
+            self.extra[key] = value
+
+    def __contains__(self, key):
+        if key in self.FIELDS:
+            if key not in self.BODY_FIELDS:
+                return True
+            if getattr(self, "_" + key) is not None:
+                return True
+            # Lazily loaded record: the body is on disk
+            return self._body_ref is not None and self._content is None and self._html is None
+        return bool(self.extra) and key in self.extra
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def __repr__(self):
+        return f"ArticleRecord(source={self.source!r}, title={self.title!r})"
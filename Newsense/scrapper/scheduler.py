@@ -0,0 +1,207 @@
+# scheduler.py
+"""
+Adaptive per-source refresh scheduler.
+
+Instead of refreshing every source on every run, each source gets its own
+polling interval derived from how often it actually publishes new articles.
+Busy sources are polled often, quiet or failing sources back off, and jitter
+keeps polls from lining up.
+"""
+
+import heapq
+import json
+import logging
+import os
+import random
+import threading
+import time
+
+
+class SourceState:
+    """Observed publish rate, latency and current polling interval for one source"""
+
+    def __init__(self, name, interval):
+        self.name = name
+        self.interval = interval
+        self.next_run = 0.0
+        self.last_run = None
+        self.new_rate = None  # EWMA of new articles per second
+        self.latency = None  # EWMA of seconds spent scraping the source
+        self.consecutive_empty = 0
+        self.consecutive_errors = 0
+        self.total_new = 0
+        self.polls = 0
+
+    def to_dict(self):
+        return {
+            "interval": self.interval,
+            "next_run": self.next_run,
+            "last_run": self.last_run,
+            "new_rate": self.new_rate,
+            "latency": self.latency,
+            "consecutive_empty": self.consecutive_empty,
+            "consecutive_errors": self.consecutive_errors,
+            "total_new": self.total_new,
+            "polls": self.polls,
+        }
+
+    @classmethod
+    def from_dict(cls, name, data, default_interval):
+        state = cls(name, data.get("interval", default_interval))
+        for key in ("next_run", "last_run", "new_rate", "latency",
+                    "consecutive_empty", "consecutive_errors", "total_new", "polls"):
+            if key in data:
+                setattr(state, key, data[key])
+        return state
+
+
+class AdaptiveScheduler:
+    """Runs EnhancedNewsScraper.scrape_source for each source on its own adaptive interval"""
+
+    def __init__(self, scraper, min_interval=120, max_interval=6 * 3600, initial_interval=900,
+                 target_new_per_poll=3, backoff=1.5, jitter=0.1, smoothing=0.3,
+                 latency_factor=20, state_path=None):
+        """
+        Args:
+            scraper (EnhancedNewsScraper): Scraper whose sources are scheduled
+            min_interval (float): Shortest polling interval in seconds
+            max_interval (float): Longest polling interval in seconds
+            initial_interval (float): Interval for sources without history
+            target_new_per_poll (float): New articles a poll should find on average
+            backoff (float): Interval multiplier after an empty or failed poll
+            jitter (float): Random +/- fraction applied to every interval
+            smoothing (float): EWMA weight given to the latest observation
+            latency_factor (float): A source is never polled more often than this many
+                times its own scrape latency, so slow sources cannot hog the scraper
+            state_path (str): JSON file used to persist per-source state across restarts
+        """
+        self.scraper = scraper
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.initial_interval = initial_interval
+        self.target_new_per_poll = target_new_per_poll
+        self.backoff = backoff
+        self.jitter = jitter
+        self.smoothing = smoothing
+        self.latency_factor = latency_factor
+        self.state_path = state_path or os.path.join(scraper.output_dir, "scheduler_state.json")
+        self.logger = logging.getLogger("EnhancedNewsScraper.scheduler")
+        self._random = random.Random()
+        self._stop = threading.Event()
+
+        self.sources = {source["name"]: source for source in scraper.sources}
+        self.states = self._load_state()
+
+    def _load_state(self):
+        saved = {}
+        if os.path.exists(self.state_path):
+            try:
+                with open(self.state_path, 'r', encoding='utf-8') as f:
+                    saved = json.load(f)
+            except (OSError, ValueError) as e:
+                self.logger.warning(f"Ignoring unreadable scheduler state {self.state_path}: {str(e)}")
+
+        states = {}
+        for name in self.sources:
+            if name in saved:
+                states[name] = SourceState.from_dict(name, saved[name], self.initial_interval)
+            else:
+                states[name] = SourceState(name, self.initial_interval)
+        return states
+
+    def save_state(self):
+        tmp_path = self.state_path + ".tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({name: state.to_dict() for name, state in self.states.items()}, f, indent=2)
+        os.replace(tmp_path, self.state_path)
+
+    def _clamp(self, interval):
+        return max(self.min_interval, min(self.max_interval, interval))
+
+    def _with_jitter(self, interval):
+        return interval * self._random.uniform(1 - self.jitter, 1 + self.jitter)
+
+    def _ewma(self, previous, value):
+        if previous is None:
+            return value
+        return self.smoothing * value + (1 - self.smoothing) * previous
+
+    def record_poll(self, state, new_count, latency, error=False, now=None):
+        """Update a source's statistics after a poll and schedule its next one"""
+        now = now if now is not None else time.time()
+        elapsed = now - state.last_run if state.last_run else state.interval
+        state.polls += 1
+        state.last_run = now
+        state.latency = self._ewma(state.latency, latency)
+
+        if error:
+            state.consecutive_errors += 1
+            # state.interval already carries the earlier errors' backoff
+            interval = state.interval * self.backoff
+        else:
+            state.consecutive_errors = 0
+            state.total_new += new_count
+            state.new_rate = self._ewma(state.new_rate, new_count / max(elapsed, 1.0))
+
+            if new_count == 0:
+                state.consecutive_empty += 1
+                interval = state.interval * self.backoff
+            else:
+                state.consecutive_empty = 0
+                # Poll often enough to find about target_new_per_poll new articles each time
+                interval = self.target_new_per_poll / max(state.new_rate, 1e-9)
+
+        interval = max(interval, state.latency * self.latency_factor)
+        state.interval = self._clamp(interval)
+        state.next_run = now + self._with_jitter(state.interval)
+        return state
+
+    def poll(self, name):
+        """Scrape one source now and reschedule it"""
+        state = self.states[name]
+        start = time.perf_counter()
+        try:
+            articles = self.scraper.scrape_source(self.sources[name])
+        except Exception as e:
+            latency = time.perf_counter() - start
+            self.record_poll(state, 0, latency, error=True)
+            self.logger.error(f"Error scraping {name}: {str(e)}; next poll in {state.interval:.0f}s")
+            return 0
+
+        latency = time.perf_counter() - start
+        self.record_poll(state, len(articles), latency)
+        if articles:
+            self.scraper.publish_index()
+        self.logger.info(
+            f"{name}: {len(articles)} new articles in {latency:.1f}s; next poll in {state.interval:.0f}s"
+        )
+        return len(articles)
+
+    def stop(self):
+        self._stop.set()
+
+    def run_forever(self, max_polls=None):
+        """Poll sources as they become due until stop() is called or max_polls is reached"""
+        queue = [(state.next_run, name) for name, state in self.states.items()]
+        heapq.heapify(queue)
+        polls = 0
+
+        self.logger.info(f"Scheduler started for {len(queue)} sources")
+        while queue and not self._stop.is_set():
+            due, name = heapq.heappop(queue)
+            wait = due - time.time()
+            if wait > 0 and self._stop.wait(wait):
+                break
+
+            # Only reads the rows other processes appended since the last poll
+            self.scraper.load_seen_ids()
+            self.poll(name)
+            self.save_state()
+            heapq.heappush(queue, (self.states[name].next_run, name))
+
+            polls += 1
+            if max_polls is not None and polls >= max_polls:
+                break
+
+        self.logger.info(f"Scheduler stopped after {polls} polls")
+        return polls
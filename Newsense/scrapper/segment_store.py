@@ -0,0 +1,477 @@
+# segment_store.py
+"""
+Append-only segment storage for scraped articles.
+
+Instead of one pretty-printed JSON file per article per scrape, each source
+directory is partitioned by day (``<YYYY>/<MM>/<DD>/``) and every partition
+holds one segment (``articles.seg``): compact JSON records, one per line,
+appended in batches and fsynced once per scrape. A sidecar offset index
+(``articles.idx``) maps article ids to byte ranges, so reading an article is a
+single seek. Re-scrapes append a new version; compact() rewrites segments
+keeping only the newest version of each article across all partitions and
+folds legacy files into them. Whole partitions past the retention window are
+deleted or archived by apply_retention(). Writers in every process take an
+exclusive lock on the source directory's ``.lock`` file, so appends from
+several scraper workers and compaction never interleave.
+
+Segments written before partitioning (``<YYYYMMDD>.seg`` directly in the
+source directory) are still read.
+"""
+
+import contextlib
+import datetime
+import json
+import logging
+import os
+import re
+import shutil
+import threading
+import time
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows: only threads are serialized
+    fcntl = None
+
+SEGMENT_SUFFIX = ".seg"
+INDEX_SUFFIX = ".idx"
+SEGMENT_FILE = "articles" + SEGMENT_SUFFIX
+LOCK_FILE = ".lock"
+
+# Flat day segments from before partitioning, and legacy <md5>[_<timestamp>].json files
+_FLAT_SEGMENT = re.compile(r"^(\d{8})" + re.escape(SEGMENT_SUFFIX) + "$")
+_LEGACY_FILE = re.compile(r"^([0-9a-f]{32})(?:_(\d{8})_(\d{6}))?\.json$")
+
+
+@contextlib.contextmanager
+def file_lock(path):
+    """Hold an exclusive advisory lock on path (created if missing), across processes"""
+    with open(path, 'a') as f:
+        if fcntl is not None:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+
+class IndexEntry:
+    """Location of one stored article version"""
+
+    __slots__ = ("id", "segment", "offset", "length", "timestamp")
+
+    def __init__(self, id, segment, offset, length, timestamp):
+        self.id = id
+        self.segment = segment
+        self.offset = offset
+        self.length = length
+        self.timestamp = timestamp
+
+    @property
+    def ref(self):
+        """Body reference usable with SegmentStore.read()"""
+        return (self.segment, self.offset, self.length)
+
+
+class SegmentStore:
+    """Reads and writes day segments inside per-source directories"""
+
+    def __init__(self):
+        self.logger = logging.getLogger("EnhancedNewsScraper.storage")
+        self._index_cache = {}
+        self._lock = threading.Lock()
+
+    # Layout
+
+    def segment_name(self, when=None):
+        """Segment path relative to the source directory for a day"""
+        when = when or datetime.datetime.now()
+        return os.path.join(when.strftime("%Y"), when.strftime("%m"), when.strftime("%d"), SEGMENT_FILE)
+
+    @staticmethod
+    def _digit_dirs(path, width):
+        try:
+            return [n for n in os.listdir(path) if len(n) == width and n.isdigit()
+                    and os.path.isdir(os.path.join(path, n))]
+        except FileNotFoundError:
+            return []
+
+    def list_partitions(self, source_dir):
+        """(day, segment path) for every segment in a source directory, newest day first"""
+        found = []
+        for year in self._digit_dirs(source_dir, 4):
+            for month in self._digit_dirs(os.path.join(source_dir, year), 2):
+                for day in self._digit_dirs(os.path.join(source_dir, year, month), 2):
+                    segment = os.path.join(source_dir, year, month, day, SEGMENT_FILE)
+                    if os.path.exists(segment):
+                        found.append((year + month + day, 1, segment))
+        try:
+            names = os.listdir(source_dir)
+        except FileNotFoundError:
+            names = []
+        for name in names:
+            match = _FLAT_SEGMENT.match(name)
+            if match:
+                found.append((match.group(1), 0, os.path.join(source_dir, name)))
+
+        # Within a day, the partition is newer than a flat segment of the same day
+        found.sort(reverse=True)
+        return [(datetime.datetime.strptime(day, "%Y%m%d").date(), segment) for day, _, segment in found]
+
+    def list_segments(self, source_dir):
+        """Segment paths in a source directory, newest day first"""
+        return [segment for _, segment in self.list_partitions(source_dir)]
+
+    @staticmethod
+    def source_dir_of(segment_path):
+        """The source directory a segment belongs to (partitioned or flat)"""
+        parent = os.path.dirname(segment_path)
+        if os.path.basename(segment_path) == SEGMENT_FILE:
+            # <source>/<YYYY>/<MM>/<DD>/articles.seg
+            return os.path.dirname(os.path.dirname(os.path.dirname(parent)))
+        return parent
+
+    @staticmethod
+    def index_path(segment_path):
+        return segment_path[:-len(SEGMENT_SUFFIX)] + INDEX_SUFFIX
+
+    # Writing
+
+    def locked(self, source_dir):
+        """Lock serializing writes to a source directory across threads and processes"""
+        os.makedirs(source_dir, exist_ok=True)
+        return file_lock(os.path.join(source_dir, LOCK_FILE))
+
+    def append_batch(self, source_dir, articles, ids, when=None, timestamp=None):
+        """
+        Append a batch of articles to today's segment and fsync once.
+
+        Args:
+            source_dir (str): Source directory to write into
+            articles (list): Article dicts to store (each should carry its "id")
+            ids (list): Article id for each article
+            when (datetime): Segment day (defaults to now)
+            timestamp (float or list): Storage time of the batch, or one per article
+                (defaults to now); listings order articles by it
+
+        Returns:
+            list: IndexEntry for each stored article, in order
+        """
+        if not articles:
+            return []
+        segment = os.path.join(source_dir, self.segment_name(when))
+        os.makedirs(os.path.dirname(segment), exist_ok=True)
+        if timestamp is None:
+            timestamp = time.time()
+        timestamps = timestamp if isinstance(timestamp, (list, tuple)) else [timestamp] * len(articles)
+
+        entries = []
+        with self.locked(source_dir), self._lock:
+            with open(segment, 'ab') as f:
+                # Taken under the lock: another process may have appended since the open
+                offset = os.fstat(f.fileno()).st_size
+                for article, article_id, stamp in zip(articles, ids, timestamps):
+                    line = json.dumps(article, ensure_ascii=False, separators=(",", ":")).encode("utf-8") + b"\n"
+                    f.write(line)
+                    entries.append(IndexEntry(article_id, segment, offset, len(line), stamp))
+                    offset += len(line)
+                f.flush()
+                os.fsync(f.fileno())
+
+            # The index is written after the data, so it never points past the segment end
+            with open(self.index_path(segment), 'a', encoding='utf-8') as f:
+                for entry in entries:
+                    f.write(f"{entry.id}\t{entry.offset}\t{entry.length}\t{entry.timestamp:.3f}\n")
+                f.flush()
+                os.fsync(f.fileno())
+
+        return entries
+
+    # Reading
+
+    def read(self, ref):
+        """Read one article from a (segment, offset, length) reference"""
+        segment, offset, length = ref
+        with open(segment, 'rb') as f:
+            f.seek(offset)
+            return json.loads(f.read(length))
+
+    def read_entry(self, entry):
+        """Read an indexed article, re-resolving it if compaction moved it meanwhile"""
+        try:
+            article = self.read(entry.ref)
+            if article.get("id") == entry.id:
+                return article
+        except (OSError, ValueError):
+            pass
+        fresh = self.find(self.source_dir_of(entry.segment), entry.id)
+        if fresh is None:
+            raise KeyError(f"Article {entry.id} no longer stored")
+        return self.read(fresh.ref)
+
+    def read_index(self, segment):
+        """Parsed index entries of a segment in append order (cached until the index changes)"""
+        path = self.index_path(segment)
+        try:
+            st = os.stat(path)
+        except FileNotFoundError:
+            return []
+        key = (st.st_ino, st.st_mtime_ns, st.st_size)
+
+        with self._lock:
+            cached = self._index_cache.get(path)
+        if cached and cached[0] == key:
+            return cached[1]
+
+        entries = []
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                parts = line.rstrip("\n").split("\t")
+                if len(parts) != 4:
+                    continue  # torn write at the end of the index
+                try:
+                    entries.append(IndexEntry(parts[0], segment, int(parts[1]), int(parts[2]), float(parts[3])))
+                except ValueError:
+                    continue
+
+        with self._lock:
+            self._index_cache[path] = (key, entries)
+        return entries
+
+    def iter_latest(self, source_dir):
+        """Yield the newest version of each article, newest first"""
+        seen = set()
+        for segment in self.list_segments(source_dir):
+            for entry in reversed(self.read_index(segment)):
+                if entry.id in seen:
+                    continue
+                seen.add(entry.id)
+                yield entry
+
+    def latest(self, source_dir, limit):
+        """Index entries for the `limit` most recently stored articles"""
+        entries = []
+        for entry in self.iter_latest(source_dir):
+            entries.append(entry)
+            if len(entries) >= limit:
+                break
+        return entries
+
+    def find(self, source_dir, article_id, segment=None):
+        """Newest stored version of an article, looking in `segment` first if given"""
+        if segment:
+            for entry in reversed(self.read_index(segment)):
+                if entry.id == article_id:
+                    return entry
+        for entry in self.iter_latest(source_dir):
+            if entry.id == article_id:
+                return entry
+        return None
+
+    def count(self, source_dir):
+        return sum(1 for _ in self.iter_latest(source_dir))
+
+    def iter_articles(self, source_dir):
+        """
+        Yield (name, article) for every stored article in a source directory,
+        newest segment versions first, then legacy one-file-per-article JSON files.
+        """
+        for entry in self.iter_latest(source_dir):
+            try:
+                yield f"{entry.id}.json", self.read_entry(entry)
+            except (OSError, ValueError, KeyError) as e:
+                self.logger.error(f"Error reading {entry.id} from {entry.segment}: {str(e)}")
+
+        try:
+            legacy = sorted(n for n in os.listdir(source_dir) if n.endswith(".json"))
+        except FileNotFoundError:
+            legacy = []
+        for name in legacy:
+            try:
+                with open(os.path.join(source_dir, name), 'r', encoding='utf-8') as f:
+                    yield name, json.load(f)
+            except (OSError, ValueError) as e:
+                self.logger.error(f"Error reading {name}: {str(e)}")
+
+    # Maintenance
+
+    def compact(self, source_dir):
+        """
+        Keep only the newest version of each article across all of a source's
+        partitions, after folding legacy JSON files into the segments.
+        """
+        self.migrate_legacy(source_dir)
+
+        keep = {}
+        for entry in self.iter_latest(source_dir):
+            keep[(entry.segment, entry.offset)] = entry
+
+        dropped = 0
+        for segment in self.list_segments(source_dir):
+            entries = self.read_index(segment)
+            live = [e for e in entries if (segment, e.offset) in keep]
+            if len(live) == len(entries):
+                continue
+            dropped += len(entries) - len(live)
+            if not self._rewrite_segment(segment, live, len(entries)):
+                self._remove_empty_parents(os.path.dirname(segment), source_dir)
+
+        if dropped:
+            self.logger.info(f"Compacted {source_dir}: dropped {dropped} superseded versions")
+        return dropped
+
+    def migrate_legacy(self, source_dir):
+        """
+        Fold legacy one-file-per-scrape JSON files into the day partitions.
+
+        Re-scrapes of the same URL share the md5 id at the start of the file
+        name; only the newest copy is stored, and only if the segments do not
+        already hold a version of that article. The files are removed afterwards.
+
+        Returns:
+            int: Number of legacy files folded in
+        """
+        groups = {}
+        try:
+            names = os.listdir(source_dir)
+        except FileNotFoundError:
+            return 0
+        for name in names:
+            match = _LEGACY_FILE.match(name)
+            if match:
+                path = os.path.join(source_dir, name)
+                stamp = (match.group(2) or "") + (match.group(3) or "")
+                groups.setdefault(match.group(1), []).append((stamp, os.path.getmtime(path), path))
+        if not groups:
+            return 0
+
+        stored = {entry.id for entry in self.iter_latest(source_dir)}
+        by_day = {}
+        for article_id, versions in groups.items():
+            if article_id in stored:
+                continue
+            _, mtime, path = max(versions)
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    article = json.load(f)
+            except (OSError, ValueError) as e:
+                self.logger.error(f"Skipping unreadable legacy file {path}: {str(e)}")
+                groups[article_id] = []  # keep its files
+                continue
+            article["id"] = article_id
+            day = datetime.datetime.fromtimestamp(mtime)
+            by_day.setdefault(day.date(), []).append((article_id, article, day))
+
+        # Written to the partition of the day each article was scraped, stamped with
+        # its file's time so it does not rank above articles scraped since
+        for _, items in sorted(by_day.items()):
+            self.append_batch(
+                source_dir, [a for _, a, _ in items], [i for i, _, _ in items],
+                when=items[0][2], timestamp=[day.timestamp() for _, _, day in items]
+            )
+
+        folded = 0
+        for versions in groups.values():
+            for _, _, path in versions:
+                os.remove(path)
+                folded += 1
+        self.logger.info(f"Folded {folded} legacy files from {source_dir} into {sum(len(v) for v in by_day.values())} articles")
+        return folded
+
+    def apply_retention(self, source_dir, keep_days, archive_dir=None, today=None):
+        """
+        Delete (or move to archive_dir) whole partitions older than keep_days.
+
+        Args:
+            source_dir (str): Source directory to prune
+            keep_days (int): Days of partitions to keep, counting today
+            archive_dir (str): Move old partitions under archive_dir/<source>/ instead of deleting
+            today (date): Reference day (defaults to today)
+
+        Returns:
+            int: Number of partitions removed
+        """
+        today = today or datetime.date.today()
+        cutoff = today - datetime.timedelta(days=max(keep_days, 1) - 1)
+        removed = 0
+        for day, segment in self.list_partitions(source_dir):
+            if day >= cutoff:
+                continue
+            files = [segment, self.index_path(segment)]
+            with self.locked(source_dir), self._lock:
+                for path in files:
+                    if not os.path.exists(path):
+                        continue
+                    if archive_dir:
+                        relative = os.path.relpath(path, os.path.dirname(os.path.abspath(source_dir)))
+                        target = os.path.join(archive_dir, relative)
+                        os.makedirs(os.path.dirname(target), exist_ok=True)
+                        shutil.move(path, target)
+                    else:
+                        os.remove(path)
+                self._index_cache.pop(self.index_path(segment), None)
+            self._remove_empty_parents(os.path.dirname(segment), source_dir)
+            removed += 1
+
+        if removed:
+            action = f"archived to {archive_dir}" if archive_dir else "deleted"
+            self.logger.info(f"Retention: {removed} partitions older than {cutoff} {action} from {source_dir}")
+        return removed
+
+    @staticmethod
+    def _remove_empty_parents(path, stop):
+        stop = os.path.abspath(stop)
+        path = os.path.abspath(path)
+        while path != stop and path.startswith(stop):
+            try:
+                os.rmdir(path)
+            except OSError:
+                break
+            path = os.path.dirname(path)
+
+    def _rewrite_segment(self, segment, live, planned):
+        """
+        Rewrite a segment keeping only the live entries, plus any appended after
+        the first `planned` index entries were read. Returns the number kept.
+        """
+        index = self.index_path(segment)
+        with self.locked(self.source_dir_of(segment)):
+            live = live + self.read_index(segment)[planned:]
+            with self._lock:
+                if not live:
+                    for path in (segment, index):
+                        if os.path.exists(path):
+                            os.remove(path)
+                    self._index_cache.pop(index, None)
+                    return 0
+                self._write_segment(segment, index, live)
+        return len(live)
+
+    def _write_segment(self, segment, index, live):
+        # Caller holds the locks
+        tmp_segment = segment + ".compact"
+        tmp_index = index + ".compact"
+        with open(segment, 'rb') as src, open(tmp_segment, 'wb') as dst, \
+                open(tmp_index, 'w', encoding='utf-8') as idx:
+            offset = 0
+            for entry in live:
+                src.seek(entry.offset)
+                data = src.read(entry.length)
+                dst.write(data)
+                idx.write(f"{entry.id}\t{offset}\t{len(data)}\t{entry.timestamp:.3f}\n")
+                offset += len(data)
+            dst.flush()
+            os.fsync(dst.fileno())
+            idx.flush()
+            os.fsync(idx.fileno())
+
+        # Readers holding the old index detect the moved record through its id
+        # (see read_entry) and look it up again
+        os.replace(tmp_segment, segment)
+        os.replace(tmp_index, index)
+        self._index_cache.pop(index, None)
+
+
+# Shared instance used by the scraper and the web app
+store = SegmentStore()
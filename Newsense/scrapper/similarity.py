@@ -0,0 +1,305 @@
+# similarity.py
+"""
+Related-article search over hashed TF-IDF vectors.
+
+At ingest every article's tokens (the ones determine_categories already
+computes) are hashed into a fixed number of buckets. The counts are weighted
+by sublinear TF and by IDF from the document frequencies seen so far, then
+L2-normalized and appended to one contiguous float32 matrix on disk. Finding
+related articles is a single matrix-vector product against that matrix
+(memory-mapped by the web app) followed by an argpartition.
+
+Files in the index directory:
+    vectors.f32   row-major float32 matrix, one row per stored article version
+    rows.tsv      article id, source directory and segment of each row
+    df.npy        document frequency per bucket, plus meta.json (dims, docs)
+
+prune() drops rows of articles that compaction or retention removed, writing
+the kept rows to a new generation (vectors.<gen>.f32, rows.<gen>.tsv) and then
+switching current.json to it, so readers never pair one generation's rows with
+another's vectors.
+
+Writers in every process hold an exclusive lock on the directory's ``.lock``
+file and start from the document frequencies on disk, so concurrent scrapes
+neither interleave their appends nor overwrite each other's counts.
+"""
+
+import json
+import logging
+import math
+import os
+import threading
+import time
+import zlib
+
+import numpy as np
+
+from scrapper.segment_store import file_lock
+
+DEFAULT_DIMS = 512
+
+
+def hashed_term_counts(tokens, dims=DEFAULT_DIMS):
+    """Sparse {bucket: count} of tokens hashed into dims buckets (small enough to pickle per article)"""
+    counts = {}
+    for token in tokens:
+        bucket = zlib.crc32(token.encode("utf-8")) % dims
+        counts[bucket] = counts.get(bucket, 0) + 1
+    return counts
+
+
+class RelatedIndex:
+    """Append-only float32 matrix of article vectors with top-k cosine lookups"""
+
+    def __init__(self, index_dir, dims=DEFAULT_DIMS):
+        self.index_dir = index_dir
+        self.dims = dims
+        self.logger = logging.getLogger("EnhancedNewsScraper.similarity")
+        self.current_path = os.path.join(index_dir, "current.json")
+        self._lock = threading.Lock()
+        self._current_signature = None
+        self.generation = None
+        self._read_current()
+
+        self.df = np.zeros(dims, dtype=np.int64)
+        self.docs = 0
+        self._load_df()
+
+        # Reader state, refreshed as the files grow
+        self.matrix = np.empty((0, dims), dtype=np.float32)
+        self.rows = []
+        self.row_of = {}
+        self._rows_offset = 0
+        self._mapped_generation = self.generation
+
+    # Generations
+
+    @property
+    def vectors_path(self):
+        suffix = f".{self.generation}" if self.generation else ""
+        return os.path.join(self.index_dir, f"vectors{suffix}.f32")
+
+    @property
+    def rows_path(self):
+        suffix = f".{self.generation}" if self.generation else ""
+        return os.path.join(self.index_dir, f"rows{suffix}.tsv")
+
+    def _read_current(self):
+        """Follow current.json to the live generation; returns True if it changed"""
+        try:
+            st = os.stat(self.current_path)
+            signature = (st.st_ino, st.st_mtime_ns)
+        except OSError:
+            signature = None
+        if signature == self._current_signature:
+            return False
+        self._current_signature = signature
+        generation = None
+        if signature is not None:
+            try:
+                with open(self.current_path, 'r', encoding='utf-8') as f:
+                    generation = json.load(f).get("generation")
+            except (OSError, ValueError):
+                return False
+        if generation == self.generation:
+            return False
+        self.generation = generation
+        return True
+
+    # Writing
+
+    def _locked(self):
+        """Lock serializing writers across processes (callers also hold self._lock)"""
+        os.makedirs(self.index_dir, exist_ok=True)
+        return file_lock(os.path.join(self.index_dir, ".lock"))
+
+    def _load_df(self):
+        try:
+            with open(os.path.join(self.index_dir, "meta.json"), 'r', encoding='utf-8') as f:
+                meta = json.load(f)
+            if meta.get("dims") == self.dims:
+                self.df = np.load(os.path.join(self.index_dir, "df.npy"))
+                self.docs = meta.get("docs", 0)
+        except (OSError, ValueError):
+            pass
+
+    def vectorize(self, term_counts):
+        """TF-IDF weight and L2-normalize hashed term counts, updating document frequencies"""
+        vector = np.zeros(self.dims, dtype=np.float32)
+        if not term_counts:
+            return vector
+        buckets = np.fromiter(term_counts.keys(), dtype=np.int64, count=len(term_counts))
+        counts = np.fromiter(term_counts.values(), dtype=np.float64, count=len(term_counts))
+
+        self.docs += 1
+        self.df[buckets] += 1
+        idf = np.log((1 + self.docs) / (1 + self.df[buckets])) + 1.0
+        weights = (1.0 + np.log(counts)) * idf
+
+        norm = math.sqrt(float(np.dot(weights, weights)))
+        if norm > 0:
+            vector[buckets] = weights / norm
+        return vector
+
+    def add_batch(self, items):
+        """
+        Append vectors for a batch of saved articles.
+
+        Args:
+            items (list): (article_id, source_dir_name, segment_name, term_counts) tuples
+        """
+        if not items:
+            return
+        with self._lock, self._locked():
+            # Start from what other processes saved (including a prune's new generation)
+            self._read_current()
+            self._load_df()
+            vectors = np.vstack([self.vectorize(counts) for _, _, _, counts in items]).astype(np.float32)
+            # Vectors first, so every row listed in rows.tsv has its vector on disk
+            with open(self.vectors_path, 'ab') as f:
+                f.write(vectors.tobytes())
+            with open(self.rows_path, 'a', encoding='utf-8') as f:
+                for article_id, source, segment, _ in items:
+                    f.write(f"{article_id}\t{source}\t{segment}\n")
+            self._save_df()
+
+    def _save_df(self):
+        # Caller holds the locks
+        tmp_df = os.path.join(self.index_dir, f"df.{os.getpid()}.tmp")
+        with open(tmp_df, 'wb') as f:
+            np.save(f, self.df)
+        os.replace(tmp_df, os.path.join(self.index_dir, "df.npy"))
+        meta_path = os.path.join(self.index_dir, "meta.json")
+        tmp_path = f"{meta_path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({"dims": self.dims, "docs": self.docs}, f)
+        os.replace(tmp_path, meta_path)
+
+    def prune(self, live):
+        """
+        Rewrite the index keeping only the newest row of each article still stored.
+
+        Document frequencies are recomputed from the kept vectors.
+
+        Args:
+            live (dict): {(source_dir_name, article_id): segment} of every stored article
+
+        Returns:
+            int: Number of rows dropped
+        """
+        with self._lock, self._locked():
+            self._read_current()
+            try:
+                with open(self.rows_path, 'r', encoding='utf-8') as f:
+                    rows = [line.rstrip("\n").split("\t") for line in f if line.endswith("\n")]
+                vectors = np.fromfile(self.vectors_path, dtype=np.float32)
+            except OSError:
+                return 0
+            count = min(len(rows), len(vectors) // self.dims)
+            vectors = vectors[:count * self.dims].reshape(count, self.dims)
+
+            newest = {}
+            for i, (article_id, source, _) in enumerate(rows[:count]):
+                if (source, article_id) in live:
+                    newest[article_id] = i
+            keep = sorted(newest.values())
+            dropped = len(rows) - len(keep)
+            if not dropped:
+                return 0
+
+            old_paths = (self.vectors_path, self.rows_path)
+            self.generation = f"{int(time.time())}-{os.getpid()}"
+            kept = vectors[keep]
+            with open(self.vectors_path, 'wb') as f:
+                f.write(np.ascontiguousarray(kept).tobytes())
+            with open(self.rows_path, 'w', encoding='utf-8') as f:
+                for i in keep:
+                    article_id, source, _ = rows[i]
+                    f.write(f"{article_id}\t{source}\t{live[(source, article_id)]}\n")
+            self.df = np.count_nonzero(kept, axis=0).astype(np.int64)
+            self.docs = len(keep)
+
+            tmp_path = f"{self.current_path}.{os.getpid()}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump({"generation": self.generation}, f)
+            os.replace(tmp_path, self.current_path)
+            # Readers still mapping the old files keep them until they refresh
+            for path in old_paths:
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+            self._save_df()
+        self.logger.info(f"Pruned {dropped} stale rows from the related-articles index")
+        return dropped
+
+    # Reading
+
+    def refresh(self):
+        """Map rows appended since the last refresh; returns the number of rows"""
+        with self._lock:
+            self._read_current()
+            if self.generation != self._mapped_generation:
+                # prune() switched generations: start over from the new files
+                self._mapped_generation = self.generation
+                self.matrix = np.empty((0, self.dims), dtype=np.float32)
+                self.rows = []
+                self.row_of = {}
+                self._rows_offset = 0
+            try:
+                with open(self.rows_path, 'rb') as f:
+                    f.seek(self._rows_offset)
+                    tail = f.read()
+                vector_bytes = os.path.getsize(self.vectors_path)
+            except OSError:
+                return len(self.matrix)
+
+            # Ignore a partially written last line
+            complete = tail[:tail.rfind(b"\n") + 1]
+            for line in complete.decode("utf-8").splitlines():
+                article_id, source, segment = line.split("\t")
+                # The newest row of an article wins
+                self.row_of[article_id] = len(self.rows)
+                self.rows.append((article_id, source, segment))
+            self._rows_offset += len(complete)
+
+            count = min(len(self.rows), vector_bytes // (self.dims * 4))
+            if count and count != len(self.matrix):
+                self.matrix = np.memmap(self.vectors_path, dtype=np.float32, mode="r", shape=(count, self.dims))
+            return count
+
+    def related(self, article_id, limit=5):
+        """
+        Articles most similar to the given one.
+
+        Returns:
+            list: (article_id, source, segment, score) tuples, most similar first,
+            or None if the article is not indexed
+        """
+        matrix = self.matrix
+        row = self.row_of.get(article_id)
+        if row is None or row >= len(matrix):
+            return None
+
+        # Rows are unit vectors, so one matrix-vector product gives every cosine similarity
+        scores = matrix @ matrix[row]
+        rows, row_of = self.rows, self.row_of
+        # Over-fetch to make room for the article itself and older versions of
+        # articles, widening the window while too few current rows are found
+        wanted = min(len(scores), limit * 3 + 1)
+        while True:
+            top = np.argpartition(-scores, wanted - 1)[:wanted] if wanted < len(scores) else np.arange(len(scores))
+            top = top[np.argsort(-scores[top], kind="stable")]
+
+            results = []
+            for i in top:
+                candidate_id, source, segment = rows[i]
+                # Only an article's newest row counts (older versions would score ~1)
+                if candidate_id == article_id or row_of.get(candidate_id) != i or scores[i] <= 0:
+                    continue
+                results.append((candidate_id, source, segment, round(float(scores[i]), 4)))
+                if len(results) >= limit:
+                    return results
+            if wanted >= len(scores) or scores[top[-1]] <= 0:
+                return results
+            wanted = min(len(scores), wanted * 4)
@@ -0,0 +1,313 @@
+# trending.py
+"""
+Streaming trending-keywords engine.
+
+Every saved article's keywords are added to a count-min sketch overall and per
+category, and a small top-k table remembers the heaviest keywords seen so far.
+Counts decay over time using forward decay: an observation at time t is added
+with weight 2 ** ((t - landmark) / half_life), so old counts never need to be
+touched; scores are divided by the current weight when read. Memory is fixed
+by the sketch dimensions and k, and an update costs O(depth + log k) no matter
+how large the corpus grows.
+
+Several scraper processes may feed the same file. Each tracker also counts
+what it added since its last save, and save_merged() adds just those counts
+to the saved tracker under a file lock, so no process overwrites another's.
+"""
+
+import hashlib
+import heapq
+import io
+import json
+import os
+import threading
+import time
+
+import numpy as np
+
+from scrapper.segment_store import file_lock
+
+# Rescale all counts once weights reach 2 ** MAX_EXPONENT, long before float overflow
+MAX_EXPONENT = 256
+
+
+def normalize_keyword(keyword):
+    """Lower-cased keyword, or None if it is too short or purely numeric to be a topic"""
+    keyword = (keyword or "").strip().lower()
+    if len(keyword) < 3 or keyword.isdigit():
+        return None
+    return keyword
+
+
+class DecayedTopK:
+    """Count-min sketch with conservative updates plus a top-k table of the heaviest keys"""
+
+    def __init__(self, width=2048, depth=4, k=50, table=None, top=None):
+        self.width = width
+        self.depth = depth
+        self.k = k
+        self.table = table if table is not None else np.zeros((depth, width), dtype=np.float64)
+        self._rows = np.arange(depth)
+        self._scores = dict(top or {})
+        self._heap = [(score, key) for key, score in self._scores.items()]
+        heapq.heapify(self._heap)
+
+    def _columns(self, key):
+        digest = hashlib.blake2b(key.encode("utf-8"), digest_size=4 * self.depth).digest()
+        return np.frombuffer(digest, dtype="<u4") % self.width
+
+    def update(self, key, weight):
+        """Add weight to key and return its new estimate"""
+        columns = self._columns(key)
+        cells = self.table[self._rows, columns]
+        estimate = cells.min() + weight
+        # Conservative update: only raise counters that would otherwise undercount
+        self.table[self._rows, columns] = np.maximum(cells, estimate)
+        self._offer(key, float(estimate))
+        return estimate
+
+    def estimate(self, key):
+        return float(self.table[self._rows, self._columns(key)].min())
+
+    def _min(self):
+        # Drop heap entries superseded by a newer score or eviction
+        while self._heap:
+            score, key = self._heap[0]
+            if self._scores.get(key) == score:
+                return score, key
+            heapq.heappop(self._heap)
+        return None
+
+    def _offer(self, key, score):
+        if key not in self._scores and len(self._scores) >= self.k:
+            smallest = self._min()
+            if smallest is None or score <= smallest[0]:
+                return
+            del self._scores[smallest[1]]
+            heapq.heappop(self._heap)
+        self._scores[key] = score
+        heapq.heappush(self._heap, (score, key))
+        if len(self._heap) > 4 * self.k:
+            self._heap = [(s, k) for k, s in self._scores.items()]
+            heapq.heapify(self._heap)
+
+    def rescale(self, multiplier):
+        """Multiply every count by multiplier (used when the decay landmark moves)"""
+        self.table *= multiplier
+        self._scores = {key: score * multiplier for key, score in self._scores.items()}
+        self._heap = [(score, key) for key, score in self._scores.items()]
+        heapq.heapify(self._heap)
+
+    def merge(self, other, multiplier=1.0):
+        """Add another sketch's counts (scaled by multiplier), re-ranking the top-k table"""
+        self.table += other.table * multiplier
+        keys = set(self._scores) | set(other._scores)
+        self._scores = {}
+        self._heap = []
+        for key in keys:
+            self._offer(key, self.estimate(key))
+
+    def top(self, n):
+        """(key, forward-decayed score) pairs, heaviest first"""
+        return sorted(self._scores.items(), key=lambda item: item[1], reverse=True)[:n]
+
+
+class TrendingTracker:
+    """Time-decayed trending keywords overall and per category"""
+
+    OVERALL = "all"
+
+    def __init__(self, categories, half_life=6 * 3600, width=2048, depth=4, k=50, landmark=None, track_pending=True):
+        """
+        Args:
+            categories (list): Categories that get their own sketch
+            half_life (float): Seconds after which an observation counts half as much
+            width (int): Counters per sketch row
+            depth (int): Sketch rows (independent hashes)
+            k (int): Keywords remembered per sketch
+            landmark (float): Forward-decay reference time (defaults to now)
+            track_pending (bool): Also count additions since the last save_merged()
+        """
+        self.half_life = half_life
+        self.width = width
+        self.depth = depth
+        self.k = k
+        self.landmark = landmark if landmark is not None else time.time()
+        self.sketches = {
+            name: DecayedTopK(width, depth, k)
+            for name in [self.OVERALL] + [c for c in categories if c != self.OVERALL]
+        }
+        self.articles = 0
+        self._lock = threading.Lock()
+        self._pending = self._new_pending() if track_pending else None
+
+    def _new_pending(self):
+        return TrendingTracker(list(self.sketches), self.half_life, self.width, self.depth, self.k,
+                               landmark=self.landmark, track_pending=False)
+
+    def _exponent(self, timestamp):
+        return (timestamp - self.landmark) / self.half_life
+
+    def _weight(self, timestamp):
+        exponent = self._exponent(timestamp)
+        if exponent > MAX_EXPONENT:
+            # Move the landmark forward and rescale so weights stay representable
+            # (very old counts simply underflow to zero)
+            multiplier = 2.0 ** -exponent
+            for sketch in self.sketches.values():
+                sketch.rescale(multiplier)
+            self.landmark = timestamp
+            exponent = 0.0
+        return 2.0 ** exponent
+
+    def add_article(self, keywords, categories=(), timestamp=None):
+        """Count an article's keywords overall and in each of its known categories"""
+        now = time.time()
+        timestamp = min(timestamp or now, now)
+        terms = {k for k in (normalize_keyword(k) for k in keywords or ()) if k}
+        if not terms:
+            return
+
+        with self._lock:
+            weight = self._weight(timestamp)
+            targets = [self.sketches[self.OVERALL]]
+            targets += [self.sketches[c] for c in set(categories or ()) if c in self.sketches and c != self.OVERALL]
+            for sketch in targets:
+                for term in terms:
+                    sketch.update(term, weight)
+            self.articles += 1
+        if self._pending is not None:
+            self._pending.add_article(keywords, categories, timestamp)
+
+    def merge(self, other):
+        """Add another tracker's counts (same sketch dimensions) to this one"""
+        with self._lock:
+            exponent = (other.landmark - self.landmark) / self.half_life
+            if exponent > MAX_EXPONENT:
+                # Move this landmark up to the other's, as _weight() would
+                for sketch in self.sketches.values():
+                    sketch.rescale(2.0 ** -exponent)
+                self.landmark = other.landmark
+                exponent = 0.0
+            multiplier = 2.0 ** exponent
+            for name, sketch in other.sketches.items():
+                if name not in self.sketches:
+                    self.sketches[name] = DecayedTopK(self.width, self.depth, self.k)
+                self.sketches[name].merge(sketch, multiplier)
+            self.articles += other.articles
+
+    def top(self, category=None, n=10, now=None):
+        """
+        Trending keywords with their current decayed scores.
+
+        Args:
+            category (str): Category to rank within (None for all articles)
+            n (int): Number of keywords
+            now (float): Time the scores are decayed to (defaults to now)
+
+        Returns:
+            list: {"keyword", "score"} dicts, highest score first
+        """
+        sketch = self.sketches.get(category or self.OVERALL)
+        if sketch is None:
+            return []
+        with self._lock:
+            scale = 2.0 ** -max(self._exponent(now or time.time()), -MAX_EXPONENT)
+            return [
+                {"keyword": key, "score": round(score * scale, 4)}
+                for key, score in sketch.top(n)
+            ]
+
+    # Persistence
+
+    def save(self, path):
+        """Write all sketches and top-k tables to one .npz file, atomically"""
+        with self._lock:
+            meta = {
+                "half_life": self.half_life,
+                "width": self.width,
+                "depth": self.depth,
+                "k": self.k,
+                "landmark": self.landmark,
+                "articles": self.articles,
+                "categories": list(self.sketches),
+                "top": {name: sketch._scores for name, sketch in self.sketches.items()},
+            }
+            buffer = io.BytesIO()
+            np.savez(
+                buffer,
+                meta=np.array(json.dumps(meta)),
+                **{f"table_{i}": sketch.table for i, sketch in enumerate(self.sketches.values())}
+            )
+
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(buffer.getvalue())
+        os.replace(tmp_path, path)
+
+    def save_merged(self, path):
+        """
+        Add the counts this tracker gathered since its last save_merged() to the
+        saved tracker (re-read under a file lock) and write the result; this
+        tracker then continues from the merged counts.
+        """
+        if self._pending is None:
+            return self.save(path)
+        with self._lock:
+            pending, self._pending = self._pending, self._new_pending()
+        try:
+            with file_lock(f"{path}.lock"):
+                saved = self.load_or_create(path, list(self.sketches), track_pending=False, half_life=self.half_life,
+                                            width=self.width, depth=self.depth, k=self.k)
+                if (saved.width, saved.depth) != (self.width, self.depth):
+                    # Differently sized sketches cannot be added up; this tracker replaces the file
+                    self.save(path)
+                    return
+                saved.merge(pending)
+                saved.save(path)
+        except BaseException:
+            # Keep the counts for the next attempt
+            with self._lock:
+                pending.merge(self._pending)
+                self._pending = pending
+            raise
+        with self._lock:
+            self.sketches = saved.sketches
+            self.landmark = saved.landmark
+            self.articles = saved.articles
+            unsaved = self._pending
+        # Additions made while saving stay pending and are counted here too
+        self.merge(unsaved)
+
+    @classmethod
+    def load(cls, path, track_pending=False):
+        """Read a tracker saved with save()"""
+        with np.load(path, allow_pickle=False) as data:
+            meta = json.loads(str(data["meta"]))
+            tracker = cls(
+                [], half_life=meta["half_life"], width=meta["width"], depth=meta["depth"],
+                k=meta["k"], landmark=meta["landmark"], track_pending=track_pending
+            )
+            tracker.sketches = {
+                name: DecayedTopK(meta["width"], meta["depth"], meta["k"],
+                                  table=data[f"table_{i}"].copy(), top=meta["top"].get(name))
+                for i, name in enumerate(meta["categories"])
+            }
+        tracker.articles = meta.get("articles", 0)
+        return tracker
+
+    @classmethod
+    def load_or_create(cls, path, categories, track_pending=True, **kwargs):
+        """Load the saved tracker, or start an empty one if there is none (or it is unreadable)"""
+        if os.path.exists(path):
+            try:
+                tracker = cls.load(path, track_pending=track_pending)
+                for name in categories:
+                    tracker.sketches.setdefault(name, DecayedTopK(tracker.width, tracker.depth, tracker.k))
+                if track_pending:
+                    # Counted per category like the loaded sketches
+                    tracker._pending = tracker._new_pending()
+                return tracker
+            except (OSError, ValueError, KeyError):
+                pass
+        return cls(categories, track_pending=track_pending, **kwargs)
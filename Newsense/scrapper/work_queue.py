@@ -0,0 +1,475 @@
+# work_queue.py
+"""
+Lease-based work queue for running the scraper on several workers or nodes.
+
+A scrape round becomes tasks in a shared queue: one per source, plus one
+"publish" task. A worker leases a source task, discovers that source's new
+article URLs and queues each one as its own task, so the articles of a busy
+source are spread over all workers. Task keys are unique and article keys
+include the round, so an article URL is queued (and scraped) once per round no
+matter how many workers discover it, and a task that failed in an earlier round
+does not keep the URL out of later ones. Articles saved in earlier rounds are
+skipped at discovery: workers re-read the saved ids before each source task.
+
+A lease lasts lease_seconds. A task whose worker crashed is handed to another
+worker once its lease expires; completions carry the lease token, so a worker
+that lost its lease cannot overwrite the new owner's result. Failed tasks are
+retried with backoff up to max_attempts.
+
+The publish task is a barrier: it is only leased once every other task of its
+round is finished. Its worker feeds the round's articles to the trending and
+related-article indexes and republishes the article index, so those shared
+files keep a single writer.
+
+SQLiteWorkQueue covers one box (or a shared filesystem with working locks).
+Other stores plug in by subclassing WorkQueue and calling register_backend().
+"""
+
+import datetime
+import json
+import logging
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from abc import ABC, abstractmethod
+
+from scrapper.catalog import bump_catalog_version
+
+PENDING = "pending"
+LEASED = "leased"
+DONE = "done"
+FAILED = "failed"
+
+SOURCE_TASK = "source"
+ARTICLE_TASK = "article"
+PUBLISH_TASK = "publish"
+
+
+class Task:
+    """One leased unit of work"""
+
+    __slots__ = ("key", "kind", "round", "payload", "attempts", "token", "lease_expires")
+
+    def __init__(self, key, kind, round, payload, attempts, token, lease_expires):
+        self.key = key
+        self.kind = kind
+        self.round = round
+        self.payload = payload
+        self.attempts = attempts
+        self.token = token
+        self.lease_expires = lease_expires
+
+
+class WorkQueue(ABC):
+    """Interface of a work queue backend"""
+
+    @abstractmethod
+    def put(self, key, kind, round, payload=None, barrier=False):
+        """Queue a task unless one with the same key exists; returns True if it was added"""
+        raise NotImplementedError
+
+    def put_many(self, tasks):
+        """Queue (key, kind, round, payload) tuples; returns the number added"""
+        return sum(1 for key, kind, round, payload in tasks if self.put(key, kind, round, payload))
+
+    @abstractmethod
+    def lease(self, worker_id, lease_seconds):
+        """Lease the next runnable task (expired leases included), or None"""
+        raise NotImplementedError
+
+    @abstractmethod
+    def complete(self, task, result=None):
+        """Mark a leased task done; False if the lease was lost meanwhile"""
+        raise NotImplementedError
+
+    @abstractmethod
+    def fail(self, task, error):
+        """Release a leased task for a retry, or mark it failed after max_attempts"""
+        raise NotImplementedError
+
+    @abstractmethod
+    def results(self, round, kind):
+        """Results of the finished tasks of a kind in a round"""
+        raise NotImplementedError
+
+    @abstractmethod
+    def active_round(self):
+        """The round that still has unfinished tasks, or None"""
+        raise NotImplementedError
+
+    @abstractmethod
+    def has_work(self):
+        """Whether any task is pending or leased"""
+        raise NotImplementedError
+
+    @abstractmethod
+    def purge(self, older_than):
+        """Delete finished tasks last updated more than older_than seconds ago"""
+        raise NotImplementedError
+
+    @abstractmethod
+    def stats(self):
+        """Task counts by status"""
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+    def start_round(self, sources):
+        """
+        Queue a scrape of the given sources, unless a round is still running.
+
+        Returns:
+            tuple: (round id, whether a new round was started)
+        """
+        active = self.active_round()
+        if active is not None:
+            return active, False
+        round = new_round_id()
+        self.put_many(round_tasks(round, sources))
+        self.put(f"{PUBLISH_TASK}:{round}", PUBLISH_TASK, round, barrier=True)
+        return round, True
+
+
+def new_round_id():
+    return datetime.datetime.now().strftime("%Y%m%dT%H%M%S-") + uuid.uuid4().hex[:6]
+
+
+def round_tasks(round, sources):
+    """(key, kind, round, payload) of the source tasks of a round"""
+    return [(f"{SOURCE_TASK}:{round}:{source['name']}", SOURCE_TASK, round, {"source": source}) for source in sources]
+
+
+class SQLiteWorkQueue(WorkQueue):
+    """Work queue in a SQLite database; every state change is a short IMMEDIATE transaction"""
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS tasks (
+            key TEXT PRIMARY KEY,
+            kind TEXT NOT NULL,
+            round TEXT NOT NULL,
+            payload TEXT,
+            barrier INTEGER NOT NULL DEFAULT 0,
+            status TEXT NOT NULL,
+            owner TEXT,
+            token TEXT,
+            lease_expires REAL,
+            not_before REAL NOT NULL DEFAULT 0,
+            attempts INTEGER NOT NULL DEFAULT 0,
+            result TEXT,
+            error TEXT,
+            created REAL NOT NULL,
+            updated REAL NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS tasks_status ON tasks (status, not_before, created);
+        CREATE INDEX IF NOT EXISTS tasks_round ON tasks (round, status);
+    """
+
+    def __init__(self, path, max_attempts=3, retry_delay=30.0):
+        """
+        Args:
+            path (str): Database file (created if missing)
+            max_attempts (int): Leases a task gets before it is marked failed
+            retry_delay (float): Seconds before a failed task is retried (doubles per attempt)
+        """
+        self.path = path
+        self.max_attempts = max_attempts
+        self.retry_delay = retry_delay
+        self.logger = logging.getLogger("EnhancedNewsScraper.queue")
+        self._local = threading.local()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn().executescript(self.SCHEMA)
+
+    def _conn(self):
+        # sqlite3 connections may not be shared across threads
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _transaction(self):
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        return conn
+
+    def put(self, key, kind, round, payload=None, barrier=False):
+        now = time.time()
+        cursor = self._conn().execute(
+            "INSERT OR IGNORE INTO tasks (key, kind, round, payload, barrier, status, created, updated) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (key, kind, round, json.dumps(payload), int(barrier), PENDING, now, now)
+        )
+        return cursor.rowcount == 1
+
+    def put_many(self, tasks):
+        now = time.time()
+        rows = [(key, kind, round, json.dumps(payload), PENDING, now, now) for key, kind, round, payload in tasks]
+        conn = self._transaction()
+        try:
+            before = conn.total_changes
+            conn.executemany(
+                "INSERT OR IGNORE INTO tasks (key, kind, round, payload, status, created, updated) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)", rows
+            )
+            added = conn.total_changes - before
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        return added
+
+    def start_round(self, sources):
+        # Checked and queued in one transaction, so concurrent callers share one round
+        now = time.time()
+        conn = self._transaction()
+        try:
+            row = conn.execute(
+                "SELECT round FROM tasks WHERE status IN (?, ?) ORDER BY created LIMIT 1", (PENDING, LEASED)
+            ).fetchone()
+            if row is not None:
+                conn.execute("COMMIT")
+                return row["round"], False
+            round = new_round_id()
+            rows = [(key, kind, round, json.dumps(payload), 0, PENDING, now, now)
+                    for key, kind, round, payload in round_tasks(round, sources)]
+            rows.append((f"{PUBLISH_TASK}:{round}", PUBLISH_TASK, round, json.dumps(None), 1, PENDING, now, now))
+            conn.executemany(
+                "INSERT OR IGNORE INTO tasks (key, kind, round, payload, barrier, status, created, updated) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)", rows
+            )
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        return round, True
+
+    def _recover_expired(self, conn, now):
+        """Fail expired leases that used up their attempts; the rest are leasable again"""
+        cursor = conn.execute(
+            "UPDATE tasks SET status = ?, owner = NULL, token = NULL, error = 'lease expired', updated = ? "
+            "WHERE status = ? AND lease_expires < ? AND attempts >= ?",
+            (FAILED, now, LEASED, now, self.max_attempts)
+        )
+        if cursor.rowcount:
+            self.logger.warning(f"{cursor.rowcount} tasks failed after their last lease expired")
+
+    def lease(self, worker_id, lease_seconds):
+        now = time.time()
+        token = uuid.uuid4().hex
+        conn = self._transaction()
+        try:
+            self._recover_expired(conn, now)
+            # Barrier tasks wait until the rest of their round is finished
+            row = conn.execute(
+                "SELECT * FROM tasks t "
+                "WHERE ((t.status = ? AND t.not_before <= ?) OR (t.status = ? AND t.lease_expires < ?)) "
+                "AND (t.barrier = 0 OR NOT EXISTS ("
+                "    SELECT 1 FROM tasks o WHERE o.round = t.round AND o.barrier = 0 AND o.status IN (?, ?))) "
+                "ORDER BY t.barrier, t.created LIMIT 1",
+                (PENDING, now, LEASED, now, PENDING, LEASED)
+            ).fetchone()
+            if row is None:
+                conn.execute("COMMIT")
+                return None
+            if row["status"] == LEASED:
+                self.logger.warning(f"Lease of {row['key']} held by {row['owner']} expired; reassigning to {worker_id}")
+            expires = now + lease_seconds
+            conn.execute(
+                "UPDATE tasks SET status = ?, owner = ?, token = ?, lease_expires = ?, attempts = attempts + 1, "
+                "updated = ? WHERE key = ?",
+                (LEASED, worker_id, token, expires, now, row["key"])
+            )
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        return Task(row["key"], row["kind"], row["round"], json.loads(row["payload"]),
+                    row["attempts"] + 1, token, expires)
+
+    def complete(self, task, result=None):
+        cursor = self._conn().execute(
+            "UPDATE tasks SET status = ?, result = ?, owner = NULL, token = NULL, error = NULL, updated = ? "
+            "WHERE key = ? AND token = ? AND status = ?",
+            (DONE, json.dumps(result), time.time(), task.key, task.token, LEASED)
+        )
+        if cursor.rowcount == 0:
+            self.logger.warning(f"Lease of {task.key} was lost before it completed")
+            return False
+        return True
+
+    def fail(self, task, error):
+        now = time.time()
+        if task.attempts >= self.max_attempts:
+            status, not_before = FAILED, 0
+        else:
+            status, not_before = PENDING, now + self.retry_delay * 2 ** (task.attempts - 1)
+        cursor = self._conn().execute(
+            "UPDATE tasks SET status = ?, not_before = ?, error = ?, owner = NULL, token = NULL, updated = ? "
+            "WHERE key = ? AND token = ? AND status = ?",
+            (status, not_before, str(error), now, task.key, task.token, LEASED)
+        )
+        return cursor.rowcount == 1
+
+    def results(self, round, kind):
+        rows = self._conn().execute(
+            "SELECT result FROM tasks WHERE round = ? AND kind = ? AND status = ?", (round, kind, DONE)
+        )
+        return [json.loads(row["result"]) for row in rows]
+
+    def active_round(self):
+        row = self._conn().execute(
+            "SELECT round FROM tasks WHERE status IN (?, ?) ORDER BY created LIMIT 1", (PENDING, LEASED)
+        ).fetchone()
+        return row["round"] if row else None
+
+    def has_work(self):
+        return self.active_round() is not None
+
+    def purge(self, older_than):
+        cursor = self._conn().execute(
+            "DELETE FROM tasks WHERE status IN (?, ?) AND updated < ?", (DONE, FAILED, time.time() - older_than)
+        )
+        return cursor.rowcount
+
+    def stats(self):
+        counts = {PENDING: 0, LEASED: 0, DONE: 0, FAILED: 0}
+        for row in self._conn().execute("SELECT status, COUNT(*) AS n FROM tasks GROUP BY status"):
+            counts[row["status"]] = row["n"]
+        return counts
+
+    def close(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+
+# URL scheme -> factory(location); plain paths use SQLite
+BACKENDS = {"sqlite": SQLiteWorkQueue}
+
+
+def register_backend(scheme, factory):
+    """Make open_work_queue() accept "<scheme>://..." locations"""
+    BACKENDS[scheme] = factory
+
+
+def open_work_queue(location):
+    """Open a work queue from "sqlite:///path/queue.db", another registered scheme, or a plain path"""
+    scheme, sep, rest = location.partition("://")
+    if not sep:
+        return SQLiteWorkQueue(location)
+    if scheme not in BACKENDS:
+        raise ValueError(f"Unknown work queue backend: {scheme}")
+    if scheme == "sqlite":
+        # sqlite:///relative.db and sqlite:////absolute.db, as in SQLAlchemy URLs
+        rest = rest[1:] if rest.startswith("/") else rest
+    return BACKENDS[scheme](rest)
+
+
+class QueueWorker:
+    """Leases tasks from a work queue and runs them with an EnhancedNewsScraper"""
+
+    def __init__(self, scraper, queue, worker_id=None, lease_seconds=300, poll_interval=5.0, purge_after=7 * 86400):
+        """
+        Args:
+            scraper: EnhancedNewsScraper doing the fetching, parsing and saving
+            queue (WorkQueue): Shared queue
+            worker_id (str): Name recorded on leases (defaults to host:pid)
+            lease_seconds (float): How long a task is reserved for this worker
+            poll_interval (float): Seconds to wait when no task is runnable
+            purge_after (float): Finished tasks older than this are deleted when a round is published
+        """
+        self.scraper = scraper
+        self.queue = queue
+        self.worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}"
+        self.lease_seconds = lease_seconds
+        self.poll_interval = poll_interval
+        self.purge_after = purge_after
+        self.logger = logging.getLogger("EnhancedNewsScraper.worker")
+        self.processed = 0
+        self._stop = threading.Event()
+
+    def stop(self):
+        self._stop.set()
+
+    def run(self, forever=False):
+        """
+        Process tasks until the queue has no unfinished work (or until stop() with forever=True).
+
+        Returns:
+            int: Number of tasks this worker completed
+        """
+        self.scraper.load_seen_ids()
+        self.logger.info(f"Worker {self.worker_id} started")
+        while not self._stop.is_set():
+            task = self.queue.lease(self.worker_id, self.lease_seconds)
+            if task is None:
+                # Tasks may be leased elsewhere or waiting for a retry
+                if not forever and not self.queue.has_work():
+                    break
+                self._stop.wait(self.poll_interval)
+                continue
+            self.run_task(task)
+        self.logger.info(f"Worker {self.worker_id} finished after {self.processed} tasks")
+        return self.processed
+
+    def run_task(self, task):
+        try:
+            if task.kind == SOURCE_TASK:
+                result = self._run_source(task)
+            elif task.kind == ARTICLE_TASK:
+                result = self._run_article(task)
+            elif task.kind == PUBLISH_TASK:
+                result = self._run_publish(task)
+            else:
+                raise ValueError(f"Unknown task kind: {task.kind}")
+        except Exception as e:
+            self.logger.error(f"Task {task.key} failed (attempt {task.attempts}): {str(e)}")
+            self.queue.fail(task, e)
+            return False
+        if self.queue.complete(task, result):
+            self.processed += 1
+            return True
+        return False
+
+    def _run_source(self, task):
+        source = task.payload["source"]
+        # Picks up articles other workers saved since, so they are not queued again
+        self.scraper.load_seen_ids()
+        found = self.scraper.discover_articles(source)
+        added = self.queue.put_many(
+            (f"{ARTICLE_TASK}:{task.round}:{self.scraper.article_id(item['url'])}", ARTICLE_TASK, task.round, item)
+            for item in found
+        )
+        self.logger.info(f"Queued {added} of {len(found)} new articles from {source['name']}")
+        return {"discovered": len(found), "queued": added}
+
+    def _run_article(self, task):
+        record = self.scraper.scrape_article(task.payload)
+        if record is None:
+            return None
+        source_dir = self.scraper.source_dir(record.source)
+        os.makedirs(source_dir, exist_ok=True)
+        saved = self.scraper.save_articles([record], source_dir, update_derived=False)
+        if not saved:
+            raise RuntimeError(f"Could not save {task.payload['url']}")
+        bump_catalog_version(self.scraper.output_dir)
+        return {"id": self.scraper.article_id(record.url), "source": os.path.basename(source_dir),
+                "segment": os.path.relpath(saved[0], source_dir)}
+
+    def _run_publish(self, task):
+        saved = [r for r in self.queue.results(task.round, ARTICLE_TASK) if r]
+        self.scraper.index_saved_articles(saved)
+        self.scraper.publish_index()
+        self.queue.purge(self.purge_after)
+        self.logger.info(f"Published round {task.round}: {len(saved)} articles")
+        return {"articles": len(saved)}
@@ -4,22 +4,22 @@ import sys
 import argparse
 from tqdm import tqdm
 from pathlib import Path
+from itertools import islice
 from summarizer import summarize_news
+from scrapper.segment_store import store
+from scrapper.catalog import list_source_dirs
 
-def summarize_article(article_path, max_length=100, output_dir="summarized_news"):
+def summarize_article(article, article_name, max_length=100, output_dir="summarized_news"):
     """Summarize a single article and save the result"""
     try:
-        # Load the article
-        with open(article_path, 'r', encoding='utf-8') as f:
-            article = json.load(f)
-            
         # Get content
         content = article.get('content', '')
         if not content:
             return False, "Article has no content"
             
         # Generate summary
-        summary = summarize_news(content, max_length)
+        # Batch job: wait for the model rather than saving fallback summaries
+        summary = summarize_news(content, max_length, wait=True)
         
         # Create the output file path
         source_name = article.get('source', 'unknown')
@@ -27,7 +27,7 @@ def summarize_article(article_path, max_length=100, output_dir="summarized_news"
         Path(source_dir).mkdir(parents=True, exist_ok=True)
         
         # Create output filename
-        filename = f"summary_{os.path.basename(article_path)}"
+        filename = f"summary_{article_name}"
         output_path = os.path.join(source_dir, filename)
         
         # Save the summary
@@ -53,9 +53,18 @@ def main():
                         help='Process only a specific source')
     parser.add_argument('--limit', '-l', type=int, 
                         help='Limit number of articles to process per source')
+    parser.add_argument('--profile', metavar='PATH',
+                        help='Profile the run: folded stacks for flame graphs, or cProfile stats if PATH ends in .prof')
     
     args = parser.parse_args()
-    
+    if args.profile:
+        from profiling import profiled
+        with profiled(args.profile):
+            return summarize_all(args)
+    return summarize_all(args)
+
+def summarize_all(args):
+    """Summarize every stored article of the selected sources"""
     # Check if the input directory exists
     if not os.path.exists(args.input):
         print(f"Error: Input directory '{args.input}' does not exist")
@@ -72,8 +81,7 @@ def main():
             print(f"Error: Source '{args.source}' not found")
             return 1
     else:
-        source_dirs = [d for d in os.listdir(args.input) 
-                      if os.path.isdir(os.path.join(args.input, d))]
+        source_dirs = list_source_dirs(args.input)
                       
     if not source_dirs:
         print("No news sources found")
@@ -88,25 +96,22 @@ def main():
     for source in source_dirs:
         source_path = os.path.join(args.input, source)
         
-        # Get all JSON files in the source directory
-        json_files = [f for f in os.listdir(source_path) if f.endswith('.json')]
-        
-        if args.limit and len(json_files) > args.limit:
-            json_files = json_files[:args.limit]
+        # Get the stored articles for this source (segments and legacy JSON files)
+        articles = list(islice(store.iter_articles(source_path), args.limit))
             
-        if not json_files:
+        if not articles:
             print(f"No news articles found in {source}")
             continue
             
-        print(f"\nProcessing {len(json_files)} articles from {source}...")
+        print(f"\nProcessing {len(articles)} articles from {source}...")
         
         # Process each article
-        for article_file in tqdm(json_files):
-            article_path = os.path.join(source_path, article_file)
+        for article_name, article in tqdm(articles):
             total_articles += 1
             
             success, message = summarize_article(
-                article_path, 
+                article,
+                article_name,
                 max_length=args.max_length,
                 output_dir=args.output
             )
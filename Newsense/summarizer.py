@@ -3,40 +3,150 @@ from transformers import pipeline, AutoTokenizer, AutoModelForSeq2SeqLM
 import nltk
 from nltk.tokenize import word_tokenize
 import logging
+import json
+import os
+import queue
+import shutil
+import threading
+import time
+from collections import deque
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - not available on Windows
+    fcntl = None
+
+try:
+    import accelerate  # noqa: F401 - needed for low_cpu_mem_usage loading
+except ImportError:  # pragma: no cover - optional speedup
+    accelerate = None
+
+# Local safetensors copy of the model kept between runs (NEWSENSE_MODEL_DIR; unset disables it)
+DEFAULT_WARM_COPY_DIR = os.environ.get("NEWSENSE_MODEL_DIR")
+WARM_COPY_WEIGHTS = "model.safetensors"
+
+# Tiered summarization: seconds between attempts of a standby process to take the
+# leader lock, keys remembered as forwarded, and the size at which the leader
+# starts the drained request file over
+LEADER_RETRY_SECONDS = 30.0
+MAX_FORWARDED_KEYS = 10000
+MAX_REQUEST_FILE_BYTES = 1024 * 1024
 
 class NewsSummarizer:
-    def __init__(self, model_name="facebook/bart-large-cnn"):
+    def __init__(self, model_name="facebook/bart-large-cnn", background=False, warm_copy_dir=DEFAULT_WARM_COPY_DIR):
         """
         Initialize the news summarizer with a pretrained model.
         
         Args:
             model_name (str): Name of the pretrained model to use
+            background (bool): Load the model on a daemon thread and return at once;
+                summarize() falls back to extraction until `ready` is True
+            warm_copy_dir (str): Save a safetensors copy of the model here after the
+                first load and load from it afterwards (None disables it)
         """
-        logging.basicConfig(level=logging.INFO)
         self.logger = logging.getLogger("NewsSummarizer")
+        self.model_name = model_name
+        self.warm_copy_dir = warm_copy_dir
+        self.summarizer = None
+        self.load_error = None
+        self._loaded = threading.Event()
         
         try:
-            self.logger.info(f"Loading model: {model_name}")
-            self.tokenizer = AutoTokenizer.from_pretrained(model_name)
-            self.model = AutoModelForSeq2SeqLM.from_pretrained(model_name)
-            
-            # Create a summarization pipeline
-            self.summarizer = pipeline(
-                "summarization",
-                model=self.model,
-                tokenizer=self.tokenizer,
-                framework="pt"  # PyTorch
-            )
-            self.logger.info("Model loaded successfully")
-            
-            try:
-                nltk.data.find('tokenizers/punkt')
-            except LookupError:
-                nltk.download('punkt', quiet=True)
-                
+            nltk.data.find('tokenizers/punkt')
+        except LookupError:
+            nltk.download('punkt', quiet=True)
+        
+        if background:
+            threading.Thread(target=self._load_in_background, name="newsense-model-loader", daemon=True).start()
+            return
+        try:
+            self._load()
         except Exception as e:
             self.logger.error(f"Error initializing summarizer: {str(e)}")
             raise
+        finally:
+            self._loaded.set()
+    
+    @property
+    def ready(self):
+        """Whether the model is loaded (summaries come from the model, not the fallback)"""
+        return self.summarizer is not None
+    
+    def wait_ready(self, timeout=None):
+        """Block until loading finished (or timeout); returns whether the model is ready"""
+        self._loaded.wait(timeout)
+        return self.ready
+    
+    def _load_in_background(self):
+        try:
+            self._load()
+        except Exception as e:
+            self.load_error = e
+            self.logger.error(f"Error loading summarizer model, using extractive summaries: {str(e)}")
+        finally:
+            self._loaded.set()
+    
+    def _load(self):
+        start = time.perf_counter()
+        warm = bool(self.warm_copy_dir) and os.path.exists(os.path.join(self.warm_copy_dir, WARM_COPY_WEIGHTS))
+        source = self.warm_copy_dir if warm else self.model_name
+        
+        self.logger.info(f"Loading model: {source}")
+        tokenizer = AutoTokenizer.from_pretrained(source)
+        model = self._load_model(source)
+        model.eval()
+        
+        # Create a summarization pipeline
+        summarizer = pipeline(
+            "summarization",
+            model=model,
+            tokenizer=tokenizer,
+            framework="pt"  # PyTorch
+        )
+        self.tokenizer, self.model = tokenizer, model
+        if self.warm_copy_dir and not warm:
+            self._save_warm_copy()
+        
+        # Published last: summarize() uses the model once this is set
+        self.summarizer = summarizer
+        self.logger.info(f"Model loaded in {time.perf_counter() - start:.1f}s")
+    
+    def _load_model(self, source):
+        """
+        Load the weights from safetensors, which are memory-mapped instead of read
+        into memory. With accelerate installed, low_cpu_mem_usage also skips the
+        randomly initialized copy, so the weights are never held in memory twice.
+        """
+        options = {"low_cpu_mem_usage": accelerate is not None}
+        try:
+            return AutoModelForSeq2SeqLM.from_pretrained(source, use_safetensors=True, **options)
+        except OSError as e:
+            self.logger.warning(f"No safetensors weights for {source}, loading the PyTorch checkpoint: {str(e)}")
+            return AutoModelForSeq2SeqLM.from_pretrained(source, **options)
+    
+    def _save_warm_copy(self):
+        """Save the model and tokenizer as safetensors; concurrent savers keep the first copy"""
+        tmp_dir = f"{self.warm_copy_dir}.{os.getpid()}.tmp"
+        try:
+            self.model.save_pretrained(tmp_dir, safe_serialization=True)
+            self.tokenizer.save_pretrained(tmp_dir)
+        except OSError as e:
+            self.logger.warning(f"Could not save a warm copy of the model: {str(e)}")
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            return
+        try:
+            # Atomic, and fails if another process has already published its copy
+            os.rename(tmp_dir, self.warm_copy_dir)
+            self.logger.info(f"Saved a warm copy of the model to {self.warm_copy_dir}")
+            return
+        except OSError:
+            pass
+        # Lost the race: only our own temporary copy is removed, never the published one
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        if not os.path.exists(os.path.join(self.warm_copy_dir, WARM_COPY_WEIGHTS)):
+            self.logger.warning(
+                f"{self.warm_copy_dir} exists without {WARM_COPY_WEIGHTS}; remove it to let a warm copy be saved"
+            )
     
     def count_words(self, text):
         """Count the number of words in a text"""
@@ -56,6 +166,11 @@ class NewsSummarizer:
         if not content or len(content) < 100:
             return content  # Return original if content is too short
         
+        # Still loading in the background (or failed to load): don't wait for it
+        summarizer = self.summarizer
+        if summarizer is None:
+            return self._fallback_summarize(content, max_length)
+        
         try:
             # Calculate the appropriate max_tokens for the model
             # Rule of thumb: tokens are roughly 3/4 of words, so we multiply max_length by 4/3
@@ -73,7 +188,7 @@ class NewsSummarizer:
                     if len(chunk.strip()) < 100:  # Skip very short chunks
                         continue
                     
-                    chunk_summary = self.summarizer(
+                    chunk_summary = summarizer(
                         chunk,
                         max_length=max_tokens,
                         min_length=min_tokens,
@@ -87,7 +202,7 @@ class NewsSummarizer:
                 
                 # If combined summary is too long, summarize it again
                 if self.count_words(combined_summary) > max_length:
-                    final_summary = self.summarizer(
+                    final_summary = summarizer(
                         combined_summary,
                         max_length=max_tokens,
                         min_length=min_tokens,
@@ -98,7 +213,7 @@ class NewsSummarizer:
                 return combined_summary
             else:
                 # Process shorter text in a single pass
-                summary = self.summarizer(
+                summary = summarizer(
                     content,
                     max_length=max_tokens,
                     min_length=min_tokens,
@@ -140,26 +255,384 @@ class NewsSummarizer:
         return summary
 
 
-def summarize_news(content, max_length=200):
+class TieredSummarizer:
+    """
+    Latency-aware summarization: a fast extractive summary right away, with an
+    abstractive (BART) summary computed in the background and used once ready.
+
+    Background jobs are shed, leaving the fast summary in place, while the queue
+    is deeper than max_queue or the recent p95 time from queueing to completion
+    is above slo_seconds. Samples older than latency_window seconds are
+    forgotten, so the abstractive tier resumes once the pressure is gone.
+    Upgraded summaries are appended to a JSON-lines file shared by all processes;
+    an upgrade's version is the file offset just past its line, so every process
+    agrees on it.
+
+    With a leader_lock_path, only the process holding that lock loads the model
+    and runs the queue (so a multi-worker deployment holds one copy of it); the
+    others append their upgrade requests to request_path for the leader to pick
+    up, and take over the lock if the leader goes away.
+    """
+
+    def __init__(self, fast, load_abstractive=None, slo_seconds=30.0, max_queue=50,
+                 latency_window=300.0, store_path=None, on_upgrade=None, on_ready=None,
+                 leader_lock_path=None, request_path=None, load_content=None):
+        """
+        Args:
+            fast: Summarizer with summarize(content, max_length) used inline
+            load_abstractive (callable): Returns the slow, better summarizer; called
+                once on the background thread (None disables the abstractive tier)
+            slo_seconds (float): Target p95 seconds from queueing to upgraded summary
+            max_queue (int): Queued jobs above which new jobs are shed
+            latency_window (float): Seconds of latency samples the p95 is taken over
+            store_path (str): JSON-lines file of upgraded summaries ({"key", "summary", "scope"})
+            on_upgrade (callable): Called with (key, summary) after each upgrade
+            on_ready (callable): Called once the abstractive summarizer has loaded
+            leader_lock_path (str): Lock file electing the one process that runs the model
+            request_path (str): JSON-lines file other processes forward upgrade requests to
+            load_content (callable): Returns the content for (key, scope) of a forwarded request
+        """
+        self.logger = logging.getLogger("NewsSummarizer.tiered")
+        self.fast = fast
+        self.load_abstractive = load_abstractive
+        self.slo_seconds = slo_seconds
+        self.max_queue = max_queue
+        self.latency_window = latency_window
+        self.store_path = store_path
+        self.on_upgrade = on_upgrade
+        self.on_ready = on_ready
+        self.leader_lock_path = leader_lock_path
+        self.request_path = request_path
+        self.load_content = load_content
+
+        self.state = "idle" if load_abstractive else "disabled"
+        self.upgrades = {}
+        self.key_versions = {}
+        self.scope_versions = {}
+        self.shed = 0
+        self.completed = 0
+        self._abstractive = None
+        self._latencies = deque()
+        self._pending = set()
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._thread = None
+        self._store_offset = 0
+        self._store_checked = 0.0
+        self._forwarded = {}
+        self._request_offset = 0
+        self._requests_checked = 0.0
+        self.leading = False
+        self._leader_file = None
+        self._leader_checked = None
+        self._leader_guard = threading.Lock()
+        self.refresh(force=True)
+        if load_abstractive:
+            self._try_lead()
+
+    # Upgraded summaries
+
+    def refresh(self, force=False):
+        """Pick up summaries other processes appended (checked at most once a second)"""
+        if not self.store_path:
+            return
+        now = time.monotonic()
+        if not force and now - self._store_checked < 1.0:
+            return
+        self._store_checked = now
+        try:
+            with open(self.store_path, 'rb') as f:
+                f.seek(self._store_offset)
+                tail = f.read()
+        except OSError:
+            return
+        complete = tail[:tail.rfind(b"\n") + 1]
+        if not complete:
+            return
+        with self._lock:
+            offset = self._store_offset
+            for line in complete.splitlines(keepends=True):
+                offset += len(line)
+                try:
+                    entry = json.loads(line)
+                    key = entry["key"]
+                    self.upgrades[key] = entry["summary"]
+                except (ValueError, KeyError, TypeError):
+                    continue
+                self.key_versions[key] = offset
+                if entry.get("scope"):
+                    self.scope_versions[entry["scope"]] = offset
+            self._store_offset = offset
+
+    def _save_upgrade(self, key, summary, scope=None):
+        if self.store_path:
+            try:
+                with open(self.store_path, 'a', encoding='utf-8') as f:
+                    f.write(json.dumps({"key": key, "summary": summary, "scope": scope}, ensure_ascii=False) + "\n")
+            except OSError as e:
+                self.logger.error(f"Error saving upgraded summary for {key}: {str(e)}")
+            # Versions come from reading the line back, as in every other process
+            self.refresh(force=True)
+        with self._lock:
+            self.upgrades[key] = summary
+            if not self.store_path:
+                # Without a store the versions only need to be consistent within this process
+                self._store_offset += 1
+                self.key_versions[key] = self._store_offset
+                if scope:
+                    self.scope_versions[scope] = self._store_offset
+        if self.on_upgrade is not None:
+            self.on_upgrade(key, summary)
+
+    def upgraded(self, key):
+        """The abstractive summary for key, if one has been computed"""
+        self.refresh()
+        return self.upgrades.get(key)
+
+    def upgrade_version(self, key=None, scope=None):
+        """
+        Offset of the last stored upgrade of key, or of any article in scope (0 if none).
+        The same in every process reading the store, and unchanged by other articles' upgrades.
+        """
+        self.refresh()
+        if key is not None:
+            return self.key_versions.get(key, 0)
+        return self.scope_versions.get(scope, 0)
+
+    # Summarizing
+
+    def _p95_latency(self):
+        cutoff = time.monotonic() - self.latency_window
+        with self._lock:
+            while self._latencies and self._latencies[0][0] < cutoff:
+                self._latencies.popleft()
+            values = sorted(latency for _, latency in self._latencies)
+        if not values:
+            return None
+        return values[min(len(values) - 1, int(len(values) * 0.95))]
+
+    def overloaded(self):
+        """Whether new background jobs should be shed"""
+        if self._queue.qsize() >= self.max_queue:
+            return True
+        p95 = self._p95_latency()
+        return p95 is not None and p95 > self.slo_seconds
+
+    def summarize(self, content, max_length=100, key=None, scope=None):
+        """
+        Best summary available without waiting: the upgraded one for key if it
+        exists, otherwise the fast one (queueing an upgrade when there is capacity).
+        The upgrade is recorded under scope (e.g. the article's source), so only
+        that scope's upgrade_version() changes.
+        """
+        if key is not None:
+            upgraded = self.upgraded(key)
+            if upgraded:
+                return upgraded
+        summary = self.fast.summarize(content, max_length=max_length)
+        if key is not None and self.state not in ("disabled", "failed"):
+            if self._try_lead():
+                self._enqueue(key, content, max_length, scope)
+            else:
+                self._forward(key, max_length, scope)
+        return summary
+
+    # Leader election
+
+    def _try_lead(self):
+        """
+        Whether this process runs the model, taking the leader lock if it is free
+        (retried at most every LEADER_RETRY_SECONDS). Without a lock path, or
+        without fcntl, every process leads.
+        """
+        with self._leader_guard:
+            if self.leading:
+                return True
+            now = time.monotonic()
+            if self._leader_checked is not None and now - self._leader_checked < LEADER_RETRY_SECONDS:
+                return False
+            self._leader_checked = now
+            if self.leader_lock_path and fcntl is not None:
+                try:
+                    lock_file = open(self.leader_lock_path, 'a')
+                except OSError as e:
+                    self.logger.error(f"Error opening summarizer leader lock: {str(e)}")
+                    return False
+                try:
+                    fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+                except OSError:
+                    lock_file.close()
+                    self.state = "standby"
+                    return False
+                # Held, and the lock with it, for the life of the process
+                self._leader_file = lock_file
+            self.leading = True
+            # Requests forwarded before this process took over were the old leader's
+            try:
+                self._request_offset = os.path.getsize(self.request_path) if self.request_path else 0
+            except OSError:
+                self._request_offset = 0
+            self.state = "idle"
+            self._thread = threading.Thread(target=self._run, name="newsense-summarizer", daemon=True)
+            self._thread.start()
+            return True
+
+    def _forward(self, key, max_length, scope=None):
+        """Ask the leading process for an upgrade (again after latency_window if it never came)"""
+        if not self.request_path:
+            return
+        now = time.monotonic()
+        with self._lock:
+            forwarded = self._forwarded.get(key)
+            if forwarded is not None and now - forwarded < self.latency_window:
+                return
+            if len(self._forwarded) >= MAX_FORWARDED_KEYS:
+                self._forwarded.clear()
+            self._forwarded[key] = now
+        line = json.dumps({"key": key, "max_length": max_length, "scope": scope}, ensure_ascii=False) + "\n"
+        try:
+            with open(self.request_path, 'a', encoding='utf-8') as f:
+                if fcntl is not None:
+                    # Released on close; keeps the leader from truncating mid-write
+                    fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+                f.write(line)
+        except OSError as e:
+            self.logger.error(f"Error forwarding summary upgrade for {key}: {str(e)}")
+
+    def _take_forwarded(self):
+        """Queue the upgrade requests other processes forwarded (checked at most once a second)"""
+        now = time.monotonic()
+        if not self.request_path or now - self._requests_checked < 1.0:
+            return
+        self._requests_checked = now
+        try:
+            with open(self.request_path, 'r+b') as f:
+                if fcntl is not None:
+                    fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+                size = os.fstat(f.fileno()).st_size
+                if size < self._request_offset:
+                    self._request_offset = 0
+                f.seek(self._request_offset)
+                tail = f.read()
+                complete = tail[:tail.rfind(b"\n") + 1]
+                self._request_offset += len(complete)
+                # Start the file over once everything in it has been taken
+                if fcntl is not None and self._request_offset == size and size >= MAX_REQUEST_FILE_BYTES:
+                    f.truncate(0)
+                    self._request_offset = 0
+        except FileNotFoundError:
+            return
+        except OSError as e:
+            self.logger.error(f"Error reading forwarded summary upgrades: {str(e)}")
+            return
+        for line in complete.splitlines():
+            try:
+                entry = json.loads(line)
+                key = entry["key"]
+            except (ValueError, KeyError, TypeError):
+                continue
+            if self.upgraded(key):
+                continue
+            # The content is loaded when the job runs, from the stored article
+            self._enqueue(key, None, entry.get("max_length") or 100, entry.get("scope"))
+
+    # Background queue
+
+    def _enqueue(self, key, content, max_length, scope=None):
+        overloaded = self.overloaded()
+        with self._lock:
+            if key in self._pending:
+                return
+            if overloaded:
+                self.shed += 1
+                return
+            self._pending.add(key)
+        self._queue.put((key, content, max_length, scope, time.monotonic()))
+
+    def _run(self):
+        try:
+            self.state = "loading"
+            self._abstractive = self.load_abstractive()
+            self.state = "ready"
+            if self.on_ready is not None:
+                self.on_ready()
+        except Exception as e:
+            self.logger.error(f"Abstractive summarizer unavailable, using the fast tier only: {str(e)}")
+            self.state = "failed"
+
+        while True:
+            self._take_forwarded()
+            try:
+                key, content, max_length, scope, queued = self._queue.get(timeout=1.0)
+            except queue.Empty:
+                continue
+            try:
+                if self.state != "ready":
+                    continue
+                if content is None and self.load_content is not None:
+                    content = self.load_content(key, scope)
+                if not content:
+                    continue
+                summary = self._abstractive.summarize(content, max_length=max_length)
+                if summary:
+                    self._save_upgrade(key, summary, scope)
+                self.completed += 1
+                # Only finished runs count towards the SLO; failures would skew it low
+                with self._lock:
+                    self._latencies.append((time.monotonic(), time.monotonic() - queued))
+            except Exception as e:
+                self.logger.error(f"Error upgrading summary for {key}: {str(e)}")
+            finally:
+                with self._lock:
+                    self._pending.discard(key)
+
+    def stats(self):
+        p95 = self._p95_latency()
+        return {
+            "abstractive": self.state,
+            "leader": self.leading,
+            "queue_depth": self._queue.qsize(),
+            "p95_latency_seconds": round(p95, 3) if p95 is not None else None,
+            "slo_seconds": self.slo_seconds,
+            "shedding": self.overloaded(),
+            "shed": self.shed,
+            "upgraded": self.completed,
+            "stored_upgrades": len(self.upgrades),
+        }
+
+
+_summarizer_lock = threading.Lock()
+
+def summarize_news(content, max_length=200, wait=False):
     """
     Convenient function to summarize news content.
     
+    The model starts loading in the background on the first call; until it is
+    ready, an extractive summary is returned instead of blocking the caller.
+    
     Args:
         content (str): The text content to summarize
         max_length (int): Maximum length of summary in words
+        wait (bool): Wait for the model instead of falling back (batch jobs)
         
     Returns:
         str: Summarized content
     """
     # Lazy-load the summarizer when needed
-    if not hasattr(summarize_news, "summarizer"):
-        summarize_news.summarizer = NewsSummarizer()
-        
+    with _summarizer_lock:
+        if not hasattr(summarize_news, "summarizer"):
+            summarize_news.summarizer = NewsSummarizer(background=True)
+    
+    if wait:
+        summarize_news.summarizer.wait_ready()
     return summarize_news.summarizer.summarize(content, max_length)
 
 
 # Example usage
 if __name__ == "__main__":
+    from scrapper.logging_config import configure_logging
+    configure_logging()
+
     sample_article = """
     The European Union has agreed to impose new sanctions on Russia over its invasion of Ukraine. 
     The sanctions target Russia's financial sector, technology imports, and individuals linked to the Kremlin.
@@ -174,7 +647,7 @@ if __name__ == "__main__":
     Peace negotiations have stalled as both sides remain far apart on key issues.
     """
 
-    summary = summarize_news(sample_article, 50)
+    summary = summarize_news(sample_article, 50, wait=True)
     print(f"Original length: {len(word_tokenize(sample_article))} words")
     print(f"Summary length: {len(word_tokenize(summary))} words")
     print(f"\nSummary:\n{summary}") 
\ No newline at end of file
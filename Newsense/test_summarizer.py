@@ -2,6 +2,8 @@ import os
 import json
 import sys
 from summarizer import summarize_news
+from scrapper.segment_store import store
+from scrapper.catalog import list_source_dirs
 from pathlib import Path
 
 def main():
@@ -22,8 +24,7 @@ def main():
         return 1
     
     # Find all source directories
-    source_dirs = [d for d in os.listdir(scraped_dir) 
-                  if os.path.isdir(os.path.join(scraped_dir, d))]
+    source_dirs = list_source_dirs(scraped_dir)
     
     if not source_dirs:
         print("No news sources found. Please run the scraper first.")
@@ -36,27 +37,22 @@ def main():
     random_source = random.choice(source_dirs)
     source_path = os.path.join(scraped_dir, random_source)
     
-    # Get all JSON files in the source directory
-    json_files = [f for f in os.listdir(source_path) if f.endswith('.json')]
-    
-    if not json_files:
-        print(f"No news articles found in {random_source}.")
-        return 1
-    
-    # Choose a random article for summarization
-    random_article_file = random.choice(json_files)
-    article_path = os.path.join(source_path, random_article_file)
-    
     print(f"\nReading article from {random_source}...")
     
-    # Load the article
+    # Load the stored articles (segments and legacy JSON files)
     try:
-        with open(article_path, 'r', encoding='utf-8') as f:
-            article = json.load(f)
+        stored_articles = list(store.iter_articles(source_path))
     except Exception as e:
-        print(f"Error reading article: {str(e)}")
+        print(f"Error reading articles: {str(e)}")
         return 1
     
+    if not stored_articles:
+        print(f"No news articles found in {random_source}.")
+        return 1
+    
+    # Choose a random article for summarization
+    article_name, article = random.choice(stored_articles)
+    
     # Display article info
     print(f"\nArticle Title: {article['title']}")
     print(f"Source: {article['source']}")
@@ -76,7 +72,7 @@ def main():
     
     # Generate summary
     try:
-        summary = summarize_news(content, max_length)
+        summary = summarize_news(content, max_length, wait=True)
         print(f"\nSummary ({len(summary.split())} words):")
         print(f"{summary}")
         
@@ -85,7 +81,7 @@ def main():
         summary_dir.mkdir(parents=True, exist_ok=True)
         
         # Save the summary
-        summary_path = os.path.join(summary_dir, f"summary_{os.path.basename(article_path)}")
+        summary_path = os.path.join(summary_dir, f"summary_{article_name}")
         with open(summary_path, 'w', encoding='utf-8') as f:
             # Create a new JSON with the original article plus summary
             article_with_summary = article.copy()
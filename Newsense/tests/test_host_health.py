@@ -0,0 +1,77 @@
+import pytest
+
+pytest.importorskip("requests")
+
+from scrapper import host_health
+from scrapper.host_health import CircuitOpenError, HostHealth
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(host_health.time, "monotonic", clock)
+    return clock
+
+
+def trip(health, host):
+    for _ in range(health.failure_threshold):
+        assert not health.before_request(host)
+        health.record_failure(host, "HTTP 503")
+
+
+def test_consecutive_failures_open_the_circuit(clock):
+    health = HostHealth(failure_threshold=3, cooldown=60)
+    trip(health, "example.com")
+
+    assert health.is_open("example.com")
+    with pytest.raises(CircuitOpenError):
+        health.before_request("example.com")
+    # Other hosts are unaffected
+    assert not health.before_request("other.com")
+
+
+def test_half_open_trial_success_closes_the_circuit(clock):
+    health = HostHealth(failure_threshold=3, cooldown=60)
+    trip(health, "example.com")
+    clock.now += 61
+
+    assert health.before_request("example.com")
+    # Only one trial at a time
+    with pytest.raises(CircuitOpenError):
+        health.before_request("example.com")
+
+    health.record_success("example.com", 0.2)
+    assert not health.is_open("example.com")
+    assert not health.before_request("example.com")
+
+
+def test_failed_trial_reopens_for_another_cooldown(clock):
+    health = HostHealth(failure_threshold=3, cooldown=60)
+    trip(health, "example.com")
+    clock.now += 61
+
+    assert health.before_request("example.com")
+    health.record_failure("example.com", "timeout")
+    clock.now += 30
+    with pytest.raises(CircuitOpenError):
+        health.before_request("example.com")
+    clock.now += 31
+    assert health.before_request("example.com")
+
+
+def test_trial_without_an_outcome_lets_the_next_one_through(clock):
+    health = HostHealth(failure_threshold=3, cooldown=60)
+    trip(health, "example.com")
+    clock.now += 61
+
+    assert health.before_request("example.com")
+    health.end_trial("example.com")
+    assert health.before_request("example.com")
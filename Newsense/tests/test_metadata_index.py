@@ -0,0 +1,85 @@
+import csv
+import os
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from scrapper.metadata_index import CSV_FIELDS, MetadataIndex
+
+
+def row(article_id, source, scraped, categories=""):
+    return {"id": article_id, "title": article_id, "source": source, "url": f"https://example.com/{article_id}",
+            "published_date": "", "scraped_date": scraped, "categories": categories,
+            "has_image": "False", "filename": f"{article_id}.json"}
+
+
+def write_csv(path, rows, header=True):
+    with open(path, "a", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=CSV_FIELDS)
+        if header:
+            writer.writeheader()
+        writer.writerows(rows)
+
+
+@pytest.fixture
+def csv_path(tmp_path):
+    path = str(tmp_path / "articles_index.csv")
+    write_csv(path, [
+        row("a", "BBC", "2025-01-01T10:00:00", "World,Politics"),
+        row("b", "CNN", "2025-01-02T10:00:00", "Sports"),
+    ])
+    return path
+
+
+def test_refresh_parses_only_appended_rows(tmp_path, csv_path):
+    index = MetadataIndex(str(tmp_path / "index"))
+    assert index.refresh(csv_path) == 2
+    assert index.refresh(csv_path) == 0
+
+    write_csv(csv_path, [row("c", "BBC", "2025-01-03T10:00:00", "World")], header=False)
+    assert index.refresh(csv_path) == 1
+    assert len(index) == 3
+    assert [article_id for article_id, _ in index.select(limit=10)] == ["c", "b", "a"]
+    assert [article_id for article_id, _ in index.select(category="World")] == ["c", "a"]
+    assert index.select(source="BBC", limit=1) == [("c", "c.json")]
+
+
+def test_saved_index_resumes_where_it_stopped(tmp_path, csv_path):
+    index_dir = str(tmp_path / "index")
+    MetadataIndex(index_dir).refresh(csv_path, save=True)
+    write_csv(csv_path, [row("c", "CNN", "2025-01-03T10:00:00")], header=False)
+
+    reopened = MetadataIndex(index_dir)
+    assert len(reopened) == 2
+    assert reopened.refresh(csv_path, save=True) == 1
+    assert [article_id for article_id, _ in reopened.select(source="CNN")] == ["c", "b"]
+
+
+def test_replaced_csv_is_reindexed(tmp_path, csv_path):
+    index = MetadataIndex(str(tmp_path / "index"))
+    index.refresh(csv_path, save=True)
+
+    # Compaction rewrites the CSV into a new file holding fewer rows
+    replacement = f"{csv_path}.tmp"
+    write_csv(replacement, [row("b", "CNN", "2025-01-02T10:00:00", "Sports")])
+    os.replace(replacement, csv_path)
+
+    assert index.refresh(csv_path, save=True) == 1
+    assert index.select(limit=10) == [("b", "b.json")]
+    assert MetadataIndex(str(tmp_path / "index")).select(limit=10) == [("b", "b.json")]
+
+
+def test_saving_keeps_the_previous_generation(tmp_path, csv_path):
+    index_dir = str(tmp_path / "index")
+    first, second = MetadataIndex(index_dir), MetadataIndex(index_dir)
+    first.refresh(csv_path, save=True)
+    write_csv(csv_path, [row("c", "CNN", "2025-01-03T10:00:00")], header=False)
+    second.refresh(csv_path, save=True)
+    write_csv(csv_path, [row("d", "CNN", "2025-01-04T10:00:00")], header=False)
+    first.refresh(csv_path, save=True)
+
+    # Each save takes the next number after the one on disk, whoever saved it
+    assert (first.generation, second.generation) == (3, 2)
+    generations = {name.split(".")[1] for name in os.listdir(index_dir) if name.endswith(".npy")}
+    assert generations == {"2", "3"}
@@ -0,0 +1,116 @@
+import datetime
+import json
+import os
+import time
+
+import pytest
+
+from scrapper.segment_store import SegmentStore
+
+
+@pytest.fixture
+def store():
+    return SegmentStore()
+
+
+def article(article_id, title):
+    return {"id": article_id, "title": title}
+
+
+def test_append_batch_indexes_each_article(store, tmp_path):
+    source = str(tmp_path / "BBC")
+    entries = store.append_batch(source, [article("a", "A"), article("b", "B")], ["a", "b"])
+
+    assert [e.id for e in entries] == ["a", "b"]
+    assert [store.read(e.ref)["title"] for e in entries] == ["A", "B"]
+    # Newest first: the later article of the batch wins the listing order
+    assert [e.id for e in store.latest(source, 10)] == ["b", "a"]
+
+
+def test_appends_continue_at_the_segment_end(store, tmp_path):
+    source = str(tmp_path / "BBC")
+    store.append_batch(source, [article("a", "A")], ["a"])
+    # Another store instance stands in for another process appending meanwhile
+    SegmentStore().append_batch(source, [article("b", "B")], ["b"])
+    store.append_batch(source, [article("c", "C")], ["c"])
+
+    entries = store.read_index(store.list_segments(source)[0])
+    assert [store.read(e.ref)["id"] for e in entries] == ["a", "b", "c"]
+
+
+def test_newest_version_wins(store, tmp_path):
+    source = str(tmp_path / "BBC")
+    store.append_batch(source, [article("a", "old")], ["a"])
+    store.append_batch(source, [article("a", "new")], ["a"])
+
+    assert store.count(source) == 1
+    assert store.read_entry(store.find(source, "a"))["title"] == "new"
+
+
+def test_compact_drops_superseded_versions(store, tmp_path):
+    source = str(tmp_path / "BBC")
+    store.append_batch(source, [article("a", "old"), article("b", "B")], ["a", "b"])
+    store.append_batch(source, [article("a", "new")], ["a"])
+
+    assert store.compact(source) == 1
+    segment = store.list_segments(source)[0]
+    entries = store.read_index(segment)
+    assert [e.id for e in entries] == ["b", "a"]
+    assert [store.read(e.ref)["title"] for e in entries] == ["B", "new"]
+
+
+def test_compact_removes_emptied_partitions(store, tmp_path):
+    source = str(tmp_path / "BBC")
+    yesterday = datetime.datetime.now() - datetime.timedelta(days=1)
+    store.append_batch(source, [article("a", "old")], ["a"], when=yesterday)
+    store.append_batch(source, [article("a", "new")], ["a"])
+
+    assert store.compact(source) == 1
+    assert len(store.list_segments(source)) == 1
+    assert not os.path.exists(os.path.join(source, yesterday.strftime("%Y"), yesterday.strftime("%m"),
+                                           yesterday.strftime("%d")))
+    assert store.read_entry(store.find(source, "a"))["title"] == "new"
+
+
+def test_compact_keeps_appends_made_after_planning(store, tmp_path):
+    source = str(tmp_path / "BBC")
+    store.append_batch(source, [article("a", "old"), article("a", "new")], ["a", "a"])
+    segment = store.list_segments(source)[0]
+    entries = store.read_index(segment)
+    store.append_batch(source, [article("b", "B")], ["b"])
+
+    # Planned against the first two entries only, as compact() does before taking the lock
+    assert store._rewrite_segment(segment, entries[1:], len(entries)) == 2
+    assert [store.read(e.ref)["title"] for e in store.read_index(segment)] == ["new", "B"]
+
+
+def write_legacy(source, name, title, mtime):
+    path = os.path.join(source, name)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"title": title}, f)
+    os.utime(path, (mtime, mtime))
+    return path
+
+
+def test_migrate_legacy_keeps_the_scrape_time(store, tmp_path):
+    source = str(tmp_path / "BBC")
+    os.makedirs(source)
+    old_id, stored_id = "0" * 32, "1" * 32
+    month_ago = time.time() - 30 * 86400
+    write_legacy(source, f"{old_id}_20240101_120000.json", "first copy", month_ago - 3600)
+    write_legacy(source, f"{old_id}_20240101_130000.json", "second copy", month_ago)
+    write_legacy(source, f"{stored_id}.json", "legacy copy", month_ago)
+    store.append_batch(source, [article(stored_id, "stored")], [stored_id])
+    store.append_batch(source, [article("fresh", "fresh")], ["fresh"])
+
+    assert store.migrate_legacy(source) == 3
+    assert not [n for n in os.listdir(source) if n.endswith(".json")]
+
+    # The folded article sorts after everything stored since it was scraped
+    latest = store.latest(source, 10)
+    assert [e.id for e in latest] == ["fresh", stored_id, old_id]
+    folded = latest[-1]
+    assert folded.timestamp == pytest.approx(month_ago, abs=1)
+    assert store.read_entry(folded)["title"] == "second copy"
+    # An article the segments already hold keeps its stored version
+    assert store.read_entry(store.find(source, stored_id))["title"] == "stored"
@@ -0,0 +1,72 @@
+import pytest
+
+from scrapper.work_queue import ARTICLE_TASK, PUBLISH_TASK, SOURCE_TASK, SQLiteWorkQueue, WorkQueue
+
+
+@pytest.fixture
+def queue(tmp_path):
+    queue = SQLiteWorkQueue(str(tmp_path / "queue.db"), max_attempts=2, retry_delay=0)
+    yield queue
+    queue.close()
+
+
+def test_work_queue_is_abstract():
+    with pytest.raises(TypeError):
+        WorkQueue()
+
+
+def test_expired_lease_is_handed_to_another_worker(queue):
+    queue.put("source:r1:BBC", SOURCE_TASK, "r1")
+    first = queue.lease("worker-1", lease_seconds=-1)
+    second = queue.lease("worker-2", lease_seconds=60)
+
+    assert second.key == first.key
+    assert second.token != first.token
+    assert second.attempts == 2
+    # The live lease is not handed out again
+    assert queue.lease("worker-3", lease_seconds=60) is None
+
+
+def test_stale_token_cannot_finish_the_task(queue):
+    queue.put("source:r1:BBC", SOURCE_TASK, "r1")
+    first = queue.lease("worker-1", lease_seconds=-1)
+    second = queue.lease("worker-2", lease_seconds=60)
+
+    assert not queue.complete(first, {"by": "worker-1"})
+    assert not queue.fail(first, "lost")
+    assert queue.complete(second, {"by": "worker-2"})
+    assert queue.results("r1", SOURCE_TASK) == [{"by": "worker-2"}]
+
+
+def test_expired_lease_fails_after_the_last_attempt(queue):
+    queue.put("source:r1:BBC", SOURCE_TASK, "r1")
+    queue.lease("worker-1", lease_seconds=-1)
+    queue.lease("worker-2", lease_seconds=-1)
+
+    assert queue.lease("worker-3", lease_seconds=60) is None
+    assert queue.stats()["failed"] == 1
+
+
+def test_publish_waits_for_the_rest_of_its_round(queue):
+    round, started = queue.start_round([{"name": "BBC"}, {"name": "CNN"}])
+    assert started
+    assert queue.start_round([{"name": "BBC"}]) == (round, False)
+
+    sources = [queue.lease("worker-1", 60), queue.lease("worker-2", 60)]
+    assert {task.kind for task in sources} == {SOURCE_TASK}
+    assert queue.lease("worker-3", 60) is None
+
+    # Articles discovered by a source task join the barrier's wait
+    queue.put_many([(f"{ARTICLE_TASK}:{round}:x", ARTICLE_TASK, round, {"url": "x"})])
+    for task in sources:
+        queue.complete(task)
+    article = queue.lease("worker-1", 60)
+    assert article.kind == ARTICLE_TASK
+    assert queue.lease("worker-2", 60) is None
+
+    queue.complete(article)
+    publish = queue.lease("worker-2", 60)
+    assert publish.kind == PUBLISH_TASK
+    assert publish.round == round
+    queue.complete(publish)
+    assert not queue.has_work()